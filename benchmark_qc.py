@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Dispenser QC Analyzer
+
+Generates synthetic plate-reader exports in the exact format of
+example_data/Tempest(4,5,6)_Test-1.csv for every liquid handler type, runs
+the analysis pipeline stage by stage and records wall time per stage and peak
+memory. Results are written as JSON so two versions can be compared:
+
+    python benchmark_qc.py --plates 1,100 --output before.json
+    python benchmark_qc.py --plates 1,100 --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from qc_check import (DispenserQCAnalyzerFixedBug, LIQUID_HANDLERS, calculate_concentrations_batch,
+                      calculate_qc_table, compile_group_index, default_chip_configurations)
+from qc_curve import AUTO_MODEL, fit_standard_curves
+from qc_geometry import DEFAULT_GEOMETRY, GEOMETRIES, geometry_for_shape
+from qc_handlers import get_handler
+from qc_profile import peak_rss_mb
+
+TEMPLATE_FILE = Path(__file__).resolve().parent / "example_data" / "Tempest(4,5,6)_Test-1.csv"
+STANDARD_CONCENTRATIONS = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+TARGET_CONCENTRATION = 60
+STAGES = ('load', 'curve', 'concentrations', 'qc', 'output', 'plots')
+
+# Synthetic reader response: RFU = (concentration - intercept) / slope, as in the example plate
+SYNTHETIC_SLOPE = 0.00023472
+SYNTHETIC_INTERCEPT = -2.55327080
+BLANK_RFU = 700
+
+def _rfu(concentration):
+    return (np.asarray(concentration, dtype=float) - SYNTHETIC_INTERCEPT) / SYNTHETIC_SLOPE
+
+def synthetic_plate(handler_type, rng, cv_percent=3.0, geometry=DEFAULT_GEOMETRY):
+    """RFU plate: standards in columns 1-3 of the standard rows, blanks below them, dispensed wells elsewhere
+
+    The dispense bias follows the handler's geometry (one per nozzle row band,
+    quadrant, well or the whole plate) so the QC grouping sees realistic structure.
+    """
+    rows, cols, step = geometry.rows, geometry.cols, geometry.rows // len(STANDARD_CONCENTRATIONS)
+    plate = np.empty((rows, cols))
+    for row, concentration in zip(geometry.standard_rows, STANDARD_CONCENTRATIONS):
+        plate[row, 0:3] = _rfu(concentration) * rng.normal(1, 0.02, 3)
+        plate[row + 1:row + step, 0:3] = BLANK_RFU * rng.normal(1, 0.3, (step - 1, 3))
+
+    layout = get_handler(handler_type)
+    if layout.pattern == 'rows':
+        groups, n_groups = layout.group_map(geometry)
+        # Rows outside every nozzle band (-1) pick the trailing 1.0
+        bias = np.append(rng.normal(1, 0.04, n_groups), 1.0)[groups.reshape(geometry.shape)[:, 3:]]
+    elif layout.pattern == 'blocks':
+        block = geometry.cols // layout.head[1]  # Wells per side of one tip's square
+        bias = np.kron(rng.normal(1, 0.04, (rows // block, cols // block)), np.ones((block, block)))[:, 3:]
+    elif layout.pattern == 'wells':
+        bias = rng.normal(1, 0.04, (rows, cols - 3))
+    else:
+        bias = rng.normal(1, 0.04)
+    noise = rng.normal(1, cv_percent / 100, (rows, cols - 3))
+    plate[:, 3:] = _rfu(TARGET_CONCENTRATION * bias * noise)
+    return np.round(np.clip(plate, 1, None))
+
+def _calculated_block(plate):
+    """%CV block in the layout of the reader's 'Calculated results' (standard triplicates, nozzle x 7 well groups)"""
+    geometry = geometry_for_shape(plate.shape)
+    calculated = np.full(plate.shape, np.nan)
+    band = geometry.rows // get_handler('Tempest').nozzles
+    for row in geometry.standard_rows:
+        standards = plate[row, 0:3]
+        calculated[row, 0:3] = 100 * standards.std(ddof=1) / standards.mean()
+    for row in range(0, geometry.rows, band):
+        for start in range(3, geometry.cols, 7):
+            group = plate[row:row + band, start:start + 7]
+            calculated[row:row + band, start:start + 7] = 100 * group.std(ddof=1) / group.mean()
+    return calculated
+
+class ExportTemplate:
+    """The example export split around its two plate blocks, so synthetic plates keep the exact format"""
+    def __init__(self, template_file=TEMPLATE_FILE):
+        with open(template_file, 'rb') as f:
+            self.lines = f.read().decode('utf-8').splitlines(keepends=True)
+        self.newline = '\r\n' if self.lines[0].endswith('\r\n') else '\n'
+        self.calculated_start = self._block_start("Calculated results")
+        self.fluorescence_start = self._block_start("Results for Fluorescein")
+
+    def _block_start(self, title):
+        """Index of the first data row (A) of the block under `title`"""
+        for i, line in enumerate(self.lines):
+            if line.startswith(title):
+                return i + 2
+        raise ValueError(f"Template has no '{title}' section")
+
+    def _block_lines(self, block, fmt):
+        """Column header row plus one line per plate row, in the block's plate format"""
+        geometry = geometry_for_shape(block.shape)
+        rows = [f",{','.join(f'{col:02d}' for col in range(1, geometry.cols + 1))},{self.newline}"]
+        for label, values in zip(geometry.row_labels, block):
+            cells = ['' if np.isnan(v) else fmt(v) for v in values]
+            rows.append(f"{label},{','.join(cells)},{self.newline}")
+        return rows
+
+    def render(self, plate, assay_id, started):
+        """Export text for one RFU plate (any plate format - the template's 384-well blocks are replaced)"""
+        lines = list(self.lines)
+        template_rows = DEFAULT_GEOMETRY.rows
+        # Later block first, so the earlier block's line numbers stay valid
+        lines[self.fluorescence_start - 1:self.fluorescence_start + template_rows] = \
+            self._block_lines(plate, lambda v: str(int(v)))
+        lines[self.calculated_start - 1:self.calculated_start + template_rows] = \
+            self._block_lines(_calculated_block(plate), lambda v: f"{v:.11f}")
+
+        timestamps = {'Assay Started': started, 'Assay Finished': started + timedelta(seconds=57),
+                      'Assay Exported': started + timedelta(minutes=15)}
+        for i, line in enumerate(lines):
+            key = line.split(',', 1)[0].rstrip(': ')
+            if key == 'Assay ID':
+                lines[i] = f"Assay ID: ,,,,{assay_id}{self.newline}"
+            elif key in timestamps:
+                stamp = timestamps[key]
+                lines[i] = f"{key}: ,,,,{stamp.month}/{stamp.day}/{stamp.year} {stamp.strftime('%I:%M:%S %p').lstrip('0')}{self.newline}"
+        return ''.join(lines)
+
+def write_synthetic_exports(output_dir, handler_type, n_plates, seed=0, template=None, geometry=DEFAULT_GEOMETRY):
+    """Write `n_plates` synthetic exports for `handler_type`; returns (plate files, standard curve file)"""
+    template = template or ExportTemplate()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 7, 16, 15, 20, 58)
+    slug = handler_type.replace(' - ', '')
+
+    files = []
+    for i in range(n_plates):
+        plate_file = output_dir / f"{slug}_{i:05d}.csv"
+        with open(plate_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(template.render(synthetic_plate(handler_type, rng, geometry=geometry), 10000 + i,
+                                    start + timedelta(hours=i)))
+        files.append(plate_file)
+
+    std_curve_file = None
+    if get_handler(handler_type).separate_standard_curve:
+        # Bravo 384 plates are fully dispensed - the curve comes from a separate standards plate
+        std_curve_file = output_dir / f"{slug}_standard_curve.csv"
+        with open(std_curve_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(template.render(synthetic_plate("Tempest", rng, geometry=geometry), 9999, start))
+    return files, std_curve_file
+
+def _make_analyzer(handler_type, geometry=DEFAULT_GEOMETRY):
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.standard_concentrations = list(STANDARD_CONCENTRATIONS)
+    analyzer.target_concentration = TARGET_CONCENTRATION
+    analyzer.liquid_handler = handler_type
+    analyzer.chip_configurations = default_chip_configurations(handler_type, geometry)
+    return analyzer
+
+def _run_stages(analyzer, plate_file, std_curve_file, plots_dir, timings, memory=None):
+    """Run one plate through every stage, adding wall times to `timings`"""
+    stages = (
+        ('load', lambda: analyzer.load_and_clean_data(str(plate_file), std_curve_file and str(std_curve_file))),
+        ('curve', analyzer.build_standard_curve),
+        ('concentrations', analyzer.calculate_concentrations),
+        ('qc', analyzer.calculate_qc_metrics),
+        ('output', lambda: analyzer.generate_output_file(str(plate_file))),
+        ('plots', lambda: analyzer.generate_plots(plots_dir, str(plate_file), plot_format='preview', workers=1)),
+    )
+    for stage, run in stages:
+        if stage == 'plots' and plots_dir is None:
+            continue
+        if memory is not None:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        if run() is False:
+            raise RuntimeError(f"{stage} failed for {plate_file}")
+        timings[stage] += time.perf_counter() - start
+        if memory is not None:
+            memory[stage] = tracemalloc.get_traced_memory()[1] / 1e6
+
+def benchmark_handler(handler_type, n_plates, work_dir, plot_plates=3, seed=0, geometry=DEFAULT_GEOMETRY):
+    """Benchmark one handler type at one plate count on one plate format"""
+    plate_dir = Path(work_dir) / f"{handler_type.replace(' - ', '')}_{geometry.name}_{n_plates}"
+    start = time.perf_counter()
+    files, std_curve_file = write_synthetic_exports(plate_dir, handler_type, n_plates, seed, geometry=geometry)
+    generate_s = time.perf_counter() - start
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    stacks = []
+    curves = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Peak Python heap per stage, measured on one plate (tracemalloc would distort the timings)
+        memory = {}
+        tracemalloc.start()
+        try:
+            _run_stages(_make_analyzer(handler_type, geometry), files[0], std_curve_file, plate_dir if plot_plates else None,
+                        dict.fromkeys(STAGES, 0.0), memory)
+        finally:
+            tracemalloc.stop()
+
+        for i, plate_file in enumerate(files):
+            analyzer = _make_analyzer(handler_type, geometry)
+            _run_stages(analyzer, plate_file, std_curve_file, plate_dir if i < plot_plates else None, timings)
+            stacks.append(analyzer.fluorescence_data.to_numpy(dtype=float))
+            curves.append(analyzer.standard_curve_data['fluorescence'].to_numpy(dtype=float))
+        params = analyzer.standard_curve_params
+
+    # The same plates through the stacked (N, rows, cols) engines
+    stack = np.stack(stacks)
+    start = time.perf_counter()
+    concentration_stack = calculate_concentrations_batch(stack, params)
+    stack_concentrations_s = time.perf_counter() - start
+    start = time.perf_counter()
+    calculate_qc_table(concentration_stack,
+                       compile_group_index(default_chip_configurations(handler_type, geometry), geometry),
+                       TARGET_CONCENTRATION)
+    stack_qc_s = time.perf_counter() - start
+    start = time.perf_counter()
+    fit_standard_curves(np.stack(curves), analyzer.standard_curve_data['concentration'].to_numpy(dtype=float),
+                        AUTO_MODEL)
+    stack_curve_fit_s = time.perf_counter() - start
+
+    stage_results = {}
+    for stage in STAGES:
+        count = min(n_plates, plot_plates) if stage == 'plots' else n_plates
+        stage_results[stage] = {
+            'total_s': timings[stage],
+            'per_plate_ms': 1000 * timings[stage] / count if count else None,
+            'plates': count,
+            'peak_heap_mb': memory.get(stage),
+        }
+    return {
+        'handler_type': handler_type,
+        'plate_format': geometry.name,
+        'n_plates': n_plates,
+        'generate_s': generate_s,
+        'stages': stage_results,
+        'pipeline_per_plate_ms': sum(stage_results[s]['per_plate_ms'] for s in STAGES if s != 'plots'),
+        'stack': {
+            'concentrations_s': stack_concentrations_s,
+            'qc_s': stack_qc_s,
+            'curve_fit_auto_s': stack_curve_fit_s,  # Every qc_curve model on every plate's curve
+            'per_plate_ms': 1000 * (stack_concentrations_s + stack_qc_s) / n_plates,
+        },
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmarks(handlers=LIQUID_HANDLERS, plate_counts=(1, 100), plot_plates=3, work_dir=None, label=None,
+                   plate_formats=(DEFAULT_GEOMETRY.name,)):
+    """Run the suite and return the JSON-ready report"""
+    report = {
+        'label': label,
+        'revision': _git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        for plate_format in plate_formats:
+            for handler_type in handlers:
+                for n_plates in plate_counts:
+                    result = benchmark_handler(handler_type, n_plates, tmp_dir, plot_plates,
+                                               geometry=GEOMETRIES[plate_format])
+                    report['results'].append(result)
+                    print(f"{handler_type:<12} {plate_format:>4} {n_plates:>6} plates: "
+                          f"{result['pipeline_per_plate_ms']:8.2f} ms/plate pipeline, "
+                          f"{result['stack']['per_plate_ms']:8.4f} ms/plate stacked, "
+                          f"peak RSS {result['peak_rss_mb'] or 0:.0f} MB")
+    return report
+
+def compare_reports(report, baseline, threshold=1.2, min_delta_ms=0.1):
+    """Per-plate stage times relative to a baseline report; returns the regressions
+
+    A stage regresses when it is `threshold` times slower and at least
+    `min_delta_ms` slower per plate (sub-millisecond stages are mostly timer noise).
+    """
+    def key(result):
+        return result['handler_type'], result.get('plate_format', DEFAULT_GEOMETRY.name), result['n_plates']
+
+    baseline_results = {key(r): r for r in baseline['results']}
+    regressions = []
+    print(f"\nComparison with {baseline.get('label') or baseline.get('revision') or 'baseline'}:")
+    for result in report['results']:
+        previous = baseline_results.get(key(result))
+        if previous is None:
+            continue
+        for stage in STAGES:
+            new_ms = result['stages'][stage]['per_plate_ms']
+            old_ms = previous['stages'].get(stage, {}).get('per_plate_ms')
+            if not new_ms or not old_ms:
+                continue
+            ratio = new_ms / old_ms
+            flag = "  REGRESSION" if ratio > threshold and new_ms - old_ms >= min_delta_ms else ""
+            print(f"  {result['handler_type']:<12} {result['n_plates']:>6} {stage:<15} "
+                  f"{old_ms:9.3f} -> {new_ms:9.3f} ms ({ratio:5.2f}x){flag}")
+            if flag:
+                regressions.append((result['handler_type'], result['n_plates'], stage, ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Dispenser QC Analyzer on synthetic plates')
+    parser.add_argument('--plates', default='1,100',
+                       help='Comma-separated plate counts (default: 1,100; e.g. 1,100,10000 for the full suite)')
+    parser.add_argument('--handlers', default=','.join(LIQUID_HANDLERS),
+                       help='Comma-separated liquid handler types (default: all)')
+    parser.add_argument('--plate-formats', default=DEFAULT_GEOMETRY.name,
+                       help=f"Comma-separated plate formats ({', '.join(GEOMETRIES)}; default: {DEFAULT_GEOMETRY.name})")
+    parser.add_argument('--plot-plates', type=int, default=3,
+                       help='Plates per run that also go through plot rendering (default: 3)')
+    parser.add_argument('--output', '-o', help='JSON results file (default: benchmark_results/<timestamp>.json)')
+    parser.add_argument('--label', help='Label stored with the results, e.g. a version name')
+    parser.add_argument('--compare', metavar='JSON', help='Compare against an earlier results file')
+    parser.add_argument('--work-dir', help='Directory for the synthetic exports (default: system temp)')
+    args = parser.parse_args()
+
+    handlers = [h.strip() for h in args.handlers.split(',')]
+    unknown = [h for h in handlers if h not in LIQUID_HANDLERS]
+    if unknown:
+        print(f"Error: Unknown liquid handler(s): {', '.join(unknown)}")
+        sys.exit(1)
+    plate_formats = [f.strip() for f in args.plate_formats.split(',')]
+    unknown = [f for f in plate_formats if f not in GEOMETRIES]
+    if unknown:
+        print(f"Error: Unknown plate format(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    report = run_benchmarks(handlers, [int(n) for n in args.plates.split(',')], args.plot_plates,
+                            args.work_dir, args.label, plate_formats)
+    output = Path(args.output or Path('benchmark_results') / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results saved: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(report, json.load(f))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for the Dispenser QC Analyzer tests (run with python -m pytest)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import shutil
+
+import pytest
+
+from qc_check import DispenserQCAnalyzerFixedBug, default_chip_configurations
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "example_data", "Tempest(4,5,6)_Test-1.csv")
+EXAMPLE_CONCENTRATIONS = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Curve and result caches in tmp_path - never the developer's ~/.qc_check, never a hit from an earlier run"""
+    monkeypatch.setenv('QC_CHECK_CACHE_DIR', str(tmp_path / "qc_cache"))
+    return tmp_path / "qc_cache"
+
+@pytest.fixture
+def example_file():
+    """The Tempest example export in example_data (read it, don't write next to it)"""
+    return EXAMPLE_FILE
+
+@pytest.fixture
+def plate_file(tmp_path):
+    """A copy of the example export in tmp_path, so the processed file and plots land there"""
+    csv_file = tmp_path / "plate.csv"
+    shutil.copy(EXAMPLE_FILE, csv_file)
+    return csv_file
+
+@pytest.fixture
+def make_analyzer():
+    """Analyzer factory set up for the example export: make_analyzer(handler, target, **attributes)"""
+    def make(handler='Tempest', target=60, **attributes):
+        analyzer = DispenserQCAnalyzerFixedBug()
+        analyzer.standard_concentrations = list(EXAMPLE_CONCENTRATIONS)
+        analyzer.target_concentration = target
+        analyzer.liquid_handler = handler
+        analyzer.chip_configurations = default_chip_configurations(handler)
+        for name, value in attributes.items():
+            setattr(analyzer, name, value)
+        return analyzer
+    return make
@@ -29,8 +29,10 @@ def create_executable():
     # Use correct path separator for OS
     if platform.system() == "Windows":
         data_path = "example_data;example_data"
+        handlers_path = "handlers.json;."
     else:
         data_path = "example_data:example_data"
+        handlers_path = "handlers.json:."
     
     cmd = [
         "pyinstaller",
@@ -38,6 +40,7 @@ def create_executable():
         "--windowed",                   # No console window (for GUI)
         "--name=DispenserQCAnalyzer",   # Executable name
         f"--add-data={data_path}",      # Include example data
+        f"--add-data={handlers_path}",  # Include the liquid handler registry
         "qc_check.py"
     ]
     
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Binary plate archive for the Dispenser QC Analyzer
+
+Re-analyzing months of plates - say with a new curve model - from the text
+exports means re-parsing every file. A PlateArchive keeps the raw RFU of
+every imported plate in a compact binary layout on local disk instead:
+
+    index.csv       one row per plate: plate id, plate format, slot, source
+                    file (path, size, mtime) and the assay metadata (assay ID,
+                    instrument serial number, protocol, assay timestamps)
+    rfu_384.f32     float32 RFU of every plate of one format, shaped
+                    (slots, rows, cols) in C order, appended slot by slot
+
+The RFU files are memory-mapped read-only, so analyze_archive streams over
+millions of wells one chunk of plates at a time through the analyzer's own
+vectorized engines (standard curves, concentrations, QC table) while only
+that chunk is in memory. Reader RFU are integers, exact in float32 up to
+16.7 million.
+
+    python qc_archive.py import ARCHIVE exports/          # new exports only
+    python qc_archive.py list ARCHIVE
+    python qc_archive.py analyze ARCHIVE --curve-model auto -o requalified.csv
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_cache import file_identity
+from qc_check import (DEFAULT_HANDLER, LIQUID_HANDLERS, OUTLIER_SCOPES, apply_standard_curve, calculate_qc_table,
+                      collect_batch_files, compile_group_index, default_chip_configurations, parse_plate_export,
+                      reduce_standard_replicates, spatial_qc_table, standard_replicates)
+from qc_curve import AUTO_MODEL, CURVE_MODELS, fit_standard_curves
+from qc_geometry import DEFAULT_GEOMETRY, geometry_by_name, geometry_for_shape
+from qc_handlers import get_handler
+from qc_logging import INTERACTIVE_LEVELS, configure_logging
+from qc_outliers import DEFAULT_ALPHA, OUTLIER_METHODS, check_outlier_alpha
+from qc_spatial import SPATIAL_COLUMNS, SPATIAL_METHODS
+
+log = logging.getLogger('qc_check.archive')
+
+INDEX_FILE = 'index.csv'
+RFU_DTYPE = np.float32
+CHUNK_PLATES = 256  # Plates per streamed chunk (and per import flush)
+MIN_STANDARD_WELLS = 8
+TEXT_COLUMNS = ('plate_format', 'source_file', 'imported_at', 'assay_id', 'serial_number', 'protocol_id',
+                'protocol_name', 'assay_started', 'assay_finished', 'assay_exported')
+INDEX_COLUMNS = ('plate', 'plate_format', 'slot', 'source_file', 'file_size', 'file_mtime_ns', 'imported_at',
+                 'assay_id', 'serial_number', 'protocol_id', 'protocol_name', 'assay_started', 'assay_finished',
+                 'assay_exported')
+
+class PlateArchive:
+    """Memory-mapped float32 RFU plates plus a metadata index, in one directory
+
+    Plates are only ever appended; the index is rewritten atomically after
+    the RFU bytes are on disk, so readers never see an entry without its data.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._index = None
+        self._maps = {}  # plate format -> read-only memmap
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def index(self):
+        """One row per archived plate (INDEX_COLUMNS)"""
+        if self._index is None:
+            index_file = self.path / INDEX_FILE
+            if index_file.exists():
+                self._index = pd.read_csv(index_file, dtype={column: str for column in TEXT_COLUMNS})
+            else:
+                self._index = pd.DataFrame({column: pd.Series(dtype=str if column in TEXT_COLUMNS else 'int64')
+                                            for column in INDEX_COLUMNS})
+        return self._index
+
+    def _rfu_file(self, geometry):
+        return self.path / f"rfu_{geometry.name}.f32"
+
+    def _n_slots(self, geometry):
+        rfu_file = self._rfu_file(geometry)
+        plate_bytes = geometry.n_wells * np.dtype(RFU_DTYPE).itemsize
+        return rfu_file.stat().st_size // plate_bytes if rfu_file.exists() else 0
+
+    def plates(self, plate_format=DEFAULT_GEOMETRY.name):
+        """Read-only memory map of every plate of one format, shaped (slots, rows, cols)"""
+        geometry = geometry_by_name(str(plate_format))
+        n_slots = self._n_slots(geometry)
+        if n_slots == 0:
+            return np.zeros((0, *geometry.shape), dtype=RFU_DTYPE)
+        rfu_map = self._maps.get(geometry.name)
+        if rfu_map is None or len(rfu_map) != n_slots:
+            rfu_map = np.memmap(self._rfu_file(geometry), dtype=RFU_DTYPE, mode='r', shape=(n_slots, *geometry.shape))
+            self._maps[geometry.name] = rfu_map
+        return rfu_map
+
+    def plate(self, plate_id):
+        """RFU of one archived plate as a float array (empty wells NaN)"""
+        entry = self.index.loc[self.index['plate'] == plate_id]
+        if entry.empty:
+            raise KeyError(f"Plate {plate_id} is not in the archive")
+        entry = entry.iloc[0]
+        return np.asarray(self.plates(entry['plate_format'])[int(entry['slot'])], dtype=float)
+
+    def add_plates(self, plates, metadata=None):
+        """Append RFU plates (any known format) with one metadata dict each; returns their plate ids"""
+        metadata = metadata or [{}] * len(plates)
+        index = self.index
+        next_plate = int(index['plate'].max()) + 1 if len(index) else 1
+        next_slot = {}
+        rows = []
+        handles = {}
+        try:
+            for plate, info in zip(plates, metadata):
+                plate = np.asarray(plate, dtype=RFU_DTYPE)
+                geometry = geometry_by_name(info['plate_format']) if info.get('plate_format') \
+                    else geometry_for_shape(plate.shape)
+                if geometry.name not in handles:
+                    next_slot[geometry.name] = self._n_slots(geometry)
+                    handles[geometry.name] = open(self._rfu_file(geometry), 'ab')
+                handles[geometry.name].write(np.ascontiguousarray(plate).tobytes())
+                rows.append({**{column: info.get(column) for column in INDEX_COLUMNS},
+                             'plate': next_plate, 'plate_format': geometry.name, 'slot': next_slot[geometry.name],
+                             'imported_at': info.get('imported_at') or datetime.now().isoformat(timespec='seconds')})
+                next_plate += 1
+                next_slot[geometry.name] += 1
+            for handle in handles.values():
+                handle.flush()
+                os.fsync(handle.fileno())
+        finally:
+            for handle in handles.values():
+                handle.close()
+        if rows:
+            added = pd.DataFrame(rows, columns=list(INDEX_COLUMNS))
+            self._index = pd.concat([index, added], ignore_index=True) if len(index) else added
+            self._save_index()
+        return [row['plate'] for row in rows]
+
+    def _save_index(self):
+        index_file = self.path / INDEX_FILE
+        tmp_file = index_file.with_name(f".{index_file.name}.{os.getpid()}.tmp")
+        self._index.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, index_file)
+
+    def import_exports(self, csv_files, skip_existing=True):
+        """Parse plate-reader exports into the archive; returns the new plate ids
+
+        Files already archived with the same path, size and modification time
+        are skipped, as are unreadable exports (logged as warnings).
+        """
+        index = self.index
+        known = set(zip(index['source_file'], index['file_size'].tolist(), index['file_mtime_ns'].tolist())) \
+            if skip_existing else set()
+        plate_ids, plates, metadata = [], [], []
+        for csv_file in csv_files:
+            source_file, file_size, file_mtime_ns = file_identity(csv_file)
+            if (source_file, file_size, file_mtime_ns) in known:
+                log.debug("Already archived: %s", csv_file)
+                continue
+            try:
+                export = parse_plate_export(csv_file)
+                if export.fluorescence is None:
+                    raise ValueError("Could not find fluorescence data section")
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                log.warning("Skipped %s: %s", csv_file, e)
+                continue
+            known.add((source_file, file_size, file_mtime_ns))
+            plates.append(export.fluorescence)
+            metadata.append({'plate_format': export.geometry.name, 'source_file': source_file, 'file_size': file_size,
+                             'file_mtime_ns': file_mtime_ns, **export.assay_metadata()})
+            if len(plates) == CHUNK_PLATES:
+                plate_ids.extend(self.add_plates(plates, metadata))
+                plates, metadata = [], []
+        plate_ids.extend(self.add_plates(plates, metadata))
+        log.info("Archived %d new plate(s) - %d in total", len(plate_ids), len(self))
+        return plate_ids
+
+def _plate_curves(rfu, geometry, handler, concentrations, curve_model, outlier_method, outlier_alpha):
+    """Standard curve params per plate of an (N, rows, cols) chunk, None where no curve can be fitted"""
+    replicates = standard_replicates(rfu, geometry, handler.standard_cols)
+    medians, _ = reduce_standard_replicates(replicates, outlier_method, alpha=outlier_alpha)
+    curves = fit_standard_curves(medians, concentrations[:medians.shape[-1]], curve_model)
+    n_found = (~np.isnan(replicates)).sum(axis=(1, 2))
+    return [curve if found >= MIN_STANDARD_WELLS and np.all(np.isfinite(curve['coefficients'])) else None
+            for curve, found in zip(curves, n_found)]
+
+def analyze_archive(archive, standard_concentrations, target_concentration, handler_type=DEFAULT_HANDLER,
+                    chip_configurations=None, curve_model='linear', std_curve_file=None, plate_ids=None,
+                    outlier_method=None, outlier_scope='both', outlier_alpha=DEFAULT_ALPHA, spatial_method=None,
+                    chunk_size=CHUNK_PLATES):
+    """QC table of archived plates, streamed from the memory maps `chunk_size` plates at a time
+
+    Returns one row per (plate, group): the calculate_qc_table columns with
+    `plate` as the archive plate id, plus source_file, assay_id, assay_started,
+    curve_model and r_squared. Every plate gets its own standard curve from
+    its standard wells - or the curve of std_curve_file for handlers with a
+    separate standards plate. Plates without a usable curve are skipped with
+    a warning. Without chip_configurations each format uses the handler's
+    default chip. With a spatial_method (see qc_spatial) every plate also gets
+    row_gradient, col_gradient and edge_effect columns and each group a
+    corrected_cv_percent.
+    """
+    handler = get_handler(handler_type)
+    index = archive.index if plate_ids is None else archive.index[archive.index['plate'].isin(plate_ids)]
+    concentrations = np.asarray(standard_concentrations, dtype=float)
+    standards_outliers = outlier_method if outlier_scope in ('both', 'standards') else None
+    sample_outliers = outlier_method if outlier_scope in ('both', 'samples') else None
+
+    shared_curve = None
+    if std_curve_file:
+        export = parse_plate_export(std_curve_file)
+        if export.fluorescence is None:
+            raise ValueError(f"Could not find fluorescence data section in {std_curve_file}")
+        shared_curve, = _plate_curves(export.fluorescence[np.newaxis], export.geometry, handler, concentrations,
+                                      curve_model, standards_outliers, outlier_alpha)
+        if shared_curve is None:
+            raise ValueError(f"No usable standard curve in {std_curve_file}")
+
+    tables = []
+    for plate_format, plates in index.groupby('plate_format', sort=False):
+        geometry = geometry_by_name(plate_format)
+        rfu_map = archive.plates(plate_format)
+        group_index = compile_group_index(chip_configurations or default_chip_configurations(handler_type, geometry),
+                                          geometry)
+        for start in range(0, len(plates), chunk_size):
+            chunk = plates.iloc[start:start + chunk_size]
+            rfu = np.asarray(rfu_map[chunk['slot'].to_numpy()], dtype=float)  # Only this chunk leaves the page cache
+            if shared_curve:
+                curves = [shared_curve] * len(chunk)
+            else:
+                curves = _plate_curves(rfu, geometry, handler, concentrations, curve_model, standards_outliers,
+                                       outlier_alpha)
+            usable = np.array([curve is not None for curve in curves], dtype=bool)
+            for plate_id, source_file in zip(chunk['plate'][~usable], chunk['source_file'][~usable]):
+                log.warning("Plate %s (%s): no usable standard curve - skipped", plate_id, source_file)
+            if not usable.any():
+                continue
+            curves = [curve for curve in curves if curve is not None]
+            concentration_stack = np.stack([apply_standard_curve(plate, curve)
+                                            for plate, curve in zip(rfu[usable], curves)])
+            table = calculate_qc_table(concentration_stack, group_index, target_concentration, sample_outliers,
+                                       alpha=outlier_alpha)
+            if spatial_method:
+                table, effects = spatial_qc_table(table, concentration_stack, group_index, target_concentration,
+                                                  spatial_method, sample_outliers, alpha=outlier_alpha)
+                for column in SPATIAL_COLUMNS:
+                    table[column] = effects[column].to_numpy()[table['plate'].to_numpy()]
+            local = table['plate'].to_numpy()  # Position among this chunk's usable plates
+            entries = chunk[usable]
+            table['plate'] = entries['plate'].to_numpy()[local]
+            for column in ('source_file', 'assay_id', 'assay_started'):
+                table[column] = entries[column].to_numpy()[local]
+            table['curve_model'] = np.array([curve['model'] for curve in curves], dtype=object)[local]
+            table['r_squared'] = np.array([curve['r_squared'] for curve in curves])[local]
+            tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+def main():
+    """Import exports into a plate archive, list it, or re-analyze it"""
+    parser = argparse.ArgumentParser(description='Binary plate archive for re-analyzing historical runs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help='Import plate-reader CSV exports (new files only)')
+    import_parser.add_argument('archive', help='Archive directory')
+    import_parser.add_argument('exports', nargs='+', help='CSV exports, directories or glob patterns')
+    list_parser = commands.add_parser('list', help='Show the archived plates')
+    list_parser.add_argument('archive', help='Archive directory')
+    analyze_parser = commands.add_parser('analyze', help='Re-run QC on archived plates')
+    analyze_parser.add_argument('archive', help='Archive directory')
+    analyze_parser.add_argument('--concentrations', '-c', default='600,300,150,75,37.5,18.75,9.375,4.6875',
+                                help='Standard curve concentrations (comma-separated)')
+    analyze_parser.add_argument('--target', '-t', type=float, default=75.0, help='Target concentration')
+    analyze_parser.add_argument('--handler', choices=LIQUID_HANDLERS, default=DEFAULT_HANDLER,
+                                help=f'Liquid handler type (default: {DEFAULT_HANDLER})')
+    analyze_parser.add_argument('--std-curve-file', metavar='FILE',
+                                help='Separate standard curve CSV file (Bravo - 384)')
+    analyze_parser.add_argument('--curve-model', choices=[*CURVE_MODELS, AUTO_MODEL], default='linear',
+                                help='Standard curve model (default: linear)')
+    analyze_parser.add_argument('--outliers', choices=OUTLIER_METHODS, default=None,
+                                help='Reject outlier wells before averaging (default: off)')
+    analyze_parser.add_argument('--outlier-scope', choices=OUTLIER_SCOPES, default='both',
+                                help='Screen the standard triplicates, the nozzle groups, or both (default: both)')
+    analyze_parser.add_argument('--outlier-alpha', type=float, default=DEFAULT_ALPHA,
+                                help='Significance level for the Grubbs and Dixon tests (default: 0.05)')
+    analyze_parser.add_argument('--spatial', choices=SPATIAL_METHODS, default=None,
+                                help='Add per-plate row/column/edge effects and a spatially corrected %%CV '
+                                     '(default: off)')
+    analyze_parser.add_argument('--start', help='First assay date (YYYY-MM-DD)')
+    analyze_parser.add_argument('--end', help='Last assay date (YYYY-MM-DD)')
+    analyze_parser.add_argument('--output', '-o', help='Write the QC table to a CSV file instead of stdout')
+    args = parser.parse_args()
+    if args.command == 'analyze':
+        try:
+            check_outlier_alpha(args.outliers, args.outlier_alpha)
+        except ValueError as e:
+            parser.error(str(e))
+    configure_logging(INTERACTIVE_LEVELS)
+
+    if args.command != 'import' and not (Path(args.archive) / INDEX_FILE).exists():
+        print(f"Error: Plate archive not found: {args.archive}")
+        sys.exit(1)
+    archive = PlateArchive(args.archive)
+    if args.command == 'import':
+        csv_files = sorted({csv_file for pattern in args.exports
+                            for csv_file in ([pattern] if os.path.isfile(pattern) else collect_batch_files(pattern))})
+        archive.import_exports(csv_files)
+    elif args.command == 'list':
+        print(archive.index.to_string(index=False))
+        print(f"\n{len(archive)} plates: " + ', '.join(f"{n} x {plate_format} wells" for plate_format, n
+                                                         in archive.index['plate_format'].value_counts().items()))
+    else:
+        index = archive.index
+        dates = index['assay_started'].fillna(index['imported_at'])
+        selected = pd.Series(True, index=index.index)
+        if args.start:
+            selected &= dates >= args.start
+        if args.end:
+            selected &= dates <= (args.end + 'T23:59:59' if len(args.end) == 10 else args.end)
+        try:
+            table = analyze_archive(archive, [float(x) for x in args.concentrations.split(',')], args.target,
+                                    args.handler, curve_model=args.curve_model, std_curve_file=args.std_curve_file,
+                                    plate_ids=index['plate'][selected].tolist(), outlier_method=args.outliers,
+                                    outlier_scope=args.outlier_scope, outlier_alpha=args.outlier_alpha,
+                                    spatial_method=args.spatial)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if args.output:
+            table.to_csv(args.output, index=False)
+            print(f"{len(table)} rows from {table['plate'].nunique() if len(table) else 0} plates saved: {args.output}")
+        else:
+            print(table.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
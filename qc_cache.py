@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Caches for the Dispenser QC Analyzer: on-disk standard curves, on-disk
+whole-analysis results and the in-memory stage cache used for incremental
+re-analysis
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+def default_cache_dir():
+    """Cache root: $QC_CHECK_CACHE_DIR, read when a cache is opened, or ~/.qc_check/cache"""
+    return Path(os.environ.get('QC_CHECK_CACHE_DIR') or Path.home() / '.qc_check' / 'cache')
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_json_atomic(path, data):
+    """Write JSON via a temp file + rename so concurrent readers never see partial files"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _json_value(value):
+    """Convert NumPy scalars/arrays to plain JSON types"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return value
+
+def _json_default(value):
+    """json.dumps fallback: NumPy values via tolist(), other objects by their str()"""
+    return _json_value(value) if hasattr(value, 'tolist') else str(value)
+
+class StandardCurveCache:
+    """Persistent cache of extracted standard-curve medians and fitted parameters
+
+    Entries are keyed by the curve file's content hash plus the standard
+    concentration list, so one curve plate can serve a whole batch of Bravo 384
+    sample plates without being re-read or re-fitted. Curves can also be saved
+    under a name and reused without the original file.
+    """
+    def __init__(self, cache_dir=None, max_entries=200, max_age_days=90):
+        self.cache_dir = Path(cache_dir or default_cache_dir()) / 'curves'
+        self.names_dir = self.cache_dir / 'named'
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+
+    @staticmethod
+    def make_key(std_curve_file, standard_concentrations, variant=None):
+        """Cache key: file content hash + the concentrations the curve is fitted against
+        
+        `variant` distinguishes curves extracted differently from the same file
+        (e.g. with outlier rejection of the standards).
+        """
+        concentrations = ','.join(repr(float(c)) for c in standard_concentrations)
+        key = f"{file_sha256(std_curve_file)}|{concentrations}"
+        if variant:
+            key += f"|{variant}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached entry for `key`, or None"""
+        path = self._entry_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_days * 86400:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # Track last use for eviction
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def get_named(self, name):
+        """Return the entry saved under `name`, or None"""
+        try:
+            with open(self.names_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+                key = json.load(f)['key']
+        except (OSError, ValueError, KeyError):
+            return None
+        return self.get(key)
+
+    def put(self, key, standard_curve_data, standard_curve_params, standard_concentrations,
+            source_file=None, name=None, excluded_wells=None):
+        """Store a curve (DataFrame with concentration/fluorescence), its fitted params and rejected standard wells"""
+        entry = {
+            'key': key,
+            'created': time.time(),
+            'source_file': str(Path(source_file).resolve()) if source_file else None,
+            'standard_concentrations': [float(c) for c in standard_concentrations],
+            'concentration': [float(c) for c in standard_curve_data['concentration']],
+            'fluorescence': [float(f) for f in standard_curve_data['fluorescence']],
+            'standard_curve_params': {k: _json_value(v) for k, v in standard_curve_params.items()},
+            'excluded_wells': list(excluded_wells or []),
+        }
+        self.names_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self._entry_path(key), entry)
+        if name:
+            self.save_name(name, key)
+        self.evict()
+        return entry
+
+    def save_name(self, name, key):
+        """Point `name` at an existing cache entry"""
+        self.names_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.names_dir / f"{name}.json", {'key': key, 'saved': time.time()})
+
+    def evict(self):
+        """Drop entries unused for max_age_days, then the least recently used beyond max_entries"""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_days * 86400:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, path))
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            path.unlink(missing_ok=True)
+
+class ResultCache:
+    """Persistent cache of finished analyses: QC results, the processed CSV and the plots
+
+    Entries are keyed by the content hash of the plate (and standard curve)
+    file plus every setting that changes the results, so a batch re-run over
+    an unchanged folder restores each plate's outputs instead of re-parsing,
+    re-fitting and re-plotting it. Each entry is a directory holding
+    entry.json, processed.csv, the plot files and any exported tables; the least recently used
+    entries beyond max_entries are dropped.
+    """
+    ENTRY_FILE = 'entry.json'
+    OUTPUT_FILE = 'processed.csv'
+    PLOTS_DIR = 'plots'
+    EXPORTS_DIR = 'exports'
+
+    def __init__(self, cache_dir=None, max_entries=200):
+        self.cache_dir = Path(cache_dir or default_cache_dir()) / 'results'
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(csv_file, std_curve_file, settings):
+        """Cache key: input file content hashes + the analysis settings (JSON-compatible values)"""
+        inputs = [file_sha256(csv_file), file_sha256(std_curve_file) if std_curve_file else None]
+        encoded = json.dumps([inputs, settings], sort_keys=True, default=_json_default)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return self.cache_dir / key
+
+    def get(self, key):
+        """Return the cached entry for `key` (with output_file, plot_files and export_files paths in the cache), or None"""
+        entry_dir = self._entry_dir(key)
+        entry_file = entry_dir / self.ENTRY_FILE
+        try:
+            with open(entry_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(entry_file)  # Track last use for eviction
+        except (OSError, ValueError):
+            return None
+        entry['output_file'] = str(entry_dir / self.OUTPUT_FILE)
+        entry['plot_files'] = [str(entry_dir / self.PLOTS_DIR / name) for name in entry.get('plots', [])]
+        entry['export_files'] = [str(entry_dir / self.EXPORTS_DIR / name) for name in entry.get('exports', [])]
+        if not all(os.path.exists(path) for path in [entry['output_file'], *entry['plot_files'], *entry['export_files']]):
+            return None
+        return entry
+
+    def put(self, key, results, output_file, plot_files=(), export_files=()):
+        """Store a finished analysis: `results` (JSON-compatible dict), the processed CSV, plots and exported tables"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        (tmp_dir / self.PLOTS_DIR).mkdir(parents=True)
+        (tmp_dir / self.EXPORTS_DIR).mkdir()
+        try:
+            shutil.copyfile(output_file, tmp_dir / self.OUTPUT_FILE)
+            for plot_file in plot_files:
+                shutil.copyfile(plot_file, tmp_dir / self.PLOTS_DIR / Path(plot_file).name)
+            for export_file in export_files:
+                shutil.copyfile(export_file, tmp_dir / self.EXPORTS_DIR / Path(export_file).name)
+            entry = json.loads(json.dumps({'key': key, 'created': time.time(), 'plots': [Path(f).name for f in plot_files],
+                                           'exports': [Path(f).name for f in export_files], **results},
+                                          default=_json_default))
+            _write_json_atomic(tmp_dir / self.ENTRY_FILE, entry)
+            entry_dir = self._entry_dir(key)
+            shutil.rmtree(entry_dir, ignore_errors=True)  # Replaced on a forced re-run
+            os.replace(tmp_dir, entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+        return entry
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        entries = []
+        for entry_file in self.cache_dir.glob(f'*/{self.ENTRY_FILE}'):
+            try:
+                entries.append((entry_file.stat().st_mtime, entry_file.parent))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        for _, entry_dir in entries[self.max_entries:]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+def file_identity(file_path):
+    """Cheap identity of an input file for the stage cache: resolved path, size and modification time"""
+    if not file_path:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return [str(file_path), None, None]  # Missing file - the stage runs and reports the error
+    return [str(Path(file_path).resolve()), stat.st_size, stat.st_mtime_ns]
+
+class StageCache:
+    """In-memory results of the last run's pipeline stages, each tagged with a fingerprint of its inputs
+
+    Callers build each stage's fingerprint from the previous stage's
+    fingerprint plus the stage's own inputs, so a changed input invalidates
+    exactly that stage and everything downstream of it.
+    """
+    def __init__(self):
+        self._entries = {}  # stage -> (fingerprint, state)
+
+    @staticmethod
+    def fingerprint(*parts):
+        """Stable hash of JSON-compatible inputs (NumPy values via tolist(), other objects by their str())"""
+        encoded = json.dumps(parts, sort_keys=True, default=_json_default)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+
+    def get(self, stage, fingerprint):
+        """The state stored for `stage` if it was computed from the same inputs, else None"""
+        entry = self._entries.get(stage)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        return None
+
+    def put(self, stage, fingerprint, state):
+        self._entries[stage] = (fingerprint, state)
+
+    def clear(self):
+        self._entries.clear()
@@ -1,27 +1,741 @@
 import pandas as pd
 import numpy as np
-import tkinter as tk
-from tkinter import filedialog, messagebox, simpledialog
 import os
 from pathlib import Path
-import matplotlib.pyplot as plt
-from scipy import stats
 import warnings
 import argparse
 import sys
+import filecmp
+import shutil
+import glob
+import functools
+import logging
+import multiprocessing
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from qc_cache import ResultCache, StageCache, StandardCurveCache, file_identity
+from qc_geometry import DEFAULT_GEOMETRY, MAX_COLS, geometry_for_columns, geometry_for_shape
+from qc_handlers import DEFAULT_HANDLER, HANDLERS, get_handler
+from qc_curve import AUTO_MODEL, CURVE_MODELS, LINEAR_MODELS, curve_equation, evaluate_curve, fit_standard_curve
+from qc_outliers import (DEFAULT_ALPHA, DIXON_MAX_GROUP, MIN_GROUP_SIZE, OUTLIER_METHODS, check_outlier_alpha,
+                         detect_outliers, flag_grouped_outliers)
+from qc_spatial import SPATIAL_COLUMNS, SPATIAL_METHODS, fit_spatial_effects
+from qc_spc import DEFAULT_BASELINE_RUNS, ControlChartStore, describe_violation
+from qc_store import ResultStore
+from qc_profile import NULL_PROFILER, Profiler
+from qc_logging import (INTERACTIVE_LEVELS, QUIET_LEVELS, capture_errors, configure_logging, ensure_logging,
+                        logging_configured, plate_context)
 warnings.filterwarnings('ignore')
 
+# One logger per pipeline area so levels can be set per area (see qc_logging)
+log = logging.getLogger('qc_check')
+load_log = logging.getLogger('qc_check.load')
+curve_log = logging.getLogger('qc_check.curve')
+qc_log = logging.getLogger('qc_check.qc')
+output_log = logging.getLogger('qc_check.output')
+summary_log = logging.getLogger('qc_check.summary')
+batch_log = logging.getLogger('qc_check.batch')
+watch_log = logging.getLogger('qc_check.watch')
+spc_log = logging.getLogger('qc_check.spc')
+
+OUTLIER_SCOPES = ('both', 'standards', 'samples')
+ANALYZER_VERSION = '1.0'  # Part of the result-cache key - bump when a change alters results or outputs
+# Pipeline stages reported to DispenserQCAnalyzerFixedBug.progress_callback, with their GUI labels
+PIPELINE_STAGES = {
+    'load': "Loading data",
+    'curve': "Standard curve",
+    'concentrations': "Concentrations",
+    'qc': "QC metrics",
+    'output': "Output file",
+    'plots': "Plots",
+}
+
+def standard_replicates(fluorescence, geometry=DEFAULT_GEOMETRY, standard_cols=None):
+    """RFU of the standard wells shaped (..., 8, 3) - one plate or an (N, rows, cols) stack
+    
+    standard_cols are the 0-based replicate columns (default: the geometry's,
+    columns 1-3). Empty and non-positive wells are NaN.
+    """
+    plate = np.asarray(fluorescence, dtype=float)
+    standard_cols = geometry.standard_cols if standard_cols is None else standard_cols
+    replicates = plate[..., list(geometry.standard_rows), :][..., list(standard_cols)]
+    with np.errstate(invalid='ignore'):
+        return np.where(replicates > 0, replicates, np.nan)
+
+def reduce_standard_replicates(replicates, outlier_method=None, **outlier_options):
+    """Median RFU per standard level, after optional outlier rejection within each level
+    
+    Returns (medians shaped (..., 8), excluded mask shaped like `replicates`);
+    levels without a usable well are NaN.
+    """
+    replicates = np.asarray(replicates, dtype=float)
+    flat = replicates.reshape(-1, replicates.shape[-1])
+    if outlier_method:
+        excluded = detect_outliers(flat, outlier_method, **outlier_options)
+    else:
+        excluded = np.zeros(flat.shape, dtype=bool)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN levels
+        medians = np.nanmedian(np.where(excluded, np.nan, flat), axis=1)
+    return medians.reshape(replicates.shape[:-1]), excluded.reshape(replicates.shape)
+
+def apply_standard_curve(rfu, standard_curve_params):
+    """Convert fluorescence (RFU) to concentration using the standard curve.
+    
+    Works on any array shape - a single (16, 24) plate or an (N, 16, 24) stack.
+    Wells that are NaN or non-positive are passed through unchanged. Non-linear
+    models (see qc_curve) give NaN for wells outside the curve's range.
+    """
+    rfu = np.asarray(rfu, dtype=float)
+    concentrations = rfu.copy()
+    mask = rfu > 0  # NaN compares False, so empty wells are left untouched
+    if standard_curve_params.get('model', 'linear') not in LINEAR_MODELS:
+        concentrations[mask] = evaluate_curve(standard_curve_params, rfu[mask])
+        return concentrations
+    np.multiply(rfu, standard_curve_params['slope'], out=concentrations, where=mask)
+    np.add(concentrations, standard_curve_params['intercept'], out=concentrations, where=mask)
+    return concentrations
+
+def calculate_concentrations_batch(rfu_stack, standard_curve_params):
+    """Convert a stack of plates, shaped (N, rows, cols), to concentrations in one call"""
+    rfu_stack = np.asarray(rfu_stack, dtype=float)
+    if rfu_stack.ndim != 3:
+        raise ValueError(f"Expected an (N, rows, cols) RFU array, got {rfu_stack.shape}")
+    geometry_for_shape(rfu_stack.shape[1:])  # Raises unless the plates are a known format
+    return apply_standard_curve(rfu_stack, standard_curve_params)
+
+LIQUID_HANDLERS = list(HANDLERS)  # Declared in handlers.json (see qc_handlers)
+
+def separate_curve_handlers():
+    """Handlers whose standard curve comes from a separate standards plate (--std-curve-file, --curve-name)"""
+    return [name for name in LIQUID_HANDLERS if get_handler(name).separate_standard_curve]
+
+def default_chip_configurations(handler_type, geometry=DEFAULT_GEOMETRY):
+    """Default chip layout for a liquid handler - every column after its standard curve columns"""
+    handler = get_handler(handler_type)
+    return [{
+        'chip_id': handler.default_chip_id,
+        'start_col': handler.first_sample_col,  # 0-based indexing, e.g. columns 4-24 on a 384-well plate
+        'end_col': geometry.cols - 1,
+        'handler_type': handler_type
+    }]
+
+def check_chip_columns(chip_configurations, geometry):
+    """Raise ValueError for a chip whose columns run past the plate (compile_group_index would silently clip it)"""
+    for config in chip_configurations:
+        if config['end_col'] >= geometry.cols:
+            raise ValueError(f"{config['chip_id']} columns {config['start_col']+1}-{config['end_col']+1} run past "
+                             f"the {geometry.cols} columns of a {geometry.name}-well plate")
+
+def compile_group_index(chip_configurations, geometry=DEFAULT_GEOMETRY):
+    """Precompute the well -> QC group mapping for a set of chip configurations
+    
+    Returns flat integer arrays (one entry per well membership, so overlapping
+    chips are fine) plus per-group metadata, ready for calculate_qc_table.
+    Index maps are built once per geometry and chip layout and then shared
+    (their arrays are read-only), so 1536-well plates pay the Python cost once.
+    """
+    layout = tuple((config['chip_id'], config['start_col'], config['end_col'], config.get('handler_type', DEFAULT_HANDLER))
+                   for config in chip_configurations)
+    return dict(_compiled_group_index(layout, geometry))
+
+@functools.lru_cache(maxsize=64)
+def _compiled_group_index(layout, geometry):
+    wells, groups, positive_only = [], [], []
+    group_meta = {'nozzle_id': [], 'chip_id': [], 'column_range': [], 'handler_type': [], 'per_well': []}
+    for chip_id, start_col, end_col, handler_type in layout:
+        handler = get_handler(handler_type)
+        # The handler's compiled well -> group map, restricted to the chip's columns
+        group_of_well, n_handler_groups = handler.group_map(geometry)
+        in_chip = np.zeros(geometry.cols, dtype=bool)
+        in_chip[start_col:min(end_col, geometry.cols - 1) + 1] = True
+        members = np.flatnonzero((group_of_well >= 0) & np.tile(in_chip, geometry.rows))
+        handler_groups, member_groups = np.unique(group_of_well[members], return_inverse=True)
+        
+        if handler.per_well:
+            # One group per well - numbered later among the wells holding data
+            names = [handler.group_name(chip_id)] * len(handler_groups)
+            column_ranges = geometry.well_names()[handler_groups].tolist()
+        elif handler.single_group:
+            names = [handler.group_name(chip_id)]
+            column_ranges = [f"{start_col+1}-{end_col+1}"]
+        else:
+            names = [handler.group_name(chip_id, group + 1) for group in handler_groups.tolist()]
+            column_range = (f"{handler.component.lower()}_{n_handler_groups}" if handler.pattern == 'blocks'
+                            else f"{start_col+1}-{end_col+1}")
+            column_ranges = [column_range] * len(handler_groups)
+        
+        group_offset = len(group_meta['nozzle_id'])
+        group_meta['nozzle_id'].extend(names)
+        group_meta['chip_id'].extend([chip_id] * len(names))
+        group_meta['column_range'].extend(column_ranges)
+        group_meta['handler_type'].extend([handler_type] * len(names))
+        group_meta['per_well'].extend([handler.per_well] * len(names))
+        wells.append(members)
+        groups.append(group_offset + member_groups.astype(np.intp))
+        # Some handlers' wells must hold a positive concentration; the others only drop NaN
+        positive_only.append(np.full(len(members), handler.positive_only))
+    
+    index = {
+        'wells': np.concatenate(wells).astype(np.intp) if wells else np.zeros(0, dtype=np.intp),
+        'groups': np.concatenate(groups) if groups else np.zeros(0, dtype=np.intp),
+        'positive_only': np.concatenate(positive_only) if positive_only else np.zeros(0, dtype=bool),
+        **{key: np.array(values, dtype=object if key != 'per_well' else bool) for key, values in group_meta.items()},
+    }
+    for array in index.values():
+        array.setflags(write=False)
+    return {**index, 'n_groups': len(group_meta['nozzle_id']), 'geometry': geometry}
+
+def calculate_qc_table(concentration_stack, group_index, target_concentration, outlier_method=None,
+                       **outlier_options):
+    """Mean/std/%CV/%Accuracy for every QC group of every plate in one grouped reduction
+    
+    concentration_stack is (N, rows, cols) in the group index's geometry; the
+    result is a columnar DataFrame with one row per (plate, group) holding at
+    least one measurement. With an outlier_method (see qc_outliers) each
+    group's wells are screened first and the table gains n_excluded and
+    excluded_wells ("D7;E12") columns.
+    """
+    stack = np.asarray(concentration_stack, dtype=float)
+    n_plates = stack.shape[0]
+    n_groups = group_index['n_groups']
+    geometry = group_index['geometry']
+    if stack.shape[1:] != geometry.shape:
+        raise ValueError(f"Group index is for {geometry.name}-well plates, got plates shaped {stack.shape[1:]}")
+    
+    values = stack.reshape(n_plates, -1)[:, group_index['wells']]  # (N, members)
+    valid = ~np.isnan(values)
+    valid &= ~group_index['positive_only'] | (values > 0)
+    
+    # Flat bin per (plate, group)
+    bins = (np.arange(n_plates)[:, np.newaxis] * n_groups + group_index['groups']).ravel()
+    valid = valid.ravel()
+    bins = bins[valid]
+    values = values.ravel()[valid]
+    
+    n_bins = n_plates * n_groups
+    if outlier_method:
+        flagged = flag_grouped_outliers(values, bins, n_bins, outlier_method, **outlier_options)
+        flagged_bins = bins[flagged]
+        flagged_wells = np.tile(group_index['wells'], n_plates)[valid][flagged]
+        bins = bins[~flagged]
+        values = values[~flagged]
+    counts = np.bincount(bins, minlength=n_bins)
+    sums = np.bincount(bins, weights=values, minlength=n_bins)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        # Two-pass variance (population std, as np.std) for numerical stability
+        squared_deviation = np.bincount(bins, weights=(values - means[bins]) ** 2, minlength=n_bins)
+        stds = np.sqrt(squared_deviation / counts)
+        cvs = np.where(means != 0, stds / means * 100, 0.0)
+    accuracies = (means - target_concentration) / target_concentration * 100
+    
+    present = counts > 0
+    plate_ids = np.repeat(np.arange(n_plates), n_groups)[present]
+    group_ids = np.tile(np.arange(n_groups), n_plates)[present]
+    
+    nozzle_ids = group_index['nozzle_id'][group_ids].copy()
+    per_well = group_index['per_well'][group_ids]
+    if per_well.any():
+        # Per-well handlers number their wells among those holding data, per plate and chip
+        well_table = pd.DataFrame({'plate': plate_ids[per_well], 'chip_id': group_index['chip_id'][group_ids[per_well]]})
+        well_numbers = well_table.groupby(['plate', 'chip_id'], sort=False).cumcount().to_numpy() + 1
+        nozzle_ids[per_well] = [f"{prefix}_{number}" for prefix, number in zip(nozzle_ids[per_well], well_numbers)]
+    
+    table = pd.DataFrame({
+        'plate': plate_ids,
+        'nozzle_id': nozzle_ids,
+        'chip_id': group_index['chip_id'][group_ids],
+        'mean_concentration': means[present],
+        'std_concentration': stds[present],
+        'cv_percent': cvs[present],
+        'accuracy_percent': accuracies[present],
+        'n_measurements': counts[present],
+        'column_range': group_index['column_range'][group_ids],
+        'handler_type': group_index['handler_type'][group_ids],
+    })
+    if outlier_method:
+        excluded_wells = [[] for _ in range(n_bins)]
+        for bin_id, well in zip(flagged_bins.tolist(), flagged_wells.tolist()):
+            excluded_wells[bin_id].append(geometry.well_names()[well])
+        table['n_excluded'] = np.bincount(flagged_bins, minlength=n_bins)[present]
+        table['excluded_wells'] = [';'.join(excluded_wells[bin_id]) for bin_id in np.flatnonzero(present)]
+    return table
+
+def spatial_qc_table(table, concentration_stack, group_index, target_concentration, spatial_method,
+                     outlier_method=None, **outlier_options):
+    """Spatially corrected %CV next to the raw one, plus each plate's spatial effects (see qc_spatial)
+    
+    Row/column/edge effects are fitted to the QC sample wells of every plate of
+    the stack in one call and subtracted, and the groups are reduced again.
+    Returns (table with a corrected_cv_percent column, DataFrame with one row
+    per plate of row_gradient, col_gradient and edge_effect in % of the plate median).
+    """
+    stack = np.asarray(concentration_stack, dtype=float)
+    mask = np.zeros(group_index['geometry'].n_wells, dtype=bool)
+    mask[group_index['wells']] = True
+    fit = fit_spatial_effects(stack, mask.reshape(group_index['geometry'].shape), spatial_method)
+    corrected = calculate_qc_table(stack - fit['surface'], group_index, target_concentration, outlier_method,
+                                   **outlier_options)
+    corrected_cv = corrected.set_index(['plate', 'nozzle_id'])['cv_percent']
+    table = table.copy()
+    table['corrected_cv_percent'] = corrected_cv.reindex(pd.MultiIndex.from_frame(table[['plate', 'nozzle_id']])).to_numpy()
+    effects = pd.DataFrame({column: fit[column] for column in SPATIAL_COLUMNS})
+    return table, effects
+
+# Typed long-format exports (--export): file extension of each format
+EXPORT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+EXPORT_TABLES = ('wells', 'groups')  # <input>_wells.<ext> (one row per well), <input>_groups.<ext> (per QC group)
+
+def write_table(table, path, export_format):
+    """Write a typed table with pandas' bulk writer - Parquet and Feather need pyarrow"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}' (choose from {', '.join(EXPORT_FORMATS)})")
+    if export_format == 'csv':
+        table.to_csv(path, index=False)
+        return str(path)
+    try:
+        import pyarrow  # noqa: F401 - optional, only needed for the binary formats
+    except ImportError:
+        raise ValueError(f"The {export_format} export needs pyarrow (pip install pyarrow) - or use csv") from None
+    if export_format == 'parquet':
+        table.to_parquet(path, index=False)
+    else:
+        table.to_feather(path)
+    return str(path)
+
+# Plot output presets: publication PNG, vector SVG and a fast low-res preview
+PLOT_FORMATS = {
+    'png': {'format': 'png', 'dpi': 300},
+    'svg': {'format': 'svg', 'dpi': 300},
+    'preview': {'format': 'png', 'dpi': 72},
+}
+
+# Whole-plate heatmaps: 'auto' instead of the per-well bar charts (Bravo - 384 and other per-well
+# handlers), 'all' also as an overview for every handler, 'off' for bar charts only
+HEATMAP_MODES = ('auto', 'all', 'off')
+
+# Figures are reused across plots of the same size (one pool per process)
+_FIGURE_POOL = {}
+
+def _pooled_figure(figsize, ncols):
+    """Return a cleared (figure, axes) pair from the per-process figure pool"""
+    key = (tuple(figsize), ncols)
+    if key not in _FIGURE_POOL:
+        # Object-oriented API - no pyplot global state and no GUI backend
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize)
+        _FIGURE_POOL[key] = (fig, list(np.atleast_1d(fig.subplots(1, ncols))))
+    fig, axes = _FIGURE_POOL[key]
+    for ax in axes:
+        ax.clear()
+    return fig, axes
+
+def _pooled_heatmap_figure(figsize, n_panels):
+    """Return a cleared (figure, [(axes, colorbar axes), ...]) pair - two heatmap panels per row"""
+    key = ('heatmap', tuple(figsize), n_panels)
+    if key not in _FIGURE_POOL:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize)
+        grid = fig.add_gridspec(-(-n_panels // 2), 4, width_ratios=[1, 0.03, 1, 0.03])
+        _FIGURE_POOL[key] = (fig, [(fig.add_subplot(grid[i // 2, 2 * (i % 2)]),
+                                    fig.add_subplot(grid[i // 2, 2 * (i % 2) + 1])) for i in range(n_panels)])
+    fig, axes = _FIGURE_POOL[key]
+    for ax, cax in axes:
+        ax.clear()
+        cax.clear()
+    return fig, axes
+
+def heatmap_limits(values, reference=None, centered=False):
+    """Colour limits from the 2nd-98th percentile of `reference` (default: all finite values)
+    
+    Standards span orders of magnitude more than the sample wells, so the RFU and
+    concentration panels are scaled to the sample wells and clip the rest.
+    Centered limits are symmetric around zero (deviations, %Accuracy).
+    """
+    reference = np.asarray(values if reference is None else reference, dtype=float)
+    finite = reference[np.isfinite(reference)]
+    if not finite.size:
+        return None, None
+    low, high = np.percentile(finite, [2, 98])
+    if centered:
+        bound = max(abs(low), abs(high)) or 1.0
+        return -bound, bound
+    return (low, high) if high > low else (low - 1.0, high + 1.0)
+
+def _draw_heatmap(fig, ax, cax, panel, row_labels, col_labels):
+    """One whole-plate panel: a single imshow call, a colour bar and sparse row/column ticks"""
+    from matplotlib import colormaps
+    cmap = colormaps[panel['cmap']].with_extremes(bad='#dddddd')  # Empty / unused wells in grey
+    image = ax.imshow(np.asarray(panel['values'], dtype=float), cmap=cmap, vmin=panel['vmin'], vmax=panel['vmax'],
+                      aspect='auto', interpolation='nearest')
+    fig.colorbar(image, cax=cax, label=panel['label'])
+    ax.set_title(panel['title'])
+    row_step = max(1, len(row_labels) // 16)
+    col_step = max(1, len(col_labels) // 24)
+    ax.set_yticks(range(0, len(row_labels), row_step), row_labels[::row_step], fontsize=7)
+    ax.set_xticks(range(0, len(col_labels), col_step), col_labels[::col_step], fontsize=7)
+    ax.tick_params(length=0)
+
+def _draw_performance_bars(ax, labels, values, color, ylabel, title, average_label, rotate_labels):
+    """Bar chart of one metric with value labels and an average reference line"""
+    bars = ax.bar(labels, values, color=color)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    if rotate_labels:
+        ax.tick_params(axis='x', rotation=45)
+    
+    # Add value labels on bars
+    for bar, value in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
+                f'{value:.1f}%', ha='center', va='bottom')
+    
+    # Add average line
+    mean_value = np.mean(values)
+    ax.axhline(y=mean_value, color='red', linestyle='--', linewidth=2, label=f'{average_label}: {mean_value:.1f}%')
+    ax.legend()
+
+def render_plot_task(task, plot_options):
+    """Render one plot description (see generate_plots) to its output file"""
+    if task['kind'] == 'standard_curve':
+        fig, (ax,) = _pooled_figure((10, 6), 1)
+        ax.scatter(task['fluorescence'], task['concentration'], color='blue', s=100, label='Data points')
+        
+        # Add fitted curve
+        params = task['curve_params']
+        x_range = np.linspace(min(task['fluorescence']), max(task['fluorescence']), 100)
+        label = f"R² = {params['r_squared']:.4f}"
+        if params.get('model', 'linear') != 'linear':
+            label = f"{params['model']}, {label}"
+        ax.plot(x_range, evaluate_curve(params, x_range), 'r-', label=label)
+        
+        # Add equation text to the plot
+        equation_text = curve_equation(params)
+        ax.text(0.05, 0.95, f'Equation: {equation_text}',
+                transform=ax.transAxes, fontsize=12,
+                verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        
+        ax.set_xlabel('Fluorescence (RFU)')
+        ax.set_ylabel('Concentration')
+        ax.set_title('Standard Curve')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    elif task['kind'] == 'heatmap':
+        fig, axes = _pooled_heatmap_figure(task['figsize'], len(task['panels']))
+        for (ax, cax), panel in zip(axes, task['panels']):
+            _draw_heatmap(fig, ax, cax, panel, task['row_labels'], task['col_labels'])
+            if task['excluded']:
+                rows, cols = zip(*task['excluded'])
+                ax.scatter(cols, rows, marker='x', color='black', s=12, linewidths=0.8, label='Excluded')
+        fig.suptitle(task['title'])
+    else:
+        fig, (ax1, ax2) = _pooled_figure(task['figsize'], 2)
+        _draw_performance_bars(ax1, task['labels'], task['cv_values'], 'skyblue', '%CV',
+                               f"{task['title_prefix']} Precision (%CV)", task['average_label'], task['rotate_labels'])
+        _draw_performance_bars(ax2, task['labels'], task['accuracy_values'], 'lightcoral', '%Accuracy',
+                               f"{task['title_prefix']} Accuracy (%Accuracy)", task['average_label'], task['rotate_labels'])
+    
+    fig.tight_layout()
+    fig.savefig(task['path'], dpi=plot_options['dpi'], format=plot_options['format'])
+    return task['path']
+
+def render_plot_tasks(tasks, plot_options):
+    """Render a chunk of plots in one process, reusing pooled figures between them"""
+    return [render_plot_task(task, plot_options) for task in tasks]
+
+def _plot_span(task):
+    """Profiler span name and counts for one plot task"""
+    counts = {'bars': len(task['labels'])} if 'labels' in task else {}
+    if 'panels' in task:
+        counts = {'panels': len(task['panels']), 'wells': len(task['row_labels']) * len(task['col_labels'])}
+    return f"plot:{task.get('name', task['kind'])}", counts
+
+def render_plot_tasks_timed(tasks, plot_options):
+    """render_plot_tasks, also returning (path, start, wall, cpu, pid) for each plot"""
+    timings = []
+    for task in tasks:
+        start, cpu_start = time.perf_counter(), time.process_time()
+        path = render_plot_task(task, plot_options)
+        timings.append((path, start, time.perf_counter() - start, time.process_time() - cpu_start, os.getpid()))
+    return timings
+
+def render_plot_tasks_parallel(tasks, plot_options, workers=None, profiler=NULL_PROFILER):
+    """Render plots, spreading them across worker processes when it pays off
+    
+    Worker start-up costs roughly one matplotlib import, so plots are only
+    rendered in parallel when there are several chip figures to draw. With an
+    enabled profiler every figure gets its own 'plot:<name>' span.
+    """
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(tasks)) if len(tasks) > 3 else 1
+    if workers <= 1:
+        if not profiler.enabled:
+            return render_plot_tasks(tasks, plot_options)
+        paths = []
+        for task in tasks:
+            name, counts = _plot_span(task)
+            with profiler.span(name, **counts):
+                paths.append(render_plot_task(task, plot_options))
+        return paths
+    
+    # Round-robin chunks keep similar-sized figures together within each worker's pool
+    chunks = [tasks[i::workers] for i in range(workers)]
+    render = render_plot_tasks_timed if profiler.enabled else render_plot_tasks
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk, chunk_results in zip(chunks, executor.map(render, chunks, [plot_options] * workers)):
+            if profiler.enabled:
+                for task, (path, start, wall, cpu, pid) in zip(chunk, chunk_results):
+                    name, counts = _plot_span(task)
+                    profiler.add_span(name, start, wall, cpu, pid, **counts)
+                    paths.append(path)
+            else:
+                paths.extend(chunk_results)
+    return paths
+
+# Section headers written by the plate reader (EnVision-style export)
+SECTION_TITLES = (
+    "Plate information",
+    "Background information",
+    "Calculated results",
+    "Results for",
+    "Basic assay information",
+    "Protocol information",
+)
+FLUORESCENCE_SECTION = "Results for Fluorescein"
+ASSAY_INFO_SECTION = "Basic assay information"
+ASSAY_TIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"  # 7/16/2025 3:20:58 PM
+
+def _parse_cell(cell):
+    """Convert one export cell to float, NaN for blanks and text"""
+    try:
+        return float(cell.strip().strip('"'))
+    except ValueError:
+        return np.nan
+
+def _parse_plate_row(line, n_cols):
+    """Parse one 'A,123,456,...' row of a plate block into floats"""
+    cells = line.split(',')[1:n_cols+1]
+    values = [_parse_cell(cell) for cell in cells]
+    values.extend([np.nan] * (n_cols - len(values)))
+    return values
+
+class PlateExport:
+    """Section index of a plate-reader export file
+    
+    Holds the byte offset of every section header so individual blocks can be
+    re-read with a single seek, plus every plate block as a float array: the
+    measured channels stacked over their repeats and the reader's calculated
+    results.
+    """
+    def __init__(self, csv_file):
+        self.csv_file = str(csv_file)
+        self.sections = []  # (title, byte offset, line number) in file order
+        self.fluorescence = None  # Fluorescein RFU per well - the mean over the repeats
+        self.repeats = None  # Fluorescein RFU of every repeat, shaped (repeat, rows, cols)
+        self.repeat_numbers = []  # Repeat of each fluorescein block (Repeat column of its Plate information)
+        self.channels = {}  # Channel label (e.g. 'Fluorescein(1) - channel 1 (RFU)') -> (repeat, rows, cols) RFU
+        self.calculated = []  # (title, repeat, block) of every 'Calculated results' section
+        self.fluorescence_line = None  # Line number of the fluorescence column header row
+        self.geometry = DEFAULT_GEOMETRY  # Plate format, from the fluorescence column header row
+        self.assay_info = {}  # 'Key: ,,,,value' lines of the Basic assay information section
+    
+    def assay_metadata(self):
+        """Plate metadata from the Basic assay information section, timestamps as ISO strings"""
+        def timestamp(key):
+            value = self.assay_info.get(key)
+            try:
+                return datetime.strptime(value, ASSAY_TIME_FORMAT).isoformat()
+            except (TypeError, ValueError):
+                return value
+        return {
+            'assay_id': self.assay_info.get('Assay ID'),
+            'serial_number': self.assay_info.get('Serial#'),
+            'protocol_id': self.assay_info.get('Protocol ID'),
+            'protocol_name': self.assay_info.get('Protocol Name'),
+            'assay_started': timestamp('Assay Started'),
+            'assay_finished': timestamp('Assay Finished'),
+            'assay_exported': timestamp('Assay Exported'),
+        }
+    
+    def find_sections(self, title):
+        """Return the (title, offset, line) entries whose title starts with `title`"""
+        return [section for section in self.sections if section[0].startswith(title)]
+    
+    def read_plate_block(self, offset, n_rows=None, n_cols=None):
+        """Read the numeric block that follows the section header at `offset` (plate-sized by default)"""
+        n_rows = n_rows or self.geometry.rows
+        n_cols = n_cols or self.geometry.cols
+        with open(self.csv_file, 'rb') as f:
+            f.seek(offset)
+            f.readline()  # Section header
+            f.readline()  # Column header row (,01,02,...)
+            rows = [_parse_plate_row(f.readline().decode('utf-8'), n_cols) for _ in range(n_rows)]
+        return np.array(rows, dtype=float)
+
+def parse_plate_export(csv_file):
+    """Index the sections of a plate-reader export in a single streaming pass
+    
+    Every 'Results for ...' block is parsed straight into a float array sized
+    by the plate format its column header row announces (96, 384 or 1536
+    wells) and stacked per channel label over the repeats, each tagged with
+    the Repeat of the Plate information section before it; 'Calculated
+    results' blocks and the Basic assay information key/value lines are
+    collected on the way. Scanning stops at the protocol footer, which
+    carries no plate data.
+    """
+    export = PlateExport(csv_file)
+    channel_blocks = {}  # Channel label -> [(repeat, block), ...]
+    block = None  # The plate block being read: title, header line, geometry, rows, repeat
+    
+    def finish_block():
+        geometry = block['geometry'] or DEFAULT_GEOMETRY
+        rows = block['rows'] + [[np.nan] * geometry.cols] * (geometry.rows - len(block['rows']))  # Pad truncated blocks
+        data = np.array(rows, dtype=float)
+        if block['title'].startswith("Results for"):
+            label = block['title'][len("Results for"):].strip()
+            channel_blocks.setdefault(label, []).append((block['repeat'], data))
+        else:
+            export.calculated.append((block['title'], block['repeat'], data))
+    
+    with open(csv_file, 'rb') as f:
+        offset = 0
+        line_number = 0
+        in_assay_info = False
+        plate_info_columns = None  # Column header row of the current Plate information section
+        repeat = 1
+        for raw_line in f:
+            line = raw_line.decode('utf-8')
+            if block is not None and block['header_line'] == line_number:
+                # Column header row (,01,02,...) - its width identifies the plate format
+                header = [cell for cell in line.split(',')[1:] if cell.strip()]
+                block['geometry'] = geometry_for_columns(len(header))
+                if export.fluorescence_line == line_number:
+                    export.geometry = block['geometry']
+            elif block is not None:
+                block['rows'].append(_parse_plate_row(line, block['geometry'].cols))
+                if len(block['rows']) == block['geometry'].rows:
+                    finish_block()
+                    block = None
+            else:
+                first_cell = line.split(',', 1)[0].strip().strip('"')
+                if first_cell.startswith(SECTION_TITLES):
+                    export.sections.append((first_cell, offset, line_number))
+                    in_assay_info = first_cell.startswith(ASSAY_INFO_SECTION)
+                    plate_info_columns = [] if first_cell.startswith("Plate information") else None
+                    if first_cell.startswith("Protocol information"):
+                        break
+                    if first_cell.startswith(("Results for", "Calculated results")):
+                        block = {'title': first_cell, 'header_line': line_number + 1, 'geometry': None, 'rows': [],
+                                 'repeat': repeat}
+                        if export.fluorescence_line is None and FLUORESCENCE_SECTION in first_cell:
+                            export.fluorescence_line = line_number + 1
+                elif plate_info_columns is not None and first_cell:
+                    cells = [cell.strip() for cell in line.split(',')]
+                    if not plate_info_columns:
+                        plate_info_columns[:] = cells  # Plate,Repeat,Barcode,...
+                    elif 'Repeat' in plate_info_columns:
+                        try:
+                            repeat = int(cells[plate_info_columns.index('Repeat')])
+                        except (IndexError, ValueError):
+                            pass
+                elif in_assay_info and first_cell.endswith(':'):
+                    values = [cell.strip().strip('=').strip('"') for cell in line.split(',')[1:]]
+                    values = [value for value in values if value]
+                    export.assay_info[first_cell[:-1].strip()] = values[-1] if values else None
+            offset += len(raw_line)
+            line_number += 1
+    
+    if block is not None and block['rows']:
+        finish_block()  # Truncated block
+    
+    for label, blocks in channel_blocks.items():
+        export.channels[label] = np.stack([data for _, data in blocks])
+    fluorescein = [label for label in channel_blocks if f"Results for {label}".startswith(FLUORESCENCE_SECTION)]
+    if fluorescein:
+        export.repeats = export.channels[fluorescein[0]]
+        export.repeat_numbers = [repeat for repeat, _ in channel_blocks[fluorescein[0]]]
+        if len(export.repeats) == 1:
+            export.fluorescence = export.repeats[0]
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # Wells empty in every repeat
+                export.fluorescence = np.nanmean(export.repeats, axis=0)
+    return export
+
+def cross_check_calculated_cv(rfu, calculated, rtol=1e-4):
+    """Compare the reader's %CV block with the %CV of our parsed RFU
+    
+    The reader writes one %CV per group of wells into every well of the group,
+    so wells sharing a value are taken as one group (standard triplicates,
+    nozzle x column blocks). Returns (groups compared, worst relative
+    difference, flat indices of the wells in disagreeing groups).
+    """
+    rfu = np.asarray(rfu, dtype=float).ravel()
+    calculated = np.asarray(calculated, dtype=float).ravel()
+    wells = np.flatnonzero(np.isfinite(calculated) & np.isfinite(rfu))
+    values, groups = np.unique(calculated[wells], return_inverse=True)
+    counts = np.bincount(groups, minlength=len(values))
+    sums = np.bincount(groups, weights=rfu[wells], minlength=len(values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        squared_deviation = np.bincount(groups, weights=(rfu[wells] - means[groups]) ** 2, minlength=len(values))
+        cvs = 100 * np.sqrt(squared_deviation / (counts - 1)) / means  # Sample SD, as the reader
+        difference = np.abs(cvs - values) / np.maximum(np.abs(values), 1e-12)
+    compared = counts > 1
+    disagreeing = compared & ~(difference <= rtol)
+    worst = float(difference[compared].max()) if compared.any() else 0.0
+    return int(compared.sum()), worst, wells[disagreeing[groups]]
+
 class DispenserQCAnalyzerFixedBug:
     def __init__(self):
         self.raw_data = None
+        self.plate_export = None
+        self.geometry = DEFAULT_GEOMETRY  # qc_geometry.PlateGeometry of the loaded plate
         self.standard_concentrations = []
         self.target_concentration = None
         self.standard_curve_data = None
         self.calculated_concentrations = None
         self.qc_results = None
+        self.qc_table = None  # Columnar per-group QC table behind qc_results
+        self.curve_cache = None  # StandardCurveCache for separate (Bravo 384) curve files
+        self.curve_name = None  # Named cached curve to reuse / save
+        self.cached_curve_params = None
+        self.curve_cache_key = None
+        self.curve_source_file = None
+        self.curve_model = 'linear'  # qc_curve model name, or 'auto' to pick the best fit per curve
+        self.outlier_method = None  # qc_outliers method for standard triplicates and/or nozzle groups
+        self.outlier_scope = 'both'  # One of OUTLIER_SCOPES
+        self.outlier_alpha = DEFAULT_ALPHA
+        self.spatial_method = None  # qc_spatial method for row/column/edge effects, None = off
+        self.spatial_effects = None  # {'row_gradient', 'col_gradient', 'edge_effect'} of the last run, % of median
+        self.excluded_wells = []  # Wells rejected as outliers in the last run
+        self.reader_cv_mismatches = []  # Wells whose reader-calculated %CV disagrees with the parsed RFU
+        self.stage_cache = StageCache()  # Results of the last run's stages, reused when their inputs are unchanged
+        self.result_store = None  # ResultStore that every successful run is appended to
+        self.result_cache = None  # ResultCache that finished analyses are restored from and saved to
+        self.force_reanalysis = False  # Re-run (and re-cache) even when the result cache has this analysis
+        self.plot_files = []  # Plot files written by the last generate_plots call
+        self.heatmaps = 'auto'  # One of HEATMAP_MODES
+        self.export_format = None  # One of EXPORT_FORMATS to also write the per-well and per-group tables
+        self.export_files = []  # Tables written by the last generate_tabular_export call
+        self.instrument = None  # Instrument name recorded in the result store
+        self.spc = None  # ControlChartStore that every run's nozzle results are charted in
+        self.spc_violations = []  # Rule violations this run raised on its control charts
+        self.profiler = NULL_PROFILER  # qc_profile.Profiler when --profile is on
+        self.progress_callback = None  # Called with each PIPELINE_STAGES name as the stage starts
+        self.cancel_event = None  # threading.Event - a set event stops the run at the next stage
         
     def launch_ui(self):
         """Launch user interface to get inputs"""
+        # Tkinter is only needed for the GUI - keep it out of CLI and library imports
+        import queue
+        import threading
+        import tkinter as tk
+        from tkinter import filedialog, messagebox, ttk
+        
         root = tk.Tk()
         root.title("Dispenser QC Analyzer - Multi-Chip Version")
         root.geometry("800x700")
@@ -85,9 +799,9 @@ class DispenserQCAnalyzerFixedBug:
         file_label = tk.Label(file_frame, text="No file selected", fg="#7f8c8d", bg='#e8e8e8', font=("Arial", 9))
         file_label.pack(pady=5)
         
-        # Standard curve file selection (for Bravo 384)
+        # Standard curve file selection (for handlers with a separate standards plate, e.g. Bravo 384)
         std_curve_file_frame = tk.Frame(scrollable_frame, bg='#e8e8e8')
-        # Don't pack initially - will be packed when Bravo 384 is selected
+        # Don't pack initially - will be packed when such a handler is selected
         
         tk.Label(std_curve_file_frame, text="Step 1.5: Select Standard Curve CSV File (Bravo 384)", font=("Arial", 14, "bold"), bg='#e8e8e8', fg='#2c3e50').pack(pady=10)
         tk.Label(std_curve_file_frame, text="For Bravo 384: Select a separate CSV file containing standard curve data in the first 3 columns", bg='#e8e8e8', font=("Arial", 10), fg='#34495e').pack(pady=5)
@@ -172,6 +886,20 @@ class DispenserQCAnalyzerFixedBug:
         # Initialize the toggle
         toggle_concentration_input()
         
+        # Standard curve model
+        tk.Label(std_curve_frame, text="Standard curve model:", bg='#e8e8e8', fg='#34495e', font=("Arial", 10)).pack(anchor=tk.W, pady=(10,0))
+        curve_model_var = tk.StringVar(value=self.curve_model)
+        curve_model_menu = tk.OptionMenu(std_curve_frame, curve_model_var, *CURVE_MODELS, AUTO_MODEL)
+        curve_model_menu.config(bg='white', fg='#2c3e50', font=("Arial", 10))
+        curve_model_menu.pack(anchor=tk.W, pady=5)
+        
+        # Outlier rejection (standard triplicates and nozzle groups)
+        tk.Label(std_curve_frame, text="Outlier rejection:", bg='#e8e8e8', fg='#34495e', font=("Arial", 10)).pack(anchor=tk.W, pady=(10,0))
+        outlier_method_var = tk.StringVar(value=self.outlier_method or "none")
+        outlier_menu = tk.OptionMenu(std_curve_frame, outlier_method_var, "none", *OUTLIER_METHODS)
+        outlier_menu.config(bg='white', fg='#2c3e50', font=("Arial", 10))
+        outlier_menu.pack(anchor=tk.W, pady=5)
+        
         # Target concentration input
         target_frame = tk.Frame(scrollable_frame, bg='#e8e8e8')
         target_frame.pack(fill=tk.X, pady=15)
@@ -190,20 +918,13 @@ class DispenserQCAnalyzerFixedBug:
         tk.Label(handler_frame, text="Step 4: Select Liquid Handler", font=("Arial", 14, "bold"), bg='#e8e8e8', fg='#2c3e50').pack(pady=10)
         tk.Label(handler_frame, text="Choose your liquid handler configuration:", bg='#e8e8e8', font=("Arial", 10), fg='#34495e').pack(pady=5)
         
-        liquid_handler_var = tk.StringVar(value="Tempest")
+        liquid_handler_var = tk.StringVar(value=DEFAULT_HANDLER)
         liquid_handler_frame = tk.Frame(handler_frame, bg='#e8e8e8')
         liquid_handler_frame.pack(fill=tk.X, pady=5)
         
-        # Liquid handler options
-        handlers = ["D2", "Bravo - 96", "Bravo - 384", "Nano", "Combi", "Tempest"]
-        handler_descriptions = {
-            "D2": "Single nozzle, dispenses to each well (excluding standard curve columns)",
-            "Bravo - 96": "Quadrant stamping (A4,A5 & B4,B5), excluding standard curve columns",
-            "Bravo - 384": "Each nozzle responsible for 1 well, uses separate standard curve file",
-            "Nano": "Single nozzle, dispenses to each well (excluding standard curve columns)",
-            "Combi": "8 nozzles, 2 rows per nozzle (same as Tempest)",
-            "Tempest": "8 nozzles, 2 rows per nozzle (current configuration)"
-        }
+        # Liquid handler options (from the handler registry, see qc_handlers)
+        handlers = LIQUID_HANDLERS
+        handler_descriptions = {name: HANDLERS[name].description for name in handlers}
         
         # Create radio buttons for liquid handler selection
         handler_vars = {}
@@ -216,7 +937,7 @@ class DispenserQCAnalyzerFixedBug:
             rb.pack(anchor=tk.W, pady=2)
         
         # Description label
-        handler_desc_label = tk.Label(handler_frame, text=handler_descriptions["Tempest"], 
+        handler_desc_label = tk.Label(handler_frame, text=handler_descriptions[DEFAULT_HANDLER], 
                                     fg="#2980b9", bg='#e8e8e8', font=("Arial", 9), wraplength=600)
         handler_desc_label.pack(pady=5)
         
@@ -224,8 +945,8 @@ class DispenserQCAnalyzerFixedBug:
             handler_desc_label.config(text=handler_descriptions[handler])
             update_chip_config_ui(handler)
             
-            # Show/hide standard curve file selection for Bravo 384
-            if handler == "Bravo - 384":
+            # Show/hide standard curve file selection (Bravo 384)
+            if HANDLERS[handler].separate_standard_curve:
                 std_curve_file_frame.pack(fill=tk.X, pady=10, after=file_frame)
             else:
                 std_curve_file_frame.pack_forget()
@@ -295,10 +1016,10 @@ class DispenserQCAnalyzerFixedBug:
             tk.Label(chip_content, text="to", bg='white', font=("Arial", 10), fg='#2c3e50').pack(side=tk.LEFT, padx=5)
             end_entry = tk.Entry(chip_content, textvariable=chip_config['end_col'], width=8, font=("Arial", 10), bg='white', fg='black')
             end_entry.pack(side=tk.LEFT, padx=5)
-            tk.Label(chip_content, text="(1-24)", bg='white', font=("Arial", 9), fg="#7f8c8d").pack(side=tk.LEFT, padx=10)
+            tk.Label(chip_content, text=f"(1-24, 1-{MAX_COLS} on 1536 wells)", bg='white', font=("Arial", 9), fg="#7f8c8d").pack(side=tk.LEFT, padx=10)
         
-        # Initialize description - start with Tempest selected
-        handler_desc_label.config(text=handler_descriptions["Tempest"])
+        # Initialize description - start with the default handler selected
+        handler_desc_label.config(text=handler_descriptions[DEFAULT_HANDLER])
         
         # Buttons frame
         buttons_frame = tk.Frame(scrollable_frame, bg='#e8e8e8')
@@ -306,12 +1027,14 @@ class DispenserQCAnalyzerFixedBug:
         
         def update_chip_config_ui(handler):
             """Update chip configuration UI based on liquid handler selection"""
-            if handler in ["Combi", "Tempest"]:
-                # Multi-nozzle handlers - show full chip configuration
+            layout = HANDLERS[handler]
+            if layout.configurable_chips:
+                # Multi-nozzle handlers (Tempest, Combi) - show full chip configuration
                 # Pack chip config frame before buttons frame
                 chip_config_frame.pack(fill=tk.X, pady=15, before=buttons_frame)
                 chip_config_label.config(text="Step 5: Configure Chips")
-                chip_desc_label.config(text="Each chip has 8 nozzles. Configure which columns each chip dispenses into:")
+                groups = f"{layout.nozzles} {layout.component.lower()}s" if layout.nozzles else layout.component.lower()
+                chip_desc_label.config(text=f"Each chip has {groups}. Configure which columns each chip dispenses into:")
             else:
                 # All other handlers - hide chip configuration
                 chip_config_frame.pack_forget()
@@ -325,11 +1048,88 @@ class DispenserQCAnalyzerFixedBug:
         # Add initial chip
         add_chip()
         
-        # Initialize chip config UI for Tempest (default selection)
-        update_chip_config_ui("Tempest")
+        # Initialize chip config UI for the default selection
+        update_chip_config_ui(DEFAULT_HANDLER)
+        
+        # Analyses run on a worker thread; it reports back through this queue, polled with root.after()
+        events = queue.Queue()
+        worker = None
+        
+        def run_analysis(csv_file, std_curve_file):
+            try:
+                with capture_errors() as errors:
+                    # Plots stay in this process: forking a process that runs Tk and this thread is unsafe
+                    success = self.process_qc_analysis(csv_file, std_curve_file, plot_workers=1)
+                events.put(('finished', success, " | ".join(errors)))
+            except Exception as e:
+                log.exception("Analysis failed")
+                events.put(('finished', False, str(e)))
+        
+        def start_analysis(csv_file, std_curve_file):
+            nonlocal worker
+            for bar in stage_bars.values():
+                bar.stop()
+                bar.config(mode='determinate', value=0)
+            status_label.config(text=f"Analyzing {os.path.basename(csv_file)}...")
+            process_button.config(state='disabled')
+            cancel_button.config(state='normal')
+            self.cancel_event = threading.Event()
+            self.progress_callback = lambda stage: events.put(('stage', stage))
+            worker = threading.Thread(target=run_analysis, args=(csv_file, std_curve_file), daemon=True)
+            worker.start()
+            root.after(100, poll_events)
+        
+        def show_stage(stage):
+            stages = list(PIPELINE_STAGES)
+            for name in stages[:stages.index(stage)]:
+                stage_bars[name].stop()
+                stage_bars[name].config(mode='determinate', value=1)
+            stage_bars[stage].config(mode='indeterminate')
+            stage_bars[stage].start(15)
+            status_label.config(text=f"{PIPELINE_STAGES[stage]}...")
+        
+        def finish_analysis(success, error):
+            cancelled = self.cancel_event.is_set()
+            self.progress_callback = None
+            self.cancel_event = None
+            for bar in stage_bars.values():
+                if str(bar.cget('mode')) == 'indeterminate':
+                    bar.stop()
+                    bar.config(mode='determinate', value=1 if success else 0)
+            process_button.config(state='normal')
+            cancel_button.config(state='disabled')
+            if cancelled and not success:
+                status_label.config(text="Analysis cancelled")
+            elif success:
+                status_label.config(text="Analysis complete - change any setting and process again")
+                messagebox.showinfo("Analysis complete", f"Results for {os.path.basename(file_path.get())} were saved next to the data file")
+            else:
+                status_label.config(text="Analysis failed")
+                messagebox.showerror("Error", error or "The analysis failed - see the log for details")
+        
+        def poll_events():
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    root.after(100, poll_events)
+                    return
+                if event[0] == 'stage':
+                    show_stage(event[1])
+                else:
+                    finish_analysis(*event[1:])
+                    return
+        
+        def cancel_analysis():
+            if self.cancel_event is not None:
+                self.cancel_event.set()
+                cancel_button.config(state='disabled')
+                status_label.config(text="Cancelling after the current stage...")
         
         # Process button
         def process_data():
+            if worker is not None and worker.is_alive():
+                return
             try:
                 # Get values from UI
                 csv_file = file_path.get()
@@ -337,12 +1137,13 @@ class DispenserQCAnalyzerFixedBug:
                     messagebox.showerror("Error", "Please select a CSV file")
                     return
                 
-                # Get standard curve file for Bravo 384
+                # Get standard curve file (Bravo 384)
                 std_curve_file = std_curve_file_path.get()
                 selected_handler = liquid_handler_var.get()
+                separate_curve = HANDLERS[selected_handler].separate_standard_curve
                 
-                if selected_handler == "Bravo - 384" and not std_curve_file:
-                    messagebox.showerror("Error", "Please select a standard curve CSV file for Bravo 384")
+                if separate_curve and not std_curve_file:
+                    messagebox.showerror("Error", f"Please select a standard curve CSV file for {selected_handler}")
                     return
                 
                 # Parse standard concentrations
@@ -355,6 +1156,8 @@ class DispenserQCAnalyzerFixedBug:
                 
                 # Parse target concentration
                 self.target_concentration = float(target_conc.get())
+                self.curve_model = curve_model_var.get()
+                self.outlier_method = None if outlier_method_var.get() == "none" else outlier_method_var.get()
                 
                 # Get selected liquid handler
                 selected_handler = liquid_handler_var.get()
@@ -363,28 +1166,15 @@ class DispenserQCAnalyzerFixedBug:
                 # Parse chip configurations based on liquid handler
                 self.chip_configurations = []
                 
-                if selected_handler in ["D2", "Nano"]:
-                    # Single nozzle handlers - no chip configuration needed
-                    self.chip_configurations = [{
-                        'chip_id': 'Single_Nozzle',
-                        'start_col': 3,  # Columns 4-24 (excluding standard curve columns 1-3)
-                        'end_col': 23,
-                        'handler_type': selected_handler
-                    }]
-                elif selected_handler in ["Bravo - 96", "Bravo - 384"]:
-                    # Bravo handlers - use default configuration
-                    self.chip_configurations = [{
-                        'chip_id': f'{selected_handler}_Chip',
-                        'start_col': 3,  # Columns 4-24 (excluding standard curve columns 1-3)
-                        'end_col': 23,
-                        'handler_type': selected_handler
-                    }]
+                if not HANDLERS[selected_handler].configurable_chips:
+                    # Single nozzle and Bravo handlers - no chip configuration needed (defaults for the file's plate format)
+                    self.chip_configurations = None
                 else:  # Tempest, Combi - use chip configurations from UI
                     for chip_config in chip_configs:
                         try:
                             start_col = int(chip_config['start_col'].get())
                             end_col = int(chip_config['end_col'].get())
-                            if start_col < 1 or end_col > 24 or start_col >= end_col:
+                            if start_col < 1 or end_col > MAX_COLS or start_col >= end_col:
                                 raise ValueError(f"Invalid column range for {chip_config['chip_id']}")
                             self.chip_configurations.append({
                                 'chip_id': chip_config['chip_id'],
@@ -396,9 +1186,12 @@ class DispenserQCAnalyzerFixedBug:
                             messagebox.showerror("Error", f"Invalid column configuration: {str(e)}")
                             return
                 
-                # Close UI and process
-                root.destroy()
-                self.process_qc_analysis(csv_file, std_curve_file if selected_handler == "Bravo - 384" else None)
+                # Reuse fitted curves across Bravo 384 plates sharing one curve file
+                if separate_curve and self.curve_cache is None:
+                    self.curve_cache = StandardCurveCache()
+                
+                # The window stays open - later runs reuse the loaded data and caches
+                start_analysis(csv_file, std_curve_file if separate_curve else None)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid input: {str(e)}")
@@ -410,6 +1203,33 @@ class DispenserQCAnalyzerFixedBug:
                                  relief=tk.RAISED, padx=30, pady=12)
         process_button.pack(pady=15)
         
+        cancel_button = tk.Button(buttons_frame, text="Cancel", command=cancel_analysis, state='disabled',
+                                  bg="white", fg='#2c3e50', font=("Arial", 11, "bold"),
+                                  relief=tk.RAISED, padx=20, pady=8)
+        cancel_button.pack(pady=5)
+        
+        # Progress - one bar per pipeline stage
+        progress_frame = tk.Frame(scrollable_frame, bg='#e8e8e8')
+        progress_frame.pack(fill=tk.X, pady=10)
+        
+        stage_bars = {}
+        for stage, label in PIPELINE_STAGES.items():
+            stage_row = tk.Frame(progress_frame, bg='#e8e8e8')
+            stage_row.pack(pady=2)
+            tk.Label(stage_row, text=label, width=16, anchor=tk.W, bg='#e8e8e8', fg='#34495e', font=("Arial", 10)).pack(side=tk.LEFT)
+            stage_bars[stage] = ttk.Progressbar(stage_row, length=300, mode='determinate', maximum=1)
+            stage_bars[stage].pack(side=tk.LEFT, padx=10)
+        
+        status_label = tk.Label(progress_frame, text="Ready", fg="#7f8c8d", bg='#e8e8e8', font=("Arial", 9))
+        status_label.pack(pady=5)
+        
+        def close_window():
+            if self.cancel_event is not None:
+                self.cancel_event.set()  # Let a running analysis stop at its next stage
+            root.destroy()
+        
+        root.protocol("WM_DELETE_WINDOW", close_window)
+        
         # Pack canvas and scrollbar
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -419,6 +1239,8 @@ class DispenserQCAnalyzerFixedBug:
         canvas.configure(scrollregion=canvas.bbox("all"))
         
         root.mainloop()
+        if worker is not None:
+            worker.join()  # Never exit halfway through writing the output file
     
     def read_csv_manual(self, csv_file):
         """Manual CSV reading for complex files"""
@@ -440,190 +1262,233 @@ class DispenserQCAnalyzerFixedBug:
     def load_standard_curve_from_file(self, std_curve_file):
         """Load standard curve data from a separate CSV file for Bravo 384"""
         try:
-            # Read the standard curve CSV file
-            std_curve_raw_data = self.read_csv_manual(std_curve_file)
+            # Index the standard curve file and parse its fluorescence block
+            std_curve_export = parse_plate_export(std_curve_file)
             
-            print(f"Standard curve file shape: {std_curve_raw_data.shape}")
+            load_log.info("Standard curve file sections: %d", len(std_curve_export.sections))
             
-            # Find the fluorescence data section
-            fluorescence_start = None
-            for i, row in std_curve_raw_data.iterrows():
-                if pd.notna(row[0]) and "Results for Fluorescein" in str(row[0]):
-                    fluorescence_start = i + 1
-                    break
-            
-            if fluorescence_start is None:
+            if std_curve_export.fluorescence is None:
                 raise ValueError("Could not find fluorescence data section in standard curve file")
             
-            print(f"Found fluorescence data starting at row {fluorescence_start} in standard curve file")
-            
-            # Extract fluorescence data from first 3 columns (16 rows, 3 columns)
-            fluorescence_data = std_curve_raw_data.iloc[fluorescence_start+1:fluorescence_start+17, 1:4].copy()
-            
-            # Convert to numeric
-            for col in fluorescence_data.columns:
-                fluorescence_data[col] = pd.to_numeric(fluorescence_data[col], errors='coerce')
-            
-            print(f"Standard curve fluorescence data shape: {fluorescence_data.shape}")
-            
-            # Extract standard curve data from the first 3 columns
-            # STD1-STD8 are in the first 3 columns of every other row (A, C, E, G, I, K, M, O)
-            standard_curve_wells = []
-            standard_curve_rfu = []
-            
-            # Map of standard curve wells: A1, A2, A3, C1, C2, C3, E1, E2, E3, etc.
-            row_indices = [0, 2, 4, 6, 8, 10, 12, 14]  # A, C, E, G, I, K, M, O
-            col_indices = [0, 1, 2]  # Columns 1, 2, 3
-            
-            for i, row_idx in enumerate(row_indices):
-                std_conc = self.standard_concentrations[i]
-                for col_idx in col_indices:
-                    if row_idx < len(fluorescence_data) and col_idx < len(fluorescence_data.columns):
-                        rfu_value = fluorescence_data.iloc[row_idx, col_idx]
-                        if pd.notna(rfu_value) and rfu_value > 0:
-                            well_id = f"{chr(65+row_idx)}{col_idx+1}"
-                            standard_curve_wells.append(well_id)
-                            standard_curve_rfu.append(rfu_value)
-                            print(f"STD{i+1} well {well_id}: RFU = {rfu_value}, Conc = {std_conc}")
-            
-            print(f"Found {len(standard_curve_wells)} standard curve wells: {standard_curve_wells}")
-            print(f"Standard curve RFU values: {standard_curve_rfu}")
-            
-            # Create standard curve data using the provided concentrations
-            # We need to match concentrations to the wells we found
-            if len(standard_curve_rfu) >= 8:
-                # Use the first 8 wells (3 wells each for STD1-STD8)
-                concentrations = []
-                rfu_values = []
-                
-                for i in range(8):
-                    # Get the 3 wells for each standard
-                    start_idx = i * 3
-                    if start_idx + 2 < len(standard_curve_rfu):
-                        # Use median of the 3 wells for each standard (more robust to outliers)
-                        median_rfu = np.median(standard_curve_rfu[start_idx:start_idx+3])
-                        concentrations.append(self.standard_concentrations[i])
-                        rfu_values.append(median_rfu)
-                        print(f"STD{i+1} median RFU: {median_rfu}, Concentration: {self.standard_concentrations[i]}")
-                
-                return pd.DataFrame({
-                    'concentration': concentrations,
-                    'fluorescence': rfu_values
-                })
-            else:
-                raise ValueError(f"Insufficient standard curve wells found in separate file: {len(standard_curve_wells)}")
-                
+            load_log.info("Found fluorescence data starting at row %s in standard curve file", std_curve_export.fluorescence_line)
+            
+            # Extract fluorescence data from first 3 columns (16 rows, 3 columns on a 384-well plate)
+            fluorescence_data = pd.DataFrame(std_curve_export.fluorescence[:, 0:3], columns=range(1, 4))
+            
+            load_log.info("Standard curve fluorescence data shape: %s", fluorescence_data.shape)
+            
+            # STD1-STD8 are in the first 3 columns of evenly spaced rows (A, C, E, ... on a 384-well plate)
+            return self.extract_standard_curve(fluorescence_data.to_numpy(dtype=float), " in separate file",
+                                               std_curve_export.geometry)
+            
         except Exception as e:
-            print(f"Error loading standard curve data from file: {str(e)}")
-            print("\nTroubleshooting tips:")
-            print("1. Check that your standard curve CSV file has the correct format")
-            print("2. Ensure the file contains 'Results for Fluorescein' section")
-            print("3. Verify that standard curve wells (first 3 columns) contain valid data")
-            print("4. Check for any special characters or encoding issues")
+            load_log.error("Error loading standard curve data from file: %s", e)
+            load_log.info("\nTroubleshooting tips:\n"
+                          "1. Check that your standard curve CSV file has the correct format\n"
+                          "2. Ensure the file contains 'Results for Fluorescein' section\n"
+                          "3. Verify that standard curve wells (first 3 columns) contain valid data\n"
+                          "4. Check for any special characters or encoding issues")
             raise
     
+    def extract_standard_curve(self, fluorescence, source="", geometry=None):
+        """Standard curve points - the median RFU of each standard's triplicate - from one plate
+        
+        geometry is the plate's format (default: the analyzed plate's). With
+        outlier rejection on the standards, wells rejected within their
+        triplicate are left out of the median and recorded in excluded_wells.
+        """
+        geometry = geometry or self.geometry
+        standard_cols = self.handler_layout().standard_cols
+        replicates = standard_replicates(fluorescence, geometry, standard_cols)
+        found = ~np.isnan(replicates)
+        if load_log.isEnabledFor(logging.DEBUG):
+            for level, col in zip(*np.nonzero(found)):
+                well_id = geometry.well_name(geometry.standard_rows[level], standard_cols[col])
+                std_conc = self.standard_concentrations[level] if level < len(self.standard_concentrations) else None
+                load_log.debug("STD%d well %s: RFU = %s, Conc = %s", level + 1, well_id, replicates[level, col], std_conc)
+        
+        n_wells = int(found.sum())
+        load_log.info("Found %d standard curve wells", n_wells)
+        if n_wells < 8:
+            raise ValueError(f"Insufficient standard curve wells found{source}: {n_wells}")
+        
+        outlier_method = self.outlier_method if self.outlier_scope in ('both', 'standards') else None
+        medians, excluded = reduce_standard_replicates(replicates, outlier_method, **self.outlier_options())
+        for level, col in zip(*np.nonzero(excluded)):
+            well_id = geometry.well_name(geometry.standard_rows[level], standard_cols[col])
+            self.excluded_wells.append({'kind': 'standard', 'group': f"STD{level + 1}", 'well': well_id,
+                                        'value': float(replicates[level, col]), 'method': outlier_method})
+            load_log.info("STD%d well %s excluded as an outlier (%s): RFU = %s", level + 1, well_id,
+                          outlier_method, replicates[level, col])
+        
+        # Create standard curve data using the provided concentrations
+        concentrations = []
+        rfu_values = []
+        for level, (std_conc, median_rfu) in enumerate(zip(self.standard_concentrations, medians)):
+            if np.isnan(median_rfu):
+                continue
+            concentrations.append(std_conc)
+            rfu_values.append(median_rfu)
+            load_log.debug("STD%d median RFU: %s, Concentration: %s", level + 1, median_rfu, std_conc)
+        
+        return pd.DataFrame({
+            'concentration': concentrations,
+            'fluorescence': rfu_values
+        })
+    
+    def outlier_options(self):
+        return {'alpha': self.outlier_alpha}
+    
+    def handler_layout(self):
+        """Registry layout of the selected liquid handler (the default handler's for unknown names)"""
+        return HANDLERS.get(getattr(self, 'liquid_handler', DEFAULT_HANDLER), HANDLERS[DEFAULT_HANDLER])
+    
+    def curve_cache_variant(self):
+        """Extra curve-cache key parts: the cached medians depend on outlier rejection and the standard columns"""
+        parts = []
+        if self.outlier_method and self.outlier_scope in ('both', 'standards'):
+            parts.append(f"outliers={self.outlier_method}:{self.outlier_alpha!r}")
+        standard_cols = self.handler_layout().standard_cols
+        if standard_cols != DEFAULT_GEOMETRY.standard_cols:
+            parts.append(f"standard_cols={','.join(str(col + 1) for col in standard_cols)}")
+        return ';'.join(parts) or None
+    
+    def load_separate_standard_curve(self, std_curve_file):
+        """Standard curve for Bravo 384 - from the curve cache when possible, else from the file"""
+        entry = None
+        self.curve_source_file = std_curve_file
+        if self.curve_cache:
+            if std_curve_file:
+                self.curve_cache_key = self.curve_cache.make_key(std_curve_file, self.standard_concentrations,
+                                                                 self.curve_cache_variant())
+                entry = self.curve_cache.get(self.curve_cache_key)
+            else:
+                entry = self.curve_cache.get_named(self.curve_name)
+                if entry is None:
+                    raise ValueError(f"Named standard curve '{self.curve_name}' not found in cache")
+                if entry['standard_concentrations'] != [float(c) for c in self.standard_concentrations]:
+                    raise ValueError(f"Named standard curve '{self.curve_name}' was built with concentrations "
+                                     f"{entry['standard_concentrations']}")
+        elif not std_curve_file:
+            raise ValueError("A named standard curve needs the curve cache")
+        
+        if entry:
+            load_log.info("Using cached standard curve %s (from %s)", self.curve_name or entry['key'][:12], entry['source_file'])
+            self.excluded_wells.extend(entry.get('excluded_wells', []))
+            if entry['standard_curve_params'].get('model', 'linear') == self.curve_model or \
+                    (self.curve_model == AUTO_MODEL and 'selection' in entry['standard_curve_params']):
+                self.cached_curve_params = entry['standard_curve_params']
+            # Otherwise the cached points are re-fitted with the requested model
+            if self.curve_name and std_curve_file:
+                self.curve_cache.save_name(self.curve_name, entry['key'])
+            return pd.DataFrame({
+                'concentration': entry['concentration'],
+                'fluorescence': entry['fluorescence']
+            })
+        
+        load_log.info("Loading standard curve data from separate file: %s", std_curve_file)
+        return self.load_standard_curve_from_file(std_curve_file)
+    
     def load_and_clean_data(self, csv_file, std_curve_file=None):
         """Load and clean the CSV data for Tempest format"""
+        self.excluded_wells = []
         try:
-            # Read the CSV file manually to handle complex format
-            self.raw_data = self.read_csv_manual(csv_file)
+            if self.curve_name and not self.handler_layout().separate_standard_curve:
+                # Handlers with standards on the plate always use them
+                raise ValueError(f"A named standard curve needs a handler with a separate standards plate "
+                                 f"({', '.join(separate_curve_handlers())}), not "
+                                 f"{getattr(self, 'liquid_handler', DEFAULT_HANDLER)}")
             
-            print(f"Raw data shape: {self.raw_data.shape}")
+            # Index the export sections and parse the fluorescence block in one pass
+            with self.profiler.span('parse') as span:
+                self.plate_export = parse_plate_export(csv_file)
+                span.count(sections=len(self.plate_export.sections))
             
-            # Find the fluorescence data section
-            fluorescence_start = None
-            for i, row in self.raw_data.iterrows():
-                if pd.notna(row[0]) and "Results for Fluorescein" in str(row[0]):
-                    fluorescence_start = i + 1
-                    break
+            load_log.info("Sections found: %d", len(self.plate_export.sections))
             
-            if fluorescence_start is None:
+            if self.plate_export.fluorescence is None:
                 raise ValueError("Could not find fluorescence data section")
             
-            print(f"Found fluorescence data starting at row {fluorescence_start}")
-            
-            # Extract fluorescence data (16 rows, 24 columns) - START FROM ROW + 1
-            # Row + 0 is the header row, Row + 1 is the actual data
-            fluorescence_data = self.raw_data.iloc[fluorescence_start+1:fluorescence_start+17, 1:25].copy()
-            
-            # Convert to numeric
-            for col in fluorescence_data.columns:
-                fluorescence_data[col] = pd.to_numeric(fluorescence_data[col], errors='coerce')
+            fluorescence_start = self.plate_export.fluorescence_line
+            load_log.info("Found fluorescence data starting at row %s", fluorescence_start)
+            
+            # Fluorescence data (16 rows, 24 columns on a 384-well plate) - data rows follow the column header row
+            self.geometry = self.plate_export.geometry
+            load_log.info("Plate format: %s wells", self.geometry.name)
+            if len(self.plate_export.channels) > 1:
+                load_log.info("Channels: %s", ', '.join(self.plate_export.channels))
+            if len(self.plate_export.repeats) > 1:
+                load_log.info("Fluorescence repeats: %s - RFU averaged per well",
+                              ', '.join(str(repeat) for repeat in self.plate_export.repeat_numbers))
+            self.check_calculated_results()
+            fluorescence_data = pd.DataFrame(self.plate_export.fluorescence,
+                                             index=range(fluorescence_start+1, fluorescence_start+1+self.geometry.rows),
+                                             columns=range(1, self.geometry.cols+1))
             
             self.fluorescence_data = fluorescence_data
             
             # Extract standard curve data
-            if std_curve_file:
-                # For Bravo 384: Use separate standard curve file
-                print(f"Loading standard curve data from separate file: {std_curve_file}")
-                self.standard_curve_data = self.load_standard_curve_from_file(std_curve_file)
+            self.cached_curve_params = None
+            self.curve_cache_key = None
+            if std_curve_file or self.curve_name:
+                # For Bravo 384: Use separate standard curve file (or its cached copy)
+                with self.profiler.span('load_std_curve_file'):
+                    self.standard_curve_data = self.load_separate_standard_curve(std_curve_file)
             else:
                 # For other handlers: Extract from main file (first 3 columns)
-                print("Extracting standard curve data from main file (first 3 columns)")
-                standard_curve_wells = []
-                standard_curve_rfu = []
-                
-                # Map of standard curve wells: A1, A2, A3, C1, C2, C3, E1, E2, E3, etc.
-                row_indices = [0, 2, 4, 6, 8, 10, 12, 14]  # A, C, E, G, I, K, M, O
-                col_indices = [0, 1, 2]  # Columns 1, 2, 3
-                
-                for i, row_idx in enumerate(row_indices):
-                    std_conc = self.standard_concentrations[i]
-                    for col_idx in col_indices:
-                        if row_idx < len(fluorescence_data) and col_idx < len(fluorescence_data.columns):
-                            rfu_value = fluorescence_data.iloc[row_idx, col_idx]
-                            if pd.notna(rfu_value) and rfu_value > 0:
-                                well_id = f"{chr(65+row_idx)}{col_idx+1}"
-                                standard_curve_wells.append(well_id)
-                                standard_curve_rfu.append(rfu_value)
-                                print(f"STD{i+1} well {well_id}: RFU = {rfu_value}, Conc = {std_conc}")
-                
-                print(f"Found {len(standard_curve_wells)} standard curve wells: {standard_curve_wells}")
-                print(f"Standard curve RFU values: {standard_curve_rfu}")
-                
-                # Create standard curve data using the provided concentrations
-                # We need to match concentrations to the wells we found
-                if len(standard_curve_rfu) >= 8:
-                    # Use the first 8 wells (3 wells each for STD1-STD8)
-                    concentrations = []
-                    rfu_values = []
-                    
-                    for i in range(8):
-                        # Get the 3 wells for each standard
-                        start_idx = i * 3
-                        if start_idx + 2 < len(standard_curve_rfu):
-                            # Use median of the 3 wells for each standard (more robust to outliers)
-                            median_rfu = np.median(standard_curve_rfu[start_idx:start_idx+3])
-                            concentrations.append(self.standard_concentrations[i])
-                            rfu_values.append(median_rfu)
-                            print(f"STD{i+1} median RFU: {median_rfu}, Concentration: {self.standard_concentrations[i]}")
-                    
-                    self.standard_curve_data = pd.DataFrame({
-                        'concentration': concentrations,
-                        'fluorescence': rfu_values
-                    })
-                else:
-                    raise ValueError(f"Insufficient standard curve wells found: {len(standard_curve_wells)}")
+                load_log.info("Extracting standard curve data from main file (first 3 columns)")
+                self.standard_curve_data = self.extract_standard_curve(self.plate_export.fluorescence)
             
-            print(f"Standard curve data: {len(self.standard_curve_data)} points")
-            print(f"Standard curve concentrations: {self.standard_curve_data['concentration'].tolist()}")
-            print(f"Standard curve RFU values: {self.standard_curve_data['fluorescence'].tolist()}")
-            print(f"Fluorescence data shape: {self.fluorescence_data.shape}")
+            load_log.info("Standard curve data: %d points", len(self.standard_curve_data))
+            if load_log.isEnabledFor(logging.DEBUG):
+                load_log.debug("Standard curve concentrations: %s", self.standard_curve_data['concentration'].tolist())
+                load_log.debug("Standard curve RFU values: %s", self.standard_curve_data['fluorescence'].tolist())
+            load_log.info("Fluorescence data shape: %s", self.fluorescence_data.shape)
             
             return True
             
         except Exception as e:
-            print(f"Error loading data: {str(e)}")
-            print("\nTroubleshooting tips:")
-            print("1. Check that your CSV file has the correct format")
-            print("2. Ensure the file contains 'Results for Fluorescein' section")
-            print("3. Verify that standard curve wells (first 3 columns) contain valid data")
-            print("4. Check for any special characters or encoding issues")
+            load_log.error("Error loading data: %s", e)
+            load_log.info("\nTroubleshooting tips:\n"
+                          "1. Check that your CSV file has the correct format\n"
+                          "2. Ensure the file contains 'Results for Fluorescein' section\n"
+                          "3. Verify that standard curve wells (first 3 columns) contain valid data\n"
+                          "4. Check for any special characters or encoding issues")
             return False
     
+    def check_calculated_results(self):
+        """Cross-check the reader's own %CV blocks against the parsed RFU - both come from the same pass over the file"""
+        self.reader_cv_mismatches = []
+        export = self.plate_export
+        for title, repeat, block in export.calculated:
+            if '%CV' not in title:
+                continue
+            position = export.repeat_numbers.index(repeat) if repeat in export.repeat_numbers else 0
+            plate = export.repeats[position]
+            if block.shape != plate.shape:
+                load_log.warning("Reader %%CV block (repeat %s) is %dx%d, the plate %dx%d - not cross-checked",
+                                 repeat, *block.shape, *plate.shape)
+                continue
+            n_groups, worst, wells = cross_check_calculated_cv(plate, block)
+            if len(wells):
+                names = self.geometry.well_names()[wells].tolist()
+                self.reader_cv_mismatches.extend(names)
+                load_log.warning("Reader %%CV (repeat %s) disagrees with the parsed RFU in %d wells (%s) - "
+                                 "check the export", repeat, len(names), ', '.join(names[:8]) + (", ..." if len(names) > 8 else ""))
+            else:
+                load_log.info("Reader %%CV cross-check (repeat %s): %d well groups agree (max difference %.1e)",
+                              repeat, n_groups, worst)
+    
     def build_standard_curve(self):
         """Perform linear regression to build standard curve"""
         try:
+            if self.cached_curve_params:
+                # Curve already fitted for this standard curve file - no need to re-fit
+                self.standard_curve_params = dict(self.cached_curve_params)
+                curve_log.info("Standard curve (cached): %s", curve_equation(self.standard_curve_params))
+                curve_log.info("R² = %.4f", self.standard_curve_params['r_squared'])
+                return True
+            
             if len(self.standard_curve_data) < 2:
                 raise ValueError("Insufficient standard curve data")
             
@@ -638,254 +1503,193 @@ class DispenserQCAnalyzerFixedBug:
             if np.std(valid_data['concentration']) == 0:
                 raise ValueError("All concentration values are the same (no variation)")
             
-            # Perform linear regression
+            # Fit concentration against fluorescence (qc_curve models; plain linear regression by default)
             x = valid_data['fluorescence'].values
             y = valid_data['concentration'].values
             
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+            params = fit_standard_curve(x, y, self.curve_model)
             
             # Check for reasonable results
-            if np.isnan(slope) or np.isnan(intercept):
-                raise ValueError("Linear regression produced NaN values")
-            
-            self.standard_curve_params = {
-                'slope': slope,
-                'intercept': intercept,
-                'r_squared': r_value**2,
-                'std_err': std_err
-            }
+            if not np.all(np.isfinite(params['coefficients'])):
+                raise ValueError(f"{params['model']} curve fit produced NaN values")
+            
+            self.standard_curve_params = params
             
-            print(f"Standard curve built: y = {slope:.8f}x + {intercept:.8f}")
-            print(f"R² = {r_value**2:.4f}")
+            if 'selection' in params:
+                curve_log.info("Standard curve model: %s (relative error %s)", params['model'],
+                               ', '.join(f"{name} {score:.2%}" for name, score in params['selection'].items()))
+            curve_log.info("Standard curve built: %s", curve_equation(params))
+            curve_log.info("R² = %.4f", params['r_squared'])
+            
+            if self.curve_cache and self.curve_cache_key:
+                self.curve_cache.put(self.curve_cache_key, self.standard_curve_data, self.standard_curve_params,
+                                     self.standard_concentrations, source_file=self.curve_source_file,
+                                     name=self.curve_name, excluded_wells=self.excluded_wells)
             
             return True
             
         except Exception as e:
-            print(f"Error building standard curve: {str(e)}")
-            print("\nTroubleshooting tips:")
-            print("1. Check that standard curve data contains numeric values")
-            print("2. Ensure there is variation in both concentration and fluorescence values")
-            print("3. Verify that the data follows a linear relationship")
+            curve_log.error("Error building standard curve: %s", e)
+            curve_log.info("\nTroubleshooting tips:\n"
+                           "1. Check that standard curve data contains numeric values\n"
+                           "2. Ensure there is variation in both concentration and fluorescence values\n"
+                           "3. Verify that the data follows a linear relationship")
             return False
     
     def calculate_concentrations(self):
         """Calculate concentrations for all wells using standard curve"""
         try:
-            # Create a copy of fluorescence data for calculations
-            self.calculated_concentrations = self.fluorescence_data.copy()
-            
-            # Apply standard curve to convert fluorescence to concentration
-            for row_idx in range(len(self.calculated_concentrations)):
-                for col_idx in range(len(self.calculated_concentrations.columns)):
-                    fluorescence = self.calculated_concentrations.iloc[row_idx, col_idx]
-                    if pd.notna(fluorescence) and fluorescence > 0:
-                        # Convert fluorescence to concentration
-                        concentration = (fluorescence * self.standard_curve_params['slope'] + 
-                                      self.standard_curve_params['intercept'])
-                        self.calculated_concentrations.iloc[row_idx, col_idx] = concentration
-            
-            print("Concentrations calculated for all wells")
+            # Apply the standard curve to the whole plate in one masked operation
+            concentrations = apply_standard_curve(self.fluorescence_data.to_numpy(dtype=float),
+                                                  self.standard_curve_params)
+            self.calculated_concentrations = pd.DataFrame(concentrations,
+                                                          index=self.fluorescence_data.index,
+                                                          columns=self.fluorescence_data.columns)
+            
+            qc_log.info("Concentrations calculated for all wells")
             return True
             
         except Exception as e:
-            print(f"Error calculating concentrations: {str(e)}")
+            qc_log.error("Error calculating concentrations: %s", e)
             return False
     
     def calculate_qc_metrics(self):
         """Calculate %CV and %Accuracy for each chip and nozzle - Multi-liquid handler version"""
         try:
-            self.qc_results = []
-            
             # Check if we have chip configurations from GUI, otherwise use default
-            if not hasattr(self, 'chip_configurations'):
-                # Default configuration: single chip covering columns 4-24
-                self.chip_configurations = [{
-                    'chip_id': 'Chip_1',
-                    'start_col': 3,  # 0-based indexing for columns 4-24
-                    'end_col': 23,
-                    'handler_type': 'Tempest'
-                }]
-            
-            for chip_config in self.chip_configurations:
-                chip_id = chip_config['chip_id']
-                start_col = chip_config['start_col']
-                end_col = chip_config['end_col']
-                handler_type = chip_config.get('handler_type', 'Tempest')
-                
-                if handler_type in ["D2", "Nano"]:
-                    # Single nozzle handlers - analyze all wells as one nozzle
-                    nozzle_data = []
-                    for row_idx in range(len(self.calculated_concentrations)):
-                        if row_idx < len(self.calculated_concentrations):
-                            # Get data from all columns except standard curve (columns 1-3)
-                            chip_data = self.calculated_concentrations.iloc[row_idx, start_col:end_col+1].dropna()
-                            nozzle_data.extend(chip_data.values)
-                    
-                    if len(nozzle_data) > 0:
-                        mean_conc = np.mean(nozzle_data)
-                        std_conc = np.std(nozzle_data)
-                        cv_percent = (std_conc / mean_conc) * 100 if mean_conc != 0 else 0
-                        accuracy_percent = ((mean_conc - self.target_concentration) / self.target_concentration) * 100
-                        
-                        col_range = f"columns {start_col+1}-{end_col+1}"
-                        print(f"{chip_id}: Using {len(nozzle_data)} measurements from {col_range}")
-                        print(f"  Mean: {mean_conc:.2f}, Std: {std_conc:.2f}, CV: {cv_percent:.2f}%, Accuracy: {accuracy_percent:.2f}%")
-                        
-                        self.qc_results.append({
-                            'nozzle_id': f"{chip_id}_Single_Nozzle",
-                            'chip_id': chip_id,
-                            'mean_concentration': mean_conc,
-                            'std_concentration': std_conc,
-                            'cv_percent': cv_percent,
-                            'accuracy_percent': accuracy_percent,
-                            'n_measurements': len(nozzle_data),
-                            'column_range': f"{start_col+1}-{end_col+1}",
-                            'handler_type': handler_type
-                        })
-                
-                elif handler_type == "Bravo - 96":
-                    # Bravo 96 - quadrant stamping (A4,A5 & B4,B5 pattern)
-                    # Each quadrant is analyzed separately
-                    quadrants = [
-                        {'name': 'Quadrant_1', 'rows': [0, 1], 'cols': [3, 4]},  # A4, A5, B4, B5
-                        {'name': 'Quadrant_2', 'rows': [0, 1], 'cols': [5, 6]},  # A6, A7, B6, B7
-                        {'name': 'Quadrant_3', 'rows': [2, 3], 'cols': [3, 4]},  # C4, C5, D4, D5
-                        {'name': 'Quadrant_4', 'rows': [2, 3], 'cols': [5, 6]},  # C6, C7, D6, D7
-                        # Continue for all quadrants...
-                    ]
-                    
-                    # Generate all quadrants (4x6 pattern)
-                    quadrants = []
-                    for row_group in range(0, 16, 4):  # 4 rows per group
-                        for col_group in range(3, 24, 2):  # 2 columns per group
-                            quadrants.append({
-                                'name': f'Quadrant_{len(quadrants)+1}',
-                                'rows': [row_group, row_group+1],
-                                'cols': [col_group, col_group+1]
-                            })
-                    
-                    for quadrant in quadrants:
-                        nozzle_data = []
-                        for row_idx in quadrant['rows']:
-                            for col_idx in quadrant['cols']:
-                                if (row_idx < len(self.calculated_concentrations) and 
-                                    col_idx < len(self.calculated_concentrations.columns)):
-                                    val = self.calculated_concentrations.iloc[row_idx, col_idx]
-                                    if pd.notna(val) and val > 0:
-                                        nozzle_data.append(val)
-                        
-                        if len(nozzle_data) > 0:
-                            mean_conc = np.mean(nozzle_data)
-                            std_conc = np.std(nozzle_data)
-                            cv_percent = (std_conc / mean_conc) * 100 if mean_conc != 0 else 0
-                            accuracy_percent = ((mean_conc - self.target_concentration) / self.target_concentration) * 100
-                            
-                            print(f"{chip_id}_{quadrant['name']}: Using {len(nozzle_data)} measurements")
-                            print(f"  Mean: {mean_conc:.2f}, Std: {std_conc:.2f}, CV: {cv_percent:.2f}%, Accuracy: {accuracy_percent:.2f}%")
-                            
-                            self.qc_results.append({
-                                'nozzle_id': f"{chip_id}_{quadrant['name']}",
-                                'chip_id': chip_id,
-                                'mean_concentration': mean_conc,
-                                'std_concentration': std_conc,
-                                'cv_percent': cv_percent,
-                                'accuracy_percent': accuracy_percent,
-                                'n_measurements': len(nozzle_data),
-                                'column_range': f"quadrant_{len(quadrants)}",
-                                'handler_type': handler_type
-                            })
-                
-                elif handler_type == "Bravo - 384":
-                    # Bravo 384 - each nozzle responsible for 1 well
-                    # Analyze each well individually
-                    well_count = 0
-                    for row_idx in range(len(self.calculated_concentrations)):
-                        for col_idx in range(start_col, end_col+1):
-                            if col_idx < len(self.calculated_concentrations.columns):
-                                val = self.calculated_concentrations.iloc[row_idx, col_idx]
-                                if pd.notna(val) and val > 0:
-                                    well_count += 1
-                                    # Each well is its own "nozzle" for QC purposes
-                                    nozzle_id = f"{chip_id}_Well_{well_count}"
-                                    
-                                    # For single well, CV is 0 (no variation within well)
-                                    mean_conc = val
-                                    std_conc = 0
-                                    cv_percent = 0
-                                    accuracy_percent = ((mean_conc - self.target_concentration) / self.target_concentration) * 100
-                                    
-                                    well_pos = f"{chr(65+row_idx)}{col_idx+1}"
-                                    print(f"{nozzle_id} ({well_pos}): Concentration = {mean_conc:.2f}, Accuracy: {accuracy_percent:.2f}%")
-                                    
-                                    self.qc_results.append({
-                                        'nozzle_id': nozzle_id,
-                                        'chip_id': chip_id,
-                                        'mean_concentration': mean_conc,
-                                        'std_concentration': std_conc,
-                                        'cv_percent': cv_percent,
-                                        'accuracy_percent': accuracy_percent,
-                                        'n_measurements': 1,
-                                        'column_range': well_pos,
-                                        'handler_type': handler_type
-                                    })
-                
-                else:  # Tempest, Combi - 8 nozzles, 2 rows per nozzle
-                    # Each chip has 8 nozzles (16 rows total, 2 rows per nozzle)
-                    # Nozzle 1 = Row A & B, Nozzle 2 = Row C & D, etc.
-                    nozzle_groups = []
-                    for i in range(0, 16, 2):  # 8 nozzles, 2 rows each
-                        nozzle_groups.append({
-                            'nozzle_id': f"{chip_id}_Nozzle_{i//2 + 1}",
-                            'rows': [i, i + 1]  # Use 2 rows per nozzle (e.g., A & B for Nozzle 1)
-                        })
-                    
-                    for group in nozzle_groups:
-                        # Extract data for this nozzle from the chip's column range
-                        nozzle_data = []
-                        for row_idx in group['rows']:
-                            if row_idx < len(self.calculated_concentrations):
-                                # Get data from the chip's assigned columns
-                                chip_data = self.calculated_concentrations.iloc[row_idx, start_col:end_col+1].dropna()
-                                nozzle_data.extend(chip_data.values)
-                        
-                        if len(nozzle_data) > 0:
-                            # Calculate metrics
-                            mean_conc = np.mean(nozzle_data)
-                            std_conc = np.std(nozzle_data)
-                            
-                            # %CV = (std_dev / mean) * 100
-                            cv_percent = (std_conc / mean_conc) * 100 if mean_conc != 0 else 0
-                            
-                            # %Accuracy = ((mean - target) / target) * 100
-                            accuracy_percent = ((mean_conc - self.target_concentration) / self.target_concentration) * 100
-                            
-                            # Debug output
-                            col_range = f"columns {start_col+1}-{end_col+1}"
-                            print(f"{group['nozzle_id']}: Using {len(nozzle_data)} measurements from {col_range}")
-                            print(f"  Mean: {mean_conc:.2f}, Std: {std_conc:.2f}, CV: {cv_percent:.2f}%, Accuracy: {accuracy_percent:.2f}%")
-                            
-                            self.qc_results.append({
-                                'nozzle_id': group['nozzle_id'],
-                                'chip_id': chip_id,
-                                'mean_concentration': mean_conc,
-                                'std_concentration': std_conc,
-                                'cv_percent': cv_percent,
-                                'accuracy_percent': accuracy_percent,
-                                'n_measurements': len(nozzle_data),
-                                'column_range': f"{start_col+1}-{end_col+1}",
-                                'handler_type': handler_type
-                            })
-            
-            print(f"QC metrics calculated for {len(self.qc_results)} nozzles/quadrants/wells across {len(self.chip_configurations)} chips")
+            if not getattr(self, 'chip_configurations', None):
+                # Default configuration: single chip covering every column after the standards (4-24 on 384 wells)
+                self.chip_configurations = default_chip_configurations(getattr(self, 'liquid_handler', DEFAULT_HANDLER),
+                                                                       self.geometry)
+            
+            check_chip_columns(self.chip_configurations, self.geometry)
+            
+            # Grouped reduction over the whole plate (a stack of one)
+            with self.profiler.span('compile_groups') as span:
+                group_index = compile_group_index(self.chip_configurations, self.geometry)
+                span.count(chips=len(self.chip_configurations), groups=group_index['n_groups'])
+            with self.profiler.span('grouped_reduction') as span:
+                concentrations = self.calculated_concentrations.to_numpy(dtype=float)[np.newaxis]
+                outlier_method = self.outlier_method if self.outlier_scope in ('both', 'samples') else None
+                self.qc_table = calculate_qc_table(concentrations, group_index, self.target_concentration,
+                                                   outlier_method, **self.outlier_options())
+                self.spatial_effects = None
+                if self.spatial_method:
+                    self.qc_table, effects = spatial_qc_table(self.qc_table, concentrations, group_index,
+                                                              self.target_concentration, self.spatial_method,
+                                                              outlier_method, **self.outlier_options())
+                    self.spatial_effects = {column: float(effects[column].iloc[0]) for column in SPATIAL_COLUMNS}
+                self.qc_results = self.qc_table.drop(columns='plate').to_dict('records')
+                if outlier_method:
+                    self.record_sample_outliers(outlier_method)
+                    if outlier_method == 'dixon':
+                        self.warn_unscreened_groups()
+                if self.profiler.enabled:
+                    span.count(wells=int(self.qc_table['n_measurements'].sum()), groups=len(self.qc_results))
+            
+            # Per-group detail - skipped entirely unless someone is listening
+            # (per-well handlers such as Bravo 384 only at DEBUG level: up to 336 lines per plate)
+            if qc_log.isEnabledFor(logging.INFO):
+                well_detail = qc_log.isEnabledFor(logging.DEBUG)
+                for result in self.qc_results:
+                    handler = get_handler(result['handler_type'])
+                    if handler.per_well:
+                        if well_detail:
+                            qc_log.debug("%s (%s): Concentration = %.2f, Accuracy: %.2f%%", result['nozzle_id'],
+                                         result['column_range'], result['mean_concentration'], result['accuracy_percent'])
+                        continue
+                    if handler.pattern == 'blocks':
+                        qc_log.info("%s: Using %d measurements", result['nozzle_id'], result['n_measurements'])
+                    else:
+                        qc_log.info("%s: Using %d measurements from columns %s", result['nozzle_id'],
+                                    result['n_measurements'], result['column_range'])
+                    qc_log.info("  Mean: %.2f, Std: %.2f, CV: %.2f%%, Accuracy: %.2f%%", result['mean_concentration'],
+                                result['std_concentration'], result['cv_percent'], result['accuracy_percent'])
+                    if result.get('n_excluded'):
+                        qc_log.info("  Excluded outliers: %s", result['excluded_wells'].replace(';', ', '))
+            
+            if self.spatial_effects:
+                qc_log.info("Spatial effects (%s): row gradient %.2f%%, column gradient %.2f%%, edge effect %+.2f%%; "
+                            "average %%CV %.2f%% raw, %.2f%% corrected", self.spatial_method,
+                            self.spatial_effects['row_gradient'], self.spatial_effects['col_gradient'],
+                            self.spatial_effects['edge_effect'], self.qc_table['cv_percent'].mean(),
+                            self.qc_table['corrected_cv_percent'].mean())
+            qc_log.info("QC metrics calculated for %d nozzles/quadrants/wells across %d chips",
+                        len(self.qc_results), len(self.chip_configurations))
             return True
             
         except Exception as e:
-            print(f"Error calculating QC metrics: {str(e)}")
+            qc_log.error("Error calculating QC metrics: %s", e)
             return False
     
-    def generate_plots(self, output_dir, csv_filename=None):
-        """Generate visualization plots"""
+    def record_sample_outliers(self, outlier_method):
+        """Add the sample wells rejected in calculate_qc_table to excluded_wells"""
+        plate = self.calculated_concentrations.to_numpy(dtype=float)
+        for result in self.qc_results:
+            for well_id in filter(None, result['excluded_wells'].split(';')):
+                row, col = self.geometry.parse_well(well_id)
+                self.excluded_wells.append({'kind': 'sample', 'group': result['nozzle_id'], 'well': well_id,
+                                            'value': float(plate[row, col]), 'method': outlier_method})
+    
+    def warn_unscreened_groups(self):
+        """Dixon's Q test has critical values for groups of up to DIXON_MAX_GROUP wells - say so for larger nozzle groups"""
+        too_large = int((self.qc_table['n_measurements'] > DIXON_MAX_GROUP).sum())
+        if too_large:
+            qc_log.warning("Dixon's Q test covers groups of %d-%d values: %d of %d nozzle groups are larger and "
+                           "were not screened for outliers", MIN_GROUP_SIZE, DIXON_MAX_GROUP, too_large, len(self.qc_table))
+    
+    def heatmap_task(self, path, plate):
+        """Plot task for the whole-plate heatmap: RFU, concentration, %Accuracy and deviation from the chip mean"""
+        geometry = self.geometry
+        table = self.well_table(plate)
+        samples = (table['role'] == 'sample').to_numpy()
+        counted = table['counted'].to_numpy()
+        rfu = table['rfu'].to_numpy(dtype=float)
+        concentration = table['concentration'].to_numpy(dtype=float)
+        accuracy = np.where(samples, (concentration - self.target_concentration) / self.target_concentration * 100, np.nan)
+        chip_mean = table['concentration'].where(counted).groupby(table['chip'], observed=True).transform('mean')
+        deviation = np.where(counted, (concentration / chip_mean.to_numpy(dtype=float) - 1) * 100, np.nan)
+        
+        panels = []
+        for title, values, cmap, label, reference, centered in (
+                ('Fluorescence', rfu, 'viridis', 'RFU', rfu[samples], False),
+                ('Concentration', concentration, 'viridis', 'Concentration', concentration[samples], False),
+                ('Accuracy', accuracy, 'RdBu_r', '%Accuracy', None, True),
+                ('Deviation from chip mean', deviation, 'RdBu_r', '% of chip mean', None, True)):
+            vmin, vmax = heatmap_limits(values, reference if reference is not None and reference.size else None,
+                                        centered)
+            panels.append({'title': title, 'values': values.reshape(geometry.shape), 'cmap': cmap, 'label': label,
+                           'vmin': vmin, 'vmax': vmax})
+        excluded = np.flatnonzero(table['excluded'].to_numpy())
+        return {
+            'kind': 'heatmap',
+            'name': 'plate_heatmap',
+            'path': path,
+            'figsize': (16, 9),
+            'title': f"{plate} - {geometry.name}-well plate (excluded wells marked x)" if len(excluded)
+                     else f"{plate} - {geometry.name}-well plate",
+            'panels': panels,
+            'row_labels': list(geometry.row_labels),
+            'col_labels': [str(col + 1) for col in range(geometry.cols)],
+            'excluded': [list(divmod(int(well), geometry.cols)) for well in excluded],
+        }
+    
+    def generate_plots(self, output_dir, csv_filename=None, plot_format='png', dpi=None, workers=None):
+        """Generate visualization plots
+        
+        plot_format is one of PLOT_FORMATS ('png', 'svg' or 'preview'); dpi overrides
+        the preset resolution. Chip figures are rendered in `workers` processes
+        (default: up to the CPU count when there are several chips, 1 = in-process).
+        Per-well handlers get a whole-plate heatmap instead of one bar per well
+        (see HEATMAP_MODES and self.heatmaps).
+        """
         try:
+            if plot_format not in PLOT_FORMATS:
+                raise ValueError(f"Unknown plot format '{plot_format}' (choose from {', '.join(PLOT_FORMATS)})")
+            plot_options = dict(PLOT_FORMATS[plot_format])
+            if dpi:
+                plot_options['dpi'] = dpi
+            
             # Create plots directory with filename-based naming
             if csv_filename:
                 # Extract filename without extension and append "-plots"
@@ -894,32 +1698,17 @@ class DispenserQCAnalyzerFixedBug:
             else:
                 plots_dir = Path(output_dir) / "plots"
             plots_dir.mkdir(exist_ok=True)
+            extension = plot_options['format']
             
             # 1. Standard curve plot
-            plt.figure(figsize=(10, 6))
-            plt.scatter(self.standard_curve_data['fluorescence'], 
-                       self.standard_curve_data['concentration'], 
-                       color='blue', s=100, label='Data points')
-            
-            # Add regression line
-            x_range = np.linspace(self.standard_curve_data['fluorescence'].min(), 
-                                 self.standard_curve_data['fluorescence'].max(), 100)
-            y_pred = x_range * self.standard_curve_params['slope'] + self.standard_curve_params['intercept']
-            plt.plot(x_range, y_pred, 'r-', label=f'R² = {self.standard_curve_params["r_squared"]:.4f}')
-            
-            # Add equation text to the plot
-            equation_text = f'y = {self.standard_curve_params["slope"]:.8f}x + {self.standard_curve_params["intercept"]:.8f}'
-            plt.text(0.05, 0.95, f'Equation: {equation_text}', 
-                    transform=plt.gca().transAxes, fontsize=12, 
-                    verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-            
-            plt.xlabel('Fluorescence (RFU)')
-            plt.ylabel('Concentration')
-            plt.title('Standard Curve')
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            plt.savefig(plots_dir / 'standard_curve.png', dpi=300, bbox_inches='tight')
-            plt.close()
+            plot_tasks = [{
+                'kind': 'standard_curve',
+                'name': 'standard_curve',
+                'path': str(plots_dir / f'standard_curve.{extension}'),
+                'fluorescence': self.standard_curve_data['fluorescence'].tolist(),
+                'concentration': self.standard_curve_data['concentration'].tolist(),
+                'curve_params': self.standard_curve_params,
+            }]
             
             # 2. Nozzle performance plots - separate plot for each chip
             if self.qc_results:
@@ -931,138 +1720,88 @@ class DispenserQCAnalyzerFixedBug:
                         chip_results[chip_id] = []
                     chip_results[chip_id].append(result)
                 
+                # Whole-plate heatmap - needs the per-well concentrations, so not for results alone
+                if self.heatmaps not in HEATMAP_MODES:
+                    raise ValueError(f"Unknown heatmap mode '{self.heatmaps}' (choose from {', '.join(HEATMAP_MODES)})")
+                per_well_chips = {chip_id for chip_id, chip_data in chip_results.items()
+                                  if get_handler(chip_data[0].get('handler_type', DEFAULT_HANDLER)).per_well}
+                heatmap = (self.heatmaps == 'all' or (self.heatmaps == 'auto' and per_well_chips)) and \
+                    self.calculated_concentrations is not None and self.qc_table is not None
+                if heatmap:
+                    plot_tasks.append(self.heatmap_task(str(plots_dir / f'plate_heatmap.{extension}'),
+                                                        Path(csv_filename).stem if csv_filename else "Plate"))
+                
                 # Create separate plots for each chip
                 for chip_id, chip_data in chip_results.items():
                     # Get handler type for this chip
-                    handler_type = chip_data[0].get('handler_type', 'Tempest')
-                    
-                    # Extract labels based on handler type
-                    if handler_type in ["D2", "Nano"]:
-                        labels = ["Single_Nozzle"]
-                        title_suffix = "Single Nozzle"
-                    elif handler_type == "Bravo - 96":
-                        labels = [r['nozzle_id'].split('_Quadrant_')[1] for r in chip_data]
-                        title_suffix = "Quadrant"
-                    elif handler_type == "Bravo - 384":
-                        labels = [r['nozzle_id'].split('_Well_')[1] for r in chip_data]
-                        title_suffix = "Well"
-                    else:  # Tempest, Combi
-                        labels = [r['nozzle_id'].split('_Nozzle_')[1] for r in chip_data]
-                        title_suffix = "Nozzle"
-                    
-                    cv_values = [r['cv_percent'] for r in chip_data]
-                    accuracy_values = [r['accuracy_percent'] for r in chip_data]
-                    
-                    # Calculate chip averages
-                    chip_mean_cv = np.mean(cv_values)
-                    chip_mean_accuracy = np.mean(accuracy_values)
-                    
-                    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-                    
-                    # CV plot
-                    bars1 = ax1.bar(labels, cv_values, color='skyblue')
-                    ax1.set_ylabel('%CV')
-                    ax1.set_title(f'{chip_id} - {title_suffix} Precision (%CV)')
-                    ax1.grid(True, alpha=0.3)
-                    
-                    # Add value labels on bars
-                    for bar, value in zip(bars1, cv_values):
-                        ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-                                f'{value:.1f}%', ha='center', va='bottom')
-                    
-                    # Add chip average line
-                    ax1.axhline(y=chip_mean_cv, color='red', linestyle='--', linewidth=2, label=f'Chip Average: {chip_mean_cv:.1f}%')
-                    ax1.legend()
+                    handler = get_handler(chip_data[0].get('handler_type', DEFAULT_HANDLER))
+                    if heatmap and chip_id in per_well_chips:
+                        continue  # One bar per well is unreadable - the heatmap shows these wells
                     
-                    # Accuracy plot
-                    bars2 = ax2.bar(labels, accuracy_values, color='lightcoral')
-                    ax2.set_ylabel('%Accuracy')
-                    ax2.set_title(f'{chip_id} - {title_suffix} Accuracy (%Accuracy)')
-                    ax2.grid(True, alpha=0.3)
-                    
-                    # Add value labels on bars
-                    for bar, value in zip(bars2, accuracy_values):
-                        ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-                                f'{value:.1f}%', ha='center', va='bottom')
-                    
-                    # Add chip average line
-                    ax2.axhline(y=chip_mean_accuracy, color='red', linestyle='--', linewidth=2, label=f'Chip Average: {chip_mean_accuracy:.1f}%')
-                    ax2.legend()
+                    # Label each group by its number - single-group handlers by their component name
+                    component = handler.component.replace(' ', '_')
+                    if handler.single_group:
+                        labels = [component]
+                    else:
+                        labels = [r['nozzle_id'].split(f'_{component}_')[1] for r in chip_data]
+                    title_suffix = handler.component
                     
-                    plt.tight_layout()
                     # Create filename with chip name
                     chip_filename = chip_id.lower().replace(' ', '_').replace('-', '_')
-                    plt.savefig(plots_dir / f'{chip_filename}_{title_suffix.lower()}_performance.png', dpi=300, bbox_inches='tight')
-                    plt.close()
+                    plot_tasks.append({
+                        'kind': 'performance',
+                        'name': chip_id,
+                        'path': str(plots_dir / f'{chip_filename}_{title_suffix.lower()}_performance.{extension}'),
+                        'figsize': (15, 6),
+                        'labels': labels,
+                        'cv_values': [float(r['cv_percent']) for r in chip_data],
+                        'accuracy_values': [float(r['accuracy_percent']) for r in chip_data],
+                        'title_prefix': f'{chip_id} - {title_suffix}',
+                        'average_label': 'Chip Average',
+                        'rotate_labels': False,
+                    })
                 
                 # Also create a combined plot for all chips (optional)
-                if len(chip_results) > 1:
-                    all_nozzle_ids = [r['nozzle_id'] for r in self.qc_results]
-                    all_cv_values = [r['cv_percent'] for r in self.qc_results]
-                    all_accuracy_values = [r['accuracy_percent'] for r in self.qc_results]
-                    
-                    # Calculate overall averages
-                    overall_mean_cv = np.mean(all_cv_values)
-                    overall_mean_accuracy = np.mean(all_accuracy_values)
-                    
+                if len(chip_results) > 1 and not (heatmap and per_well_chips == set(chip_results)):
                     # Determine title suffix based on handler types
-                    handler_types = set(r.get('handler_type', 'Tempest') for r in self.qc_results)
+                    handler_types = set(r.get('handler_type', DEFAULT_HANDLER) for r in self.qc_results)
                     if len(handler_types) == 1:
-                        handler_type = list(handler_types)[0]
-                        if handler_type in ["D2", "Nano"]:
-                            title_suffix = "Single Nozzle"
-                        elif handler_type == "Bravo - 96":
-                            title_suffix = "Quadrant"
-                        elif handler_type == "Bravo - 384":
-                            title_suffix = "Well"
-                        else:
-                            title_suffix = "Nozzle"
+                        title_suffix = get_handler(handler_types.pop()).component
                     else:
                         title_suffix = "Component"
                     
-                    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 6))
-                    
-                    # CV plot
-                    bars1 = ax1.bar(all_nozzle_ids, all_cv_values, color='skyblue')
-                    ax1.set_ylabel('%CV')
-                    ax1.set_title(f'All Chips - {title_suffix} Precision (%CV)')
-                    ax1.grid(True, alpha=0.3)
-                    ax1.tick_params(axis='x', rotation=45)
-                    
-                    # Add value labels on bars
-                    for bar, value in zip(bars1, all_cv_values):
-                        ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-                                f'{value:.1f}%', ha='center', va='bottom')
-                    
-                    # Add overall average line
-                    ax1.axhline(y=overall_mean_cv, color='red', linestyle='--', linewidth=2, label=f'Overall Average: {overall_mean_cv:.1f}%')
-                    ax1.legend()
-                    
-                    # Accuracy plot
-                    bars2 = ax2.bar(all_nozzle_ids, all_accuracy_values, color='lightcoral')
-                    ax2.set_ylabel('%Accuracy')
-                    ax2.set_title(f'All Chips - {title_suffix} Accuracy (%Accuracy)')
-                    ax2.grid(True, alpha=0.3)
-                    ax2.tick_params(axis='x', rotation=45)
-                    
-                    # Add value labels on bars
-                    for bar, value in zip(bars2, all_accuracy_values):
-                        ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-                                f'{value:.1f}%', ha='center', va='bottom')
-                    
-                    # Add overall average line
-                    ax2.axhline(y=overall_mean_accuracy, color='red', linestyle='--', linewidth=2, label=f'Overall Average: {overall_mean_accuracy:.1f}%')
-                    ax2.legend()
-                    
-                    plt.tight_layout()
-                    plt.savefig(plots_dir / f'all_chips_{title_suffix.lower().replace(" ", "_")}_performance.png', dpi=300, bbox_inches='tight')
-                    plt.close()
+                    plot_tasks.append({
+                        'kind': 'performance',
+                        'name': 'all_chips',
+                        'path': str(plots_dir / f'all_chips_{title_suffix.lower().replace(" ", "_")}_performance.{extension}'),
+                        'figsize': (20, 6),
+                        'labels': [r['nozzle_id'] for r in self.qc_results],
+                        'cv_values': [float(r['cv_percent']) for r in self.qc_results],
+                        'accuracy_values': [float(r['accuracy_percent']) for r in self.qc_results],
+                        'title_prefix': f'All Chips - {title_suffix}',
+                        'average_label': 'Overall Average',
+                        'rotate_labels': True,
+                    })
             
-            print(f"Plots saved to: {plots_dir}")
+            # Only figures whose content changed since the last run are rendered again
+            pending = []
+            for task in plot_tasks:
+                plot_key = StageCache.fingerprint(task, plot_options)
+                if self.stage_cache.get(f"plot:{task['path']}", plot_key) and os.path.exists(task['path']):
+                    continue
+                pending.append((task, plot_key))
+            if len(pending) < len(plot_tasks):
+                output_log.info("%d of %d plots unchanged", len(plot_tasks) - len(pending), len(plot_tasks))
+            render_plot_tasks_parallel([task for task, _ in pending], plot_options, workers, profiler=self.profiler)
+            for task, plot_key in pending:
+                self.stage_cache.put(f"plot:{task['path']}", plot_key, True)
+            self.plot_files = [task['path'] for task in plot_tasks]
+            
+            output_log.info("Plots saved to: %s", plots_dir)
             return True
             
         except Exception as e:
-            print(f"Error generating plots: {str(e)}")
+            output_log.error("Error generating plots: %s", e)
             return False
     
     def generate_output_file(self, input_file):
@@ -1077,7 +1816,7 @@ class DispenserQCAnalyzerFixedBug:
             
             # Add calculated concentrations (include ALL columns for reference)
             for row_idx in range(len(self.calculated_concentrations)):
-                row_data = [f"Row_{chr(65 + row_idx)}"]  # A, B, C, etc.
+                row_data = [f"Row_{self.geometry.row_labels[row_idx]}"]  # A, B, C, ..., AA, AB for 1536 wells
                 for col_idx in range(len(self.calculated_concentrations.columns)):
                     val = self.calculated_concentrations.iloc[row_idx, col_idx]
                     if pd.notna(val):
@@ -1090,7 +1829,14 @@ class DispenserQCAnalyzerFixedBug:
             output_data.append([""] * (len(self.calculated_concentrations.columns) + 1))
             
             # Add QC results
-            output_data.append(["QC Results", "Chip", "Nozzle", "Mean Conc", "Std Dev", "%CV", "%Accuracy", "N", "Columns"])
+            qc_header = ["QC Results", "Chip", "Nozzle", "Mean Conc", "Std Dev", "%CV", "%Accuracy", "N", "Columns"]
+            report_exclusions = 'excluded_wells' in self.qc_table.columns
+            if report_exclusions:
+                qc_header.append("Excluded Wells")
+            report_corrected = 'corrected_cv_percent' in self.qc_table.columns
+            if report_corrected:
+                qc_header.append("Corrected %CV")
+            output_data.append(qc_header)
             
             # Group results by chip to calculate averages
             chip_results = {}
@@ -1111,7 +1857,7 @@ class DispenserQCAnalyzerFixedBug:
                     chip_name = "N/A"
                     nozzle_name = nozzle_id
                 
-                output_data.append([
+                qc_row = [
                     "",  # Empty cell for "QC Results" column
                     chip_name,
                     nozzle_name,
@@ -1121,7 +1867,12 @@ class DispenserQCAnalyzerFixedBug:
                     f"{result['accuracy_percent']:.2f}%",
                     result['n_measurements'],
                     f"Cols {result.get('column_range', 'N/A')}"  # Use "Cols" prefix to prevent date conversion
-                ])
+                ]
+                if report_exclusions:
+                    qc_row.append(result['excluded_wells'])
+                if report_corrected:
+                    qc_row.append(f"{result['corrected_cv_percent']:.2f}%")
+                output_data.append(qc_row)
             
             # Add chip average rows
             for chip_id, chip_data in chip_results.items():
@@ -1131,7 +1882,7 @@ class DispenserQCAnalyzerFixedBug:
                 chip_mean_accuracy = np.mean(chip_accuracy_values)
                 chip_total_measurements = sum(r['n_measurements'] for r in chip_data)
                 
-                output_data.append([
+                chip_row = [
                     "",  # Empty cell for "QC Results" column
                     chip_id,
                     "CHIP_AVERAGE",
@@ -1141,7 +1892,12 @@ class DispenserQCAnalyzerFixedBug:
                     f"{chip_mean_accuracy:.2f}%",
                     chip_total_measurements,
                     f"Cols {chip_data[0].get('column_range', 'N/A')}"  # Use first nozzle's column range
-                ])
+                ]
+                if report_corrected:
+                    if report_exclusions:
+                        chip_row.append("")
+                    chip_row.append(f"{np.mean([r['corrected_cv_percent'] for r in chip_data]):.2f}%")
+                output_data.append(chip_row)
             
             # Add summary statistics
             output_data.append([""])
@@ -1152,92 +1908,454 @@ class DispenserQCAnalyzerFixedBug:
             output_data.append(["Average %CV", f"{np.mean(all_cv):.2f}%"])
             output_data.append(["Average %Accuracy", f"{np.mean(all_accuracy):.2f}%"])
             output_data.append(["Standard Curve R²", f"{self.standard_curve_params['r_squared']:.4f}"])
-            output_data.append(["Linear Regression Equation", f"y = {self.standard_curve_params['slope']:.8f}x + {self.standard_curve_params['intercept']:.8f}"])
+            if self.standard_curve_params.get('model', 'linear') == 'linear':
+                output_data.append(["Linear Regression Equation", curve_equation(self.standard_curve_params)])
+            else:
+                output_data.append(["Standard Curve Model", self.standard_curve_params['model']])
+                output_data.append(["Standard Curve Equation", curve_equation(self.standard_curve_params)])
             output_data.append(["Best %CV", f"{min(all_cv):.2f}%"])
             output_data.append(["Worst %CV", f"{max(all_cv):.2f}%"])
+            if len(self.plate_export.repeats) > 1:
+                output_data.append(["Repeats", f"{len(self.plate_export.repeats)} (RFU averaged per well)"])
+            if self.reader_cv_mismatches:
+                output_data.append(["Reader %CV Mismatch", ';'.join(self.reader_cv_mismatches)])
+            if self.spatial_effects:
+                output_data.append(["Spatial Model", self.spatial_method])
+                output_data.append(["Row Gradient", f"{self.spatial_effects['row_gradient']:.2f}%"])
+                output_data.append(["Column Gradient", f"{self.spatial_effects['col_gradient']:.2f}%"])
+                output_data.append(["Edge Effect", f"{self.spatial_effects['edge_effect']:+.2f}%"])
+                output_data.append(["Average Corrected %CV",
+                                    f"{np.mean([r['corrected_cv_percent'] for r in self.qc_results]):.2f}%"])
             output_data.append(["", ""])
             output_data.append(["Note", "QC calculations exclude standard curve wells (columns 1-3). Each nozzle uses 2 rows (e.g., Nozzle 1 = Row A & B)"])
             
+            # Outlier report (only when outlier rejection is on)
+            if self.outlier_method:
+                output_data.append([""])
+                output_data.append(["Excluded Wells", "Type", "Group", "Well", "Value", "Units", "Method"])
+                for excluded in self.excluded_wells:
+                    output_data.append(["", excluded['kind'], excluded['group'], excluded['well'],
+                                        f"{excluded['value']:.6f}", "RFU" if excluded['kind'] == 'standard' else "Conc",
+                                        excluded['method']])
+                if not self.excluded_wells:
+                    output_data.append(["", "None"])
+            
+            # Control chart report (only when SPC is on)
+            if self.spc is not None:
+                output_data.append([""])
+                output_data.append(["SPC Violations", "Nozzle", "Metric", "Rule", "Direction", "Value", "Center"])
+                for violation in self.spc_violations:
+                    output_data.append(["", violation['nozzle_id'], violation['metric'], violation['rule'],
+                                        violation['direction'], f"{violation['value']:.2f}",
+                                        f"{violation['center']:.2f}"])
+                if not self.spc_violations:
+                    output_data.append(["", "None"])
+            
             # Save to CSV
             output_df = pd.DataFrame(output_data)
             output_df.to_csv(output_file, index=False, header=False)
             
-            print(f"Output file saved: {output_file}")
+            output_log.info("Output file saved: %s", output_file)
             return str(output_file)
             
         except Exception as e:
-            print(f"Error generating output file: {str(e)}")
+            output_log.error("Error generating output file: %s", e)
             return None
     
-    def process_qc_analysis(self, csv_file, std_curve_file=None, generate_plots=True):
-        """Main processing workflow"""
-        print("Starting Dispenser QC Analysis (Fixed Bug Version)...")
-        print("=" * 50)
+    def well_table(self, plate):
+        """Typed long-format table, one row per well: position, RFU, concentration, QC group and flags
+        
+        role is 'standard', 'sample' (in a QC group) or 'unused'; excluded marks
+        outlier-rejected wells, counted the wells that went into their group's
+        statistics and reader_cv_mismatch the wells flagged by the %CV cross-check.
+        """
+        geometry = self.geometry
+        layout = self.handler_layout()
+        well_names = geometry.well_names()
+        concentration = self.calculated_concentrations.to_numpy(dtype=float).ravel()
+        
+        role = np.full(geometry.n_wells, 'unused', dtype=object)
+        standard_concentration = np.full(geometry.n_wells, np.nan)
+        if not layout.separate_standard_curve:
+            for level, row in enumerate(geometry.standard_rows[:len(self.standard_concentrations)]):
+                wells = row * geometry.cols + np.array(layout.standard_cols, dtype=np.intp)
+                role[wells] = 'standard'
+                standard_concentration[wells] = self.standard_concentrations[level]
+        
+        group_index = compile_group_index(self.chip_configurations, geometry)
+        wells, groups = group_index['wells'], group_index['groups']
+        chip = np.full(geometry.n_wells, None, dtype=object)
+        nozzle = np.full(geometry.n_wells, None, dtype=object)
+        role[wells] = 'sample'
+        chip[wells] = group_index['chip_id'][groups]
+        nozzle[wells] = group_index['nozzle_id'][groups]
+        per_well = group_index['per_well'][groups]
+        if per_well.any():
+            # Per-well groups are numbered among the wells holding data - take the names the QC table gave them
+            names = dict(zip(zip(self.qc_table['chip_id'], self.qc_table['column_range']), self.qc_table['nozzle_id']))
+            numbered = wells[per_well]
+            nozzle[numbered] = [names.get(key) for key in zip(chip[numbered], well_names[numbered])]
+        
+        # Standards rejected on a separate standards plate name wells of that plate, not of this one
+        excluded = np.isin(well_names, [w['well'] for w in self.excluded_wells
+                                        if w['kind'] == 'sample' or not layout.separate_standard_curve])
+        counted = np.zeros(geometry.n_wells, dtype=bool)
+        with np.errstate(invalid='ignore'):
+            values = concentration[wells]
+            counted[wells] = ~np.isnan(values) & (~group_index['positive_only'] | (values > 0))
+        counted &= ~excluded
+        
+        rows, cols = np.divmod(np.arange(geometry.n_wells), geometry.cols)
+        return pd.DataFrame({
+            'plate': pd.Categorical([plate] * geometry.n_wells),
+            'well': well_names.astype(str),
+            'row': pd.Categorical.from_codes(rows, geometry.row_labels),
+            'col': (cols + 1).astype(np.int16),
+            'rfu': self.fluorescence_data.to_numpy(dtype=float).ravel(),
+            'concentration': concentration,
+            'role': pd.Categorical(role, categories=['standard', 'sample', 'unused']),
+            'standard_concentration': standard_concentration,
+            'chip': pd.Categorical(chip),
+            'nozzle': nozzle,
+            'excluded': excluded,
+            'counted': counted,
+            'reader_cv_mismatch': np.isin(well_names, self.reader_cv_mismatches),
+        })
+    
+    def group_table(self, plate):
+        """Typed per-group table: the QC table (mean, std, %CV, %Accuracy, n) of this plate, unformatted"""
+        table = self.qc_table.copy()
+        table['plate'] = pd.Categorical([plate] * len(table))
+        return table
+    
+    def generate_tabular_export(self, input_file, export_format):
+        """Write <input>_wells.<ext> and <input>_groups.<ext> next to the input file; returns their paths"""
+        try:
+            input_path = Path(input_file)
+            plate = input_path.stem
+            tables = {'wells': self.well_table(plate), 'groups': self.group_table(plate)}
+            paths = [write_table(tables[name], input_path.parent / f"{plate}_{name}{EXPORT_FORMATS[export_format]}",
+                                 export_format) for name in EXPORT_TABLES]
+            output_log.info("Tables saved: %s", ', '.join(paths))
+            return paths
+        except Exception as e:
+            output_log.error("Error writing the %s export: %s", export_format, e)
+            return None
+    
+    # Analyzer attributes each stage produces (restored from the stage cache when its inputs are unchanged)
+    STAGE_STATE = {
+        'load': ('plate_export', 'geometry', 'fluorescence_data', 'standard_curve_data', 'cached_curve_params',
+                 'curve_cache_key', 'curve_source_file', 'excluded_wells', 'reader_cv_mismatches'),
+        'curve': ('standard_curve_params', 'excluded_wells'),
+        'concentrations': ('calculated_concentrations',),
+        'qc': ('chip_configurations', 'qc_table', 'qc_results', 'excluded_wells', 'spatial_effects'),
+    }
+    
+    def _run_stage(self, stage, fingerprint, compute, description):
+        """Run `compute` unless the stage already ran on the same inputs; returns (success, reused)"""
+        state = self.stage_cache.get(stage, fingerprint)
+        if state is not None:
+            for attr, value in state.items():
+                setattr(self, attr, list(value) if isinstance(value, list) else value)
+            log.info("  Inputs unchanged - reusing the %s", description)
+            return True, True
+        if not compute():
+            return False, False
+        self.stage_cache.put(stage, fingerprint, {
+            attr: list(value) if isinstance(value, list) else value
+            for attr, value in ((attr, getattr(self, attr, None)) for attr in self.STAGE_STATE[stage])})
+        return True, False
+    
+    def _begin_stage(self, stage):
+        """Report a starting pipeline stage; False when the run has been cancelled"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            log.warning("Analysis cancelled before the %s stage", PIPELINE_STAGES[stage].lower())
+            return False
+        if self.progress_callback is not None:
+            self.progress_callback(stage)
+        return True
+    
+    def process_qc_analysis(self, csv_file, std_curve_file=None, generate_plots=True, plot_format='png', plot_dpi=None, plot_workers=None):
+        """Main processing workflow
+        
+        Stages whose inputs are unchanged since the previous call on this
+        analyzer are reused (see stage_cache): after changing only the chip
+        layout or the target, a re-run recomputes just the QC metrics, the
+        output file and the plots that changed.
+        """
+        ensure_logging()
+        log.info("Starting Dispenser QC Analysis (Fixed Bug Version)...")
+        log.info("=" * 50)
+        
+        # A finished analysis of the same input bytes and settings is restored as a whole
+        result_key = None
+        if self.result_cache is not None:
+            with self.profiler.span('result_cache') as span:
+                result_key = self.result_cache_key(csv_file, std_curve_file, generate_plots, plot_format, plot_dpi)
+                restored = result_key is not None and not self.force_reanalysis and \
+                    self.restore_cached_results(result_key, csv_file)
+                span.count(cached=bool(restored))
+            if restored:
+                self.display_summary()
+                return True
+        
+        # Each stage's fingerprint folds in the previous one, so a change invalidates everything downstream
+        load_key = StageCache.fingerprint('load', file_identity(csv_file), file_identity(std_curve_file),
+                                          self.standard_concentrations, self.curve_name, self.curve_cache_variant(),
+                                          self.curve_cache is not None, self.curve_model if std_curve_file else None)
+        curve_key = StageCache.fingerprint('curve', load_key, self.curve_model)
+        concentrations_key = StageCache.fingerprint('concentrations', curve_key)
+        sample_outliers = self.outlier_method if self.outlier_scope in ('both', 'samples') else None
+        qc_key = StageCache.fingerprint('qc', concentrations_key, getattr(self, 'chip_configurations', None),
+                                        getattr(self, 'liquid_handler', DEFAULT_HANDLER), self.target_concentration,
+                                        sample_outliers, self.outlier_alpha, self.spatial_method)
         
         # Step 1: Load and clean data
-        print("Step 1: Loading and cleaning data...")
-        if not self.load_and_clean_data(csv_file, std_curve_file):
-            print("Failed to load data")
+        if not self._begin_stage('load'):
             return False
+        log.info("Step 1: Loading and cleaning data...")
+        with self.profiler.span('load') as span:
+            success, reused = self._run_stage('load', load_key, lambda: self.load_and_clean_data(csv_file, std_curve_file),
+                                              "parsed plate and standard curve data")
+            if not success:
+                log.error("Failed to load data")
+                return False
+            if self.profiler.enabled:  # Counting wells is not free - only when profiling
+                span.count(wells=int(self.fluorescence_data.notna().to_numpy().sum()), cached=reused)
         
         # Step 2: Build standard curve
-        print("Step 2: Building standard curve...")
-        if not self.build_standard_curve():
-            print("Failed to build standard curve")
+        if not self._begin_stage('curve'):
             return False
+        log.info("Step 2: Building standard curve...")
+        with self.profiler.span('curve') as span:
+            success, reused = self._run_stage('curve', curve_key, self.build_standard_curve, "standard curve")
+            if not success:
+                log.error("Failed to build standard curve")
+                return False
+            span.count(points=len(self.standard_curve_data), cached=bool(self.cached_curve_params) or reused)
         
         # Step 3: Calculate concentrations
-        print("Step 3: Calculating concentrations...")
-        if not self.calculate_concentrations():
-            print("Failed to calculate concentrations")
+        if not self._begin_stage('concentrations'):
             return False
+        log.info("Step 3: Calculating concentrations...")
+        with self.profiler.span('concentrations') as span:
+            success, reused = self._run_stage('concentrations', concentrations_key, self.calculate_concentrations,
+                                              "concentrations")
+            if not success:
+                log.error("Failed to calculate concentrations")
+                return False
+            if self.profiler.enabled:
+                span.count(wells=int((self.fluorescence_data.to_numpy(dtype=float) > 0).sum()), cached=reused)
         
         # Step 4: Calculate QC metrics
-        print("Step 4: Calculating QC metrics...")
-        if not self.calculate_qc_metrics():
-            print("Failed to calculate QC metrics")
+        if not self._begin_stage('qc'):
             return False
+        log.info("Step 4: Calculating QC metrics...")
+        with self.profiler.span('qc') as span:
+            success, qc_reused = self._run_stage('qc', qc_key, self.calculate_qc_metrics, "QC metrics")
+            if not success:
+                log.error("Failed to calculate QC metrics")
+                return False
+            span.count(groups=len(self.qc_results), cached=qc_reused)
+        
+        if self.spc is not None:
+            with self.profiler.span('spc'):
+                self.update_control_charts(csv_file)
         
         # Step 5: Generate output file
-        print("Step 5: Generating output file...")
-        output_file = self.generate_output_file(csv_file)
-        if not output_file:
-            print("Failed to generate output file")
+        if not self._begin_stage('output'):
             return False
+        log.info("Step 5: Generating output file...")
+        with self.profiler.span('output'):
+            output_key = StageCache.fingerprint('output', qc_key, str(Path(csv_file).resolve()),
+                                                *([self.spc_violations] if self.spc is not None else []))
+            output_file = self.stage_cache.get('output', output_key)
+            if output_file and os.path.exists(output_file):
+                output_log.info("Output file unchanged: %s", output_file)
+            else:
+                output_file = self.generate_output_file(csv_file)
+                if not output_file:
+                    log.error("Failed to generate output file")
+                    return False
+                self.stage_cache.put('output', output_key, output_file)
+        self.export_files = []
+        if self.export_format:
+            with self.profiler.span('export'):
+                self.export_files = self.generate_tabular_export(csv_file, self.export_format)
+            if not self.export_files:
+                log.error("Failed to write the %s export", self.export_format)
+                return False
+        
+        if self.result_store is not None and not qc_reused:  # A re-run with unchanged results is not a new run
+            with self.profiler.span('store'):
+                self.record_results(csv_file)
         
         # Step 6: Generate plots (optional)
+        plots_saved = True
         if generate_plots:
-            print("Step 6: Generating plots...")
-            self.generate_plots(Path(csv_file).parent, csv_file)
+            if not self._begin_stage('plots'):
+                return False
+            log.info("Step 6: Generating plots...")
+            with self.profiler.span('plots'):
+                plots_saved = self.generate_plots(Path(csv_file).parent, csv_file, plot_format=plot_format, dpi=plot_dpi,
+                                                  workers=plot_workers)
+        
+        if result_key is not None and plots_saved:
+            self.save_cached_results(result_key, output_file, self.plot_files if generate_plots else (), self.export_files)
         
         # Display summary
         self.display_summary()
         
         return True
     
+    def result_cache_key(self, csv_file, std_curve_file, generate_plots, plot_format, plot_dpi):
+        """Result-cache key of a run: input file contents plus every setting that changes its outputs
+        
+        None when an input file cannot be read - the pipeline then runs and reports the error.
+        """
+        named_curve = None
+        if self.curve_name and not std_curve_file and self.curve_cache is not None:
+            entry = self.curve_cache.get_named(self.curve_name)
+            named_curve = entry and entry['key']  # Re-saving a named curve changes the results
+        # The heatmap is titled with the plate's file name, so those plots are only restored for the same file
+        chips = getattr(self, 'chip_configurations', None) or \
+            default_chip_configurations(getattr(self, 'liquid_handler', DEFAULT_HANDLER))
+        heatmap = self.heatmaps == 'all' or (self.heatmaps == 'auto' and any(
+            get_handler(config.get('handler_type', DEFAULT_HANDLER)).per_well for config in chips))
+        settings = {
+            'version': ANALYZER_VERSION,
+            'standard_concentrations': [float(c) for c in self.standard_concentrations],
+            'target_concentration': self.target_concentration,
+            'chip_configurations': getattr(self, 'chip_configurations', None),
+            'liquid_handler': vars(self.handler_layout()),
+            'curve_model': self.curve_model,
+            'curve_name': self.curve_name,
+            'named_curve': named_curve,
+            'outliers': [self.outlier_method, self.outlier_scope, self.outlier_alpha],
+            'spatial_method': self.spatial_method,
+            'plots': [plot_format, plot_dpi, self.heatmaps, str(Path(csv_file).resolve()) if heatmap else None]
+                     if generate_plots else None,
+            'result_store': str(self.result_store.db_path) if self.result_store is not None else None,
+            'spc': [self.spc.db_path, self.spc.baseline_runs] if self.spc is not None else None,
+            # The tables carry the plate name, so they are only restored for the same file
+            'export': [self.export_format, str(Path(csv_file).resolve())] if self.export_format else None,
+        }
+        try:
+            return ResultCache.make_key(csv_file, std_curve_file, settings)
+        except OSError:
+            return None
+    
+    def restore_cached_results(self, result_key, csv_file):
+        """Restore a cached analysis - results, processed CSV and plots - without re-reading the plate"""
+        entry = self.result_cache.get(result_key)
+        if entry is None:
+            return False
+        try:
+            input_path = Path(csv_file)
+            targets = [(entry['output_file'], input_path.parent / f"{input_path.stem}_processed.csv")]
+            if entry['plot_files']:
+                plots_dir = input_path.parent / f"{input_path.stem}-plots"
+                plots_dir.mkdir(exist_ok=True)
+                targets += [(plot_file, plots_dir / Path(plot_file).name) for plot_file in entry['plot_files']]
+            exports = [(export_file, input_path.parent / Path(export_file).name) for export_file in entry['export_files']]
+            targets += exports
+            for cached_file, target in targets:
+                if not (target.exists() and filecmp.cmp(cached_file, target, shallow=False)):
+                    shutil.copyfile(cached_file, target)
+        except OSError as e:
+            output_log.warning("Could not restore cached results (%s) - re-analyzing", e)
+            return False
+        
+        self.stage_cache.clear()  # The restored files replace whatever the cached stages last wrote
+        self.plate_export = self.fluorescence_data = self.calculated_concentrations = self.qc_table = None
+        self.qc_results = entry['qc_results']
+        self.chip_configurations = entry['chip_configurations']
+        self.standard_curve_params = entry['standard_curve_params']
+        self.standard_curve_data = pd.DataFrame(entry['standard_curve_data'])
+        self.excluded_wells = entry['excluded_wells']
+        self.reader_cv_mismatches = entry['reader_cv_mismatches']
+        self.spatial_effects = entry.get('spatial_effects')
+        self.spc_violations = entry.get('spc_violations', [])
+        self.plot_files = [str(target) for _, target in targets[1:len(targets) - len(exports)]]
+        self.export_files = [str(target) for _, target in exports]
+        log.info("Plate and settings unchanged since a cached run - restored the results, %s and %d plots "
+                 "(--force re-analyzes)", targets[0][1], len(self.plot_files))
+        return True
+    
+    def save_cached_results(self, result_key, output_file, plot_files, export_files=()):
+        """Save this run's results, processed CSV, plots and exported tables in the result cache"""
+        try:
+            self.result_cache.put(result_key, {
+                'qc_results': self.qc_results,
+                'chip_configurations': self.chip_configurations,
+                'standard_curve_params': self.standard_curve_params,
+                'standard_curve_data': {column: self.standard_curve_data[column].tolist()
+                                        for column in ('concentration', 'fluorescence')},
+                'excluded_wells': self.excluded_wells,
+                'reader_cv_mismatches': self.reader_cv_mismatches,
+                'spatial_effects': self.spatial_effects,
+                'spc_violations': self.spc_violations,
+            }, output_file, plot_files, export_files)
+        except Exception as e:
+            # The outputs are already written - a cache problem must not fail the analysis
+            output_log.warning("Could not save results in the result cache: %s", e)
+    
+    def record_results(self, csv_file):
+        """Append this run's QC results, curve and plate metadata to the result store"""
+        try:
+            metadata = self.plate_export.assay_metadata() if self.plate_export else {}
+            run_id = self.result_store.append_run(
+                csv_file, self.qc_results, self.standard_curve_params, metadata,
+                instrument=self.instrument, liquid_handler=getattr(self, 'liquid_handler', DEFAULT_HANDLER),
+                target_concentration=self.target_concentration,
+                standard_concentrations=self.standard_concentrations)
+            output_log.info("Results recorded in %s (run %s)", self.result_store.db_path, run_id)
+            return run_id
+        except Exception as e:
+            # The processed file is already written - a store problem must not fail the analysis
+            output_log.warning("Could not record results in the result store: %s", e)
+            return None
+    
+    def update_control_charts(self, csv_file):
+        """Add this run to its nozzles' control charts and report the rule violations it raises"""
+        self.spc_violations = []
+        try:
+            metadata = self.plate_export.assay_metadata() if self.plate_export else {}
+            self.spc_violations = self.spc.update(
+                csv_file, self.qc_results, self.instrument or getattr(self, 'liquid_handler', DEFAULT_HANDLER),
+                metadata.get('assay_started'))
+        except Exception as e:
+            # Charting is monitoring on top of the analysis - a database problem must not fail the run
+            spc_log.warning("Could not update the control charts: %s", e)
+            return
+        for violation in self.spc_violations:
+            spc_log.warning("SPC: %s", describe_violation(violation))
+        spc_log.info("Control charts updated in %s: %d rule violations", self.spc.db_path, len(self.spc_violations))
+    
     def display_summary(self):
         """Display a summary of the results"""
-        print("\n" + "=" * 50)
-        print("QC ANALYSIS SUMMARY")
-        print("=" * 50)
-        
-        print(f"Standard Curve R²: {self.standard_curve_params['r_squared']:.4f}")
-        print(f"Target Concentration: {self.target_concentration}")
-        print(f"Liquid Handler: {getattr(self, 'liquid_handler', 'Tempest')}")
+        if not summary_log.isEnabledFor(logging.INFO):
+            return  # Quiet batch/watch runs skip building the report
+        summary_log.info("\n" + "=" * 50)
+        summary_log.info("QC ANALYSIS SUMMARY")
+        summary_log.info("=" * 50)
+        
+        summary_log.info("Standard Curve R²: %.4f", self.standard_curve_params['r_squared'])
+        summary_log.info("Target Concentration: %s", self.target_concentration)
+        if self.outlier_method:
+            n_standards = sum(1 for w in self.excluded_wells if w['kind'] == 'standard')
+            summary_log.info("Outliers Excluded (%s): %d standard wells, %d sample wells", self.outlier_method,
+                             n_standards, len(self.excluded_wells) - n_standards)
+        summary_log.info("Liquid Handler: %s", getattr(self, 'liquid_handler', DEFAULT_HANDLER))
+        if self.spatial_effects:
+            summary_log.info("Spatial Effects (%s): row gradient %.2f%%, column gradient %.2f%%, edge effect %+.2f%%",
+                             self.spatial_method, self.spatial_effects['row_gradient'],
+                             self.spatial_effects['col_gradient'], self.spatial_effects['edge_effect'])
         
         # Determine performance label based on handler type
-        handler_type = getattr(self, 'liquid_handler', 'Tempest')
-        if handler_type in ["D2", "Nano"]:
-            performance_label = "Single Nozzle Performance"
-        elif handler_type == "Bravo - 96":
-            performance_label = "Quadrant Performance"
-        elif handler_type == "Bravo - 384":
-            performance_label = "Well Performance"
-        else:
-            performance_label = "Nozzle Performance"
-        
-        print(f"\n{performance_label}:")
-        print("-" * 70)
+        handler = self.handler_layout()
+        summary_log.info("\n%s Performance:", handler.component)
+        summary_log.info("-" * 70)
         
         # Group results by chip
         chip_results = {}
@@ -1248,64 +2366,307 @@ class DispenserQCAnalyzerFixedBug:
             chip_results[chip_id].append(result)
         
         for chip_id, results in chip_results.items():
-            print(f"\n{chip_id}:")
+            summary_log.info("\n%s:", chip_id)
             for result in results:
-                nozzle_id = result['nozzle_id']
-                handler_type = result.get('handler_type', 'Tempest')
-                
-                # Extract component name based on handler type
-                if handler_type in ["D2", "Nano"]:
-                    component_name = "Single"
-                elif handler_type == "Bravo - 96":
-                    if '_Quadrant_' in nozzle_id:
-                        component_name = f"Q{nozzle_id.split('_Quadrant_')[1]}"
-                    else:
-                        component_name = nozzle_id
-                elif handler_type == "Bravo - 384":
-                    if '_Well_' in nozzle_id:
-                        component_name = f"W{nozzle_id.split('_Well_')[1]}"
-                    else:
-                        component_name = nozzle_id
-                else:  # Tempest, Combi
-                    if '_Nozzle_' in nozzle_id:
-                        component_name = f"N{nozzle_id.split('_Nozzle_')[1]}"
-                    else:
-                        component_name = nozzle_id
+                component_name = get_handler(result.get('handler_type', DEFAULT_HANDLER)).short_name(result['nozzle_id'])
                 
-                print(f"  {component_name:8} | "
-                      f"CV: {result['cv_percent']:6.2f}% | "
-                      f"Accuracy: {result['accuracy_percent']:8.2f}% | "
-                      f"N: {result['n_measurements']:3d} | "
-                      f"Cols: {result.get('column_range', 'N/A')}")
+                summary_log.info("  %-8s | CV: %6.2f%% | Accuracy: %8.2f%% | N: %3d | Cols: %s", component_name,
+                                 result['cv_percent'], result['accuracy_percent'], result['n_measurements'],
+                                 result.get('column_range', 'N/A'))
         
         # Calculate overall statistics
         all_cv = [r['cv_percent'] for r in self.qc_results]
         all_accuracy = [r['accuracy_percent'] for r in self.qc_results]
         
-        print("\nOverall Statistics:")
-        print(f"Average %CV: {np.mean(all_cv):.2f}%")
-        print(f"Average %Accuracy: {np.mean(all_accuracy):.2f}%")
-        print(f"Best %CV: {min(all_cv):.2f}%")
-        print(f"Worst %CV: {max(all_cv):.2f}%")
-        print(f"Linear Regression: y = {self.standard_curve_params['slope']:.8f}x + {self.standard_curve_params['intercept']:.8f}")
+        summary_log.info("\nOverall Statistics:")
+        summary_log.info("Average %%CV: %.2f%%", np.mean(all_cv))
+        summary_log.info("Average %%Accuracy: %.2f%%", np.mean(all_accuracy))
+        summary_log.info("Best %%CV: %.2f%%", min(all_cv))
+        summary_log.info("Worst %%CV: %.2f%%", max(all_cv))
+        if self.standard_curve_params.get('model', 'linear') == 'linear':
+            summary_log.info("Linear Regression: %s", curve_equation(self.standard_curve_params))
+        else:
+            summary_log.info("Standard Curve (%s): %s", self.standard_curve_params['model'],
+                             curve_equation(self.standard_curve_params))
         
         # Quality assessment
-        print("\nQuality Assessment:")
+        summary_log.info("\nQuality Assessment:")
         if np.mean(all_cv) < 5.0:
-            print("✓ Precision: EXCELLENT (Average %CV < 5%)")
+            summary_log.info("✓ Precision: EXCELLENT (Average %CV < 5%)")
         elif np.mean(all_cv) < 10.0:
-            print("✓ Precision: GOOD (Average %CV < 10%)")
+            summary_log.info("✓ Precision: GOOD (Average %CV < 10%)")
         else:
-            print("⚠ Precision: NEEDS IMPROVEMENT (Average %CV ≥ 10%)")
+            summary_log.info("⚠ Precision: NEEDS IMPROVEMENT (Average %CV ≥ 10%)")
         
         if abs(np.mean(all_accuracy)) < 10.0:
-            print("✓ Accuracy: EXCELLENT (Average %Accuracy < ±10%)")
+            summary_log.info("✓ Accuracy: EXCELLENT (Average %Accuracy < ±10%)")
         elif abs(np.mean(all_accuracy)) < 20.0:
-            print("✓ Accuracy: GOOD (Average %Accuracy < ±20%)")
+            summary_log.info("✓ Accuracy: GOOD (Average %Accuracy < ±20%)")
         else:
-            print("⚠ Accuracy: NEEDS IMPROVEMENT (Average %Accuracy ≥ ±20%)")
+            summary_log.info("⚠ Accuracy: NEEDS IMPROVEMENT (Average %Accuracy ≥ ±20%)")
+        if self.spc is not None:
+            if self.spc_violations:
+                nozzles = sorted({v['nozzle_id'] for v in self.spc_violations})
+                summary_log.info("⚠ Process Control: %d rule violations (%s)", len(self.spc_violations),
+                                 ', '.join(nozzles))
+            else:
+                summary_log.info("✓ Process Control: no control chart rule violations")
         
-        print("\nIMPORTANT: QC calculations exclude standard curve wells (columns 1-3)")
+        summary_log.info("\nIMPORTANT: QC calculations exclude standard curve wells (columns 1-3)")
+
+def save_profile(profiler, csv_file, chrome_trace=False):
+    """Write <stem>_profile.json (and optionally a Chrome trace <stem>_trace.json) next to the input file"""
+    input_path = Path(csv_file)
+    paths = [profiler.write_json(input_path.parent / f"{input_path.stem}_profile.json")]
+    if chrome_trace:
+        paths.append(profiler.write_chrome_trace(input_path.parent / f"{input_path.stem}_trace.json"))
+    profiler.close()
+    return paths
+
+OUTPUT_FILE_SUFFIXES = ('_processed.csv', 'batch_summary.csv', 'watch_summary.csv',
+                        *(f"_{name}.csv" for name in EXPORT_TABLES))
+
+def collect_batch_files(batch_path):
+    """Resolve a --batch argument (directory or glob pattern) to a sorted list of exports"""
+    if os.path.isdir(batch_path):
+        candidates = glob.glob(os.path.join(batch_path, '*.csv'))
+    else:
+        candidates = glob.glob(batch_path)
+    # Skip our own output files so re-runs over the same folder stay clean
+    return sorted(f for f in candidates if os.path.isfile(f) and not f.endswith(OUTPUT_FILE_SUFFIXES))
+
+def analyze_plate_file(csv_file, settings):
+    """Run the full QC workflow on one plate file and return a plate-level summary
+    
+    Runs in a worker process during batch mode, so it never raises: any failure
+    is reported in the returned summary instead.
+    """
+    summary = {'file': csv_file, 'success': False, 'error': '', 'output_file': '', 'qc_results': []}
+    if settings.get('log_levels') and not logging_configured():
+        # Spawned worker (Windows/macOS) - forked workers inherit the parent's setup
+        configure_logging(settings['log_levels'], settings.get('log_json'), settings.get('log_file'))
+    try:
+        analyzer = DispenserQCAnalyzerFixedBug()
+        analyzer.standard_concentrations = list(settings['standard_concentrations'])
+        analyzer.target_concentration = settings['target_concentration']
+        analyzer.curve_model = settings.get('curve_model', 'linear')
+        analyzer.outlier_method = settings.get('outlier_method')
+        analyzer.outlier_scope = settings.get('outlier_scope', 'both')
+        analyzer.outlier_alpha = settings.get('outlier_alpha', DEFAULT_ALPHA)
+        analyzer.spatial_method = settings.get('spatial_method')
+        if settings.get('chip_configurations'):
+            analyzer.chip_configurations = [dict(config) for config in settings['chip_configurations']]
+        if settings.get('liquid_handler'):
+            analyzer.liquid_handler = settings['liquid_handler']
+        if settings.get('use_curve_cache', True):
+            analyzer.curve_cache = StandardCurveCache(settings.get('curve_cache_dir'))
+        analyzer.export_format = settings.get('export_format')
+        analyzer.heatmaps = settings.get('heatmaps', 'auto')
+        if settings.get('use_result_cache'):
+            analyzer.result_cache = ResultCache(settings.get('curve_cache_dir'), settings.get('result_cache_size', 200))
+            analyzer.force_reanalysis = settings.get('force', False)
+        analyzer.curve_name = settings.get('curve_name')
+        if settings.get('result_store'):
+            analyzer.result_store = ResultStore(settings['result_store'])
+            analyzer.instrument = settings.get('instrument')
+        if settings.get('spc'):
+            analyzer.spc = ControlChartStore(settings['spc'], settings.get('spc_baseline', DEFAULT_BASELINE_RUNS))
+            analyzer.instrument = settings.get('instrument')
+        if settings.get('profile'):
+            analyzer.profiler = Profiler()
+        
+        with plate_context(csv_file), capture_errors() as errors:
+            success = analyzer.process_qc_analysis(csv_file, settings.get('std_curve_file'),
+                                                   generate_plots=settings.get('generate_plots', True),
+                                                   plot_format=settings.get('plot_format', 'png'),
+                                                   plot_dpi=settings.get('plot_dpi'),
+                                                   plot_workers=1)  # Plates are already spread across processes
+        if analyzer.profiler.enabled:
+            summary['profile_files'] = save_profile(analyzer.profiler, csv_file, settings.get('chrome_trace'))
+        if success:
+            all_cv = [r['cv_percent'] for r in analyzer.qc_results]
+            all_accuracy = [r['accuracy_percent'] for r in analyzer.qc_results]
+            summary.update({
+                'success': True,
+                'output_file': str(Path(csv_file).parent / f"{Path(csv_file).stem}_processed.csv"),
+                'n_nozzles': len(analyzer.qc_results),
+                'mean_cv': float(np.mean(all_cv)),
+                'mean_accuracy': float(np.mean(all_accuracy)),
+                'best_cv': float(min(all_cv)),
+                'worst_cv': float(max(all_cv)),
+                'r_squared': float(analyzer.standard_curve_params['r_squared']),
+                'qc_results': analyzer.qc_results,
+                'spc_violations': len(analyzer.spc_violations),
+            })
+        else:
+            summary['error'] = ' | '.join(errors) or "Analysis failed"
+    except Exception as e:
+        summary['error'] = str(e)
+    return summary
+
+def _log_plate_result(logger, result):
+    """One progress line per analyzed plate; failures are logged as warnings"""
+    if result['success']:
+        logger.info("  OK   %s - Average %%CV %.2f%%", result['file'], result['mean_cv'])
+        if result.get('spc_violations'):
+            logger.warning("  SPC  %s - %d control chart rule violations", result['file'], result['spc_violations'])
+    else:
+        logger.warning("  FAIL %s - %s", result['file'], result['error'])
+
+def run_batch(csv_files, settings, workers=None):
+    """Analyze many plate files, fanning out over a process pool
+    
+    A failing or corrupt file only marks its own summary as failed.
+    Results are returned in the order of `csv_files`.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    if workers == 1 or len(csv_files) == 1:
+        for csv_file in csv_files:
+            results[csv_file] = analyze_plate_file(csv_file, settings)
+            _log_plate_result(batch_log, results[csv_file])
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(csv_files))) as executor:
+            futures = {executor.submit(analyze_plate_file, csv_file, settings): csv_file for csv_file in csv_files}
+            for future in as_completed(futures):
+                csv_file = futures[future]
+                try:
+                    results[csv_file] = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. BrokenProcessPool)
+                    results[csv_file] = {'file': csv_file, 'success': False, 'error': str(e),
+                                         'output_file': '', 'qc_results': []}
+                _log_plate_result(batch_log, results[csv_file])
+    return [results[csv_file] for csv_file in csv_files]
+
+def write_batch_summary(batch_results, summary_file):
+    """Write one consolidated CSV summarizing every plate in a batch run"""
+    rows = []
+    for result in batch_results:
+        if result['success']:
+            rows.append([
+                result['file'], "OK", result['n_nozzles'],
+                f"{result['mean_cv']:.2f}%", f"{result['mean_accuracy']:.2f}%",
+                f"{result['best_cv']:.2f}%", f"{result['worst_cv']:.2f}%",
+                f"{result['r_squared']:.4f}", result['output_file'], ""
+            ])
+        else:
+            rows.append([result['file'], "FAILED", "", "", "", "", "", "", "", result['error']])
+    
+    summary_df = pd.DataFrame(rows, columns=["File", "Status", "Nozzles", "Average %CV", "Average %Accuracy",
+                                             "Best %CV", "Worst %CV", "Standard Curve R²", "Output File", "Error"])
+    summary_df.to_csv(summary_file, index=False)
+    return str(summary_file)
+
+def _warm_up_worker(generate_plots):
+    """Process-pool initializer: pay the heavy imports once per worker, not once per plate"""
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the watcher, which drains the pool
+    if generate_plots:
+        import matplotlib.figure  # noqa: F401
+        import matplotlib.backends.backend_agg  # noqa: F401
+
+class ExportWatcher:
+    """Watch a folder and analyze plate-reader exports as they are written
+    
+    A file is picked up once its size and modification time have not changed for
+    `settle_seconds` (the reader writes exports incrementally). Analyses run in a
+    persistent process pool, so imports stay warm between plates. A file is
+    re-analyzed only if it changes again; exports whose _processed.csv is newer
+    than the export are treated as done, so restarting the watcher is safe.
+    """
+    def __init__(self, watch_dir, settings, workers=1, settle_seconds=2.0, poll_interval=1.0):
+        self.watch_dir = str(watch_dir)
+        self.settings = settings
+        self.workers = workers or 1
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.pending = {}  # path -> (size, mtime, time the file was last seen changing)
+        self.done = {}  # path -> (size, mtime) that was analyzed
+        self.in_flight = {}  # future -> (path, size, mtime)
+        self.results = []
+        self.executor = None
+        self.stopped = False
+    
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up_worker,
+                                                initargs=(self.settings.get('generate_plots', True),))
+    
+    def stop(self):
+        self.stopped = True
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+    
+    def _already_processed(self, path, mtime):
+        processed = Path(path).parent / f"{Path(path).stem}_processed.csv"
+        return processed.exists() and processed.stat().st_mtime >= mtime
+    
+    def poll_once(self, now=None):
+        """Scan the folder once and submit every export that has finished writing"""
+        now = time.time() if now is None else now
+        submitted = []
+        busy = {path for path, _, _ in self.in_flight.values()}
+        for path in collect_batch_files(self.watch_dir):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Deleted or renamed between listing and stat
+            signature = (stat.st_size, stat.st_mtime)
+            if stat.st_size == 0 or self.done.get(path) == signature or path in busy:
+                continue
+            if path not in self.done and self._already_processed(path, stat.st_mtime):
+                self.done[path] = signature
+                continue
+            
+            previous = self.pending.get(path)
+            if previous is None or previous[:2] != signature:
+                # New file, or still being written - restart the settle timer
+                self.pending[path] = (*signature, now)
+                continue
+            if now - previous[2] < self.settle_seconds:
+                continue
+            
+            del self.pending[path]
+            self.start()
+            future = self.executor.submit(analyze_plate_file, path, self.settings)
+            self.in_flight[future] = (path, *signature)
+            submitted.append(path)
+        return submitted
+    
+    def collect_finished(self):
+        """Gather finished analyses and return their plate summaries"""
+        finished = []
+        for future in [f for f in self.in_flight if f.done()]:
+            path, size, mtime = self.in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'file': path, 'success': False, 'error': str(e), 'output_file': '', 'qc_results': []}
+            self.done[path] = (size, mtime)
+            finished.append(result)
+            _log_plate_result(watch_log, result)
+        if finished:
+            self.results.extend(finished)
+            write_batch_summary(self.results, Path(self.watch_dir) / "watch_summary.csv")
+        return finished
+    
+    def run(self, max_runtime=None):
+        """Poll until stopped (Ctrl+C) or `max_runtime` seconds have passed"""
+        watch_log.info("Watching %s for new exports (Ctrl+C to stop)...", self.watch_dir)
+        started = time.time()
+        self.start()
+        try:
+            while not self.stopped and (max_runtime is None or time.time() - started < max_runtime):
+                self.poll_once()
+                self.collect_finished()
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            watch_log.info("\nStopping watcher...")
+        finally:
+            self.stop()
+            self.collect_finished()
 
 def main():
     """Main function to run the analyzer"""
@@ -1318,18 +2679,192 @@ def main():
                        help='Target concentration')
     parser.add_argument('--no-plots', action='store_true',
                        help='Skip generating plots')
+    parser.add_argument('--handler', choices=LIQUID_HANDLERS, default=DEFAULT_HANDLER,
+                       help='Liquid handler type (default: Tempest)')
+    parser.add_argument('--std-curve-file', metavar='FILE',
+                       help='Separate standard curve CSV file (Bravo - 384)')
+    parser.add_argument('--curve-name', metavar='NAME',
+                       help='Save the standard curve under NAME, or reuse the curve saved as NAME '
+                            'when no --std-curve-file is given (Bravo - 384)')
+    parser.add_argument('--curve-cache-dir', metavar='DIR', default=None,
+                       help='Standard curve and result cache directory (default: ~/.qc_check/cache)')
+    parser.add_argument('--no-curve-cache', action='store_true',
+                       help='Always re-read and re-fit the separate standard curve file')
+    parser.add_argument('--no-result-cache', action='store_true',
+                       help='--batch/--watch: do not restore or save whole analyses in the result cache')
+    parser.add_argument('--result-cache-size', type=int, default=200, metavar='N',
+                       help='--batch/--watch: keep the N most recently used analyses in the result cache (default: 200)')
+    parser.add_argument('--force', action='store_true',
+                       help='--batch/--watch: re-analyze even when the result cache has the same plate and settings')
+    parser.add_argument('--curve-model', choices=[*CURVE_MODELS, AUTO_MODEL], default='linear',
+                       help='Standard curve model: linear (default), 1/x or 1/x² weighted linear, loglog, '
+                            'quadratic, 4pl, or auto to pick the best fit by back-calculated error')
+    parser.add_argument('--outliers', choices=OUTLIER_METHODS, default=None,
+                       help='Reject outlier wells before averaging: grubbs, dixon, mad or iqr (default: off)')
+    parser.add_argument('--outlier-scope', choices=OUTLIER_SCOPES, default='both',
+                       help='Screen the standard triplicates, the nozzle groups, or both (default: both)')
+    parser.add_argument('--outlier-alpha', type=float, default=DEFAULT_ALPHA,
+                       help='Significance level for the Grubbs and Dixon tests (default: 0.05; Dixon: 0.10, 0.05 '
+                            'or 0.01)')
+    parser.add_argument('--export', choices=list(EXPORT_FORMATS), default=None, metavar='FORMAT',
+                       help='Also write typed per-well and per-group tables (<file>_wells, <file>_groups): '
+                            'csv, parquet or feather (the last two need pyarrow)')
+    parser.add_argument('--spatial', choices=SPATIAL_METHODS, default=None,
+                       help='Fit row/column/edge effects per plate and report gradients and a spatially '
+                            'corrected %%CV next to the raw one: twoway or median_polish (default: off)')
+    parser.add_argument('--plot-format', choices=list(PLOT_FORMATS), default='png',
+                       help='Plot output: png (300 dpi), svg, or preview (low-res PNG)')
+    parser.add_argument('--plot-dpi', type=int, default=None,
+                       help='Override the plot resolution (dots per inch)')
+    parser.add_argument('--heatmaps', choices=HEATMAP_MODES, default='auto',
+                       help='Whole-plate heatmaps: auto (instead of per-well bar charts, e.g. Bravo - 384), '
+                            'all (also an overview for every handler) or off')
+    parser.add_argument('--batch', '-b', metavar='DIR|GLOB',
+                       help='Analyze every CSV file in a directory (or matching a glob pattern)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                       help='Number of worker processes for batch mode (default: CPU count)')
+    parser.add_argument('--store', metavar='FILE',
+                       help='Append every run to this result store (SQLite) for nozzle trending')
+    parser.add_argument('--instrument',
+                       help='Instrument name recorded in the result store and control charts '
+                            '(default: the liquid handler type)')
+    parser.add_argument('--spc', metavar='FILE',
+                       help='Chart every run per nozzle (Shewhart/EWMA/CUSUM) in this database (SQLite) '
+                            'and report Western Electric rule violations')
+    parser.add_argument('--spc-baseline', type=int, default=DEFAULT_BASELINE_RUNS, metavar='N',
+                       help='Runs per nozzle that set the control limits before rules are checked (default: 20)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Record per-stage timings and memory to <file>_profile.json')
+    parser.add_argument('--chrome-trace', action='store_true',
+                       help='With --profile, also write a Chrome trace (<file>_trace.json)')
+    parser.add_argument('--watch', metavar='DIR',
+                       help='Keep running and analyze new exports as they appear in DIR')
+    parser.add_argument('--settle', type=float, default=2.0,
+                       help='Seconds an export must stay unchanged before it is analyzed (watch mode)')
+    parser.add_argument('--summary', metavar='FILE',
+                       help='Consolidated batch summary CSV (default: batch_summary.csv next to the first file)')
+    parser.add_argument('--log-level', metavar='LEVELS',
+                       help='Log level, optionally per logger, e.g. "DEBUG" or "WARNING,qc_check.qc=DEBUG" '
+                            '(default: INFO; WARNING with per-plate progress for --batch/--watch)')
+    parser.add_argument('--log-json', action='store_true',
+                       help='Write log records as JSON lines')
+    parser.add_argument('--log-file', metavar='FILE',
+                       help='Write the log to FILE instead of the console')
     
     args = parser.parse_args()
+    if args.curve_name and not get_handler(args.handler).separate_standard_curve:
+        parser.error(f"--curve-name needs a handler with a separate standards plate "
+                     f"({', '.join(separate_curve_handlers())}), not {args.handler}")
+    try:
+        check_outlier_alpha(args.outliers, args.outlier_alpha)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.outliers == 'dixon' and args.outlier_scope != 'standards':
+        group_sizes = np.bincount(compile_group_index(default_chip_configurations(args.handler))['groups'])
+        if group_sizes.min() > DIXON_MAX_GROUP:
+            parser.error(f"Dixon's Q test covers groups of {MIN_GROUP_SIZE}-{DIXON_MAX_GROUP} values, but {args.handler} "
+                         f"nozzle groups have {group_sizes.max()} wells: use --outlier-scope standards or another method")
+    
+    log_levels = args.log_level or (QUIET_LEVELS if args.batch or args.watch else INTERACTIVE_LEVELS)
+    try:
+        configure_logging(log_levels, args.log_json, args.log_file)
+    except ValueError as e:
+        parser.error(str(e))
     
     analyzer = DispenserQCAnalyzerFixedBug()
     
-    if args.file:
+    settings = {
+        'standard_concentrations': [float(x.strip()) for x in args.concentrations.split(",")],
+        'target_concentration': args.target,
+        'liquid_handler': args.handler,
+        'chip_configurations': None,  # Defaults for the plate format found in each file
+        'std_curve_file': args.std_curve_file,
+        'curve_name': args.curve_name,
+        'curve_cache_dir': args.curve_cache_dir,
+        'use_curve_cache': not args.no_curve_cache,
+        'use_result_cache': not args.no_result_cache,
+        'result_cache_size': args.result_cache_size,
+        'force': args.force,
+        'curve_model': args.curve_model,
+        'outlier_method': args.outliers,
+        'outlier_scope': args.outlier_scope,
+        'outlier_alpha': args.outlier_alpha,
+        'spatial_method': args.spatial,
+        'generate_plots': not args.no_plots,
+        'plot_format': args.plot_format,
+        'plot_dpi': args.plot_dpi,
+        'heatmaps': args.heatmaps,
+        'export_format': args.export,
+        'result_store': args.store,
+        'instrument': args.instrument,
+        'spc': args.spc,
+        'spc_baseline': args.spc_baseline,
+        'profile': args.profile or args.chrome_trace,
+        'chrome_trace': args.chrome_trace,
+        'log_levels': log_levels,
+        'log_json': args.log_json,
+        'log_file': args.log_file,
+    }
+    
+    if args.watch:
+        # Watch mode - long-running service with warm worker processes
+        if not os.path.isdir(args.watch):
+            print(f"Error: {args.watch} is not a directory")
+            sys.exit(1)
+        ExportWatcher(args.watch, settings, workers=args.workers or 1, settle_seconds=args.settle).run()
+    elif args.batch:
+        # Batch mode - one interpreter, many plates
+        csv_files = collect_batch_files(args.batch)
+        if not csv_files:
+            print(f"Error: No CSV files found for {args.batch}")
+            sys.exit(1)
+        
+        print(f"Batch mode: analyzing {len(csv_files)} files...")
+        batch_results = run_batch(csv_files, settings, args.workers)
+        
+        summary_file = args.summary or str(Path(csv_files[0]).parent / "batch_summary.csv")
+        write_batch_summary(batch_results, summary_file)
+        
+        failed = [r for r in batch_results if not r['success']]
+        print(f"\nBatch complete: {len(batch_results) - len(failed)} succeeded, {len(failed)} failed")
+        print(f"Batch summary saved: {summary_file}")
+        for result in failed:
+            print(f"  FAILED {result['file']}: {result['error']}")
+        if failed:
+            sys.exit(1)
+    elif args.file:
         # Command line mode
         try:
             analyzer.standard_concentrations = [float(x.strip()) for x in args.concentrations.split(",")]
             analyzer.target_concentration = args.target
-            
-            success = analyzer.process_qc_analysis(args.file, generate_plots=not args.no_plots)
+            analyzer.curve_model = args.curve_model
+            analyzer.outlier_method = args.outliers
+            analyzer.outlier_scope = args.outlier_scope
+            analyzer.outlier_alpha = args.outlier_alpha
+            analyzer.spatial_method = args.spatial
+            analyzer.liquid_handler = args.handler
+            analyzer.chip_configurations = None  # Defaults for the plate format found in the file
+            analyzer.export_format = args.export
+            analyzer.heatmaps = args.heatmaps
+            if not args.no_curve_cache:
+                analyzer.curve_cache = StandardCurveCache(args.curve_cache_dir)
+            analyzer.curve_name = args.curve_name
+            if args.store:
+                analyzer.result_store = ResultStore(args.store)
+                analyzer.instrument = args.instrument
+            if args.spc:
+                analyzer.spc = ControlChartStore(args.spc, args.spc_baseline)
+                analyzer.instrument = args.instrument
+            if settings['profile']:
+                analyzer.profiler = Profiler()
+            
+            success = analyzer.process_qc_analysis(args.file, args.std_curve_file, generate_plots=not args.no_plots,
+                                                   plot_format=args.plot_format, plot_dpi=args.plot_dpi)
+            if analyzer.profiler.enabled:
+                print("\nStage profile:")
+                print(analyzer.profiler.summary())
+                for profile_file in save_profile(analyzer.profiler, args.file, args.chrome_trace):
+                    print(f"Profile saved: {profile_file}")
             if success:
                 print("\nAnalysis completed successfully!")
             else:
@@ -1344,4 +2879,6 @@ def main():
         analyzer.launch_ui()
 
 if __name__ == "__main__":
+    # Frozen (PyInstaller) builds: spawned plot/batch/watch workers must not run main() - and open the GUI - again
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
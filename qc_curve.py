@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Standard-curve models for the Dispenser QC Analyzer
+
+Every fitter works on a whole stack of curves at once: RFU shaped (N, k)
+against concentrations shaped (k,) or (N, k), so thousands of plates'
+standard curves are fitted in one call. Missing (NaN) points are ignored.
+
+Models (x = RFU, y = concentration unless noted):
+
+    linear        y = slope * x + intercept, ordinary least squares
+    linear_1/x    the same line weighted by 1/concentration
+    linear_1/x2   the same line weighted by 1/concentration²
+    loglog        log(y) = a + b * log(x)
+    quadratic     y = c0 + c1 * x + c2 * x², weighted by 1/concentration²
+    4pl           x = d + (a - d) / (1 + (y / c) ** b), weighted by 1/RFU²,
+                  inverted to read concentrations off the fluorescence
+
+The weights follow the usual calibration convention (1/x is the nominal
+standard concentration), so the low standards of a two-fold dilution series
+are not swamped by the top ones; quadratic and 4PL absorb saturation at the
+top of the range. "auto" fits every candidate and keeps, per curve, the one
+with the smallest relative back-calculation error (see fit_curves).
+"""
+
+import numpy as np
+
+CURVE_MODELS = ('linear', 'linear_1/x', 'linear_1/x2', 'loglog', 'quadratic', '4pl')
+LINEAR_MODELS = ('linear', 'linear_1/x', 'linear_1/x2')
+AUTO_MODEL = 'auto'
+SELECTION_TOLERANCE = 0.05  # A more complex model must cut the relative error by more than 5% to be chosen
+N_PARAMS = {'linear': 2, 'linear_1/x': 2, 'linear_1/x2': 2, 'loglog': 2, 'quadratic': 3, '4pl': 4}
+WEIGHTING = {'linear': 'none', 'linear_1/x': '1/x', 'linear_1/x2': '1/x2', 'loglog': 'log', 'quadratic': '1/x2',
+             '4pl': '1/y2'}
+
+def _as_stack(rfu, concentrations):
+    """(N, k) float arrays plus the mask of usable points"""
+    rfu = np.asarray(rfu, dtype=float)
+    if rfu.ndim == 1:
+        rfu = rfu[np.newaxis]
+    concentrations = np.broadcast_to(np.asarray(concentrations, dtype=float), rfu.shape)
+    valid = np.isfinite(rfu) & np.isfinite(concentrations)
+    return rfu, concentrations, valid
+
+def _weighted_line(x, y, w):
+    """Weighted least-squares line y = slope * x + intercept for each row (w = 0 drops a point)"""
+    sw = w.sum(axis=-1)
+    x_mean = (w * x).sum(axis=-1) / sw
+    y_mean = (w * y).sum(axis=-1) / sw
+    dx = x - x_mean[:, np.newaxis]
+    dy = y - y_mean[:, np.newaxis]
+    sxx = (w * dx * dx).sum(axis=-1)
+    syy = (w * dy * dy).sum(axis=-1)
+    sxy = (w * dx * dy).sum(axis=-1)
+    slope = sxy / sxx
+    intercept = y_mean - slope * x_mean
+    r_value = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+    df = (w > 0).sum(axis=-1) - 2
+    std_err = np.sqrt((1 - r_value ** 2) * syy / sxx / np.where(df > 0, df, np.nan))
+    return slope, intercept, std_err
+
+def _fit_polynomial(x, y, w, degree):
+    """Weighted least squares y = c0 + c1 x + ... for each row, via batched normal equations"""
+    scale = np.nanmax(np.where(w > 0, np.abs(x), np.nan), axis=-1)[:, np.newaxis]  # Keeps the system well scaled
+    design = (x / scale)[..., np.newaxis] ** np.arange(degree + 1)  # (N, k, degree + 1)
+    weighted = design * w[..., np.newaxis]
+    normal = np.einsum('nki,nkj->nij', weighted, design)
+    rhs = np.einsum('nki,nk->ni', weighted, y)
+    coefficients = np.einsum('nij,nj->ni', np.linalg.pinv(normal), rhs)
+    return coefficients / scale ** np.arange(degree + 1)
+
+def _4pl_response(log_conc, a, b, log_c, d):
+    u = np.exp(b[:, np.newaxis] * (log_conc - log_c[:, np.newaxis]))
+    return d[:, np.newaxis] + (a - d)[:, np.newaxis] / (1 + u), u
+
+def _fit_4pl(conc, rfu, valid, max_iter=200, tol=1e-10):
+    """Levenberg-Marquardt on all curves at once; returns (N, 4) [a, b, c, d]"""
+    n_curves = rfu.shape[0]
+    scale = np.nanmax(np.where(valid, np.abs(rfu), np.nan), axis=-1)
+    y = np.where(valid, rfu / scale[:, np.newaxis], 0.0)
+    log_conc = np.log(np.where(valid & (conc > 0), conc, 1.0))
+    sqrt_w = np.where(valid & (y != 0), 1 / np.abs(np.where(y != 0, y, 1.0)), 0.0)
+
+    low = np.nanmin(np.where(valid, y, np.nan), axis=-1)
+    high = np.nanmax(np.where(valid, y, np.nan), axis=-1)
+    mid = np.nanmedian(np.where(valid, log_conc, np.nan), axis=-1)
+    params = np.stack([low * 0.5, np.ones(n_curves), mid + 1.0, high * 1.5], axis=-1)  # a, b, log c, d
+
+    def residuals(p):
+        fitted, u = _4pl_response(log_conc, p[:, 0], p[:, 1], p[:, 2], p[:, 3])
+        return sqrt_w * (fitted - y), u
+
+    r, u = residuals(params)
+    cost = (r ** 2).sum(axis=-1)
+    damping = np.full(n_curves, 1e-3)
+    active = np.isfinite(cost)
+    for _ in range(max_iter):
+        a, b, log_c, d = params.T
+        inv = 1 / (1 + u)
+        jacobian = np.stack([
+            inv,                                                          # d/da
+            -(a - d)[:, np.newaxis] * inv ** 2 * u * (log_conc - log_c[:, np.newaxis]),  # d/db
+            (a - d)[:, np.newaxis] * inv ** 2 * u * b[:, np.newaxis],     # d/dlog c
+            1 - inv,                                                      # d/dd
+        ], axis=-1) * sqrt_w[..., np.newaxis]
+        hessian = np.einsum('nki,nkj->nij', jacobian, jacobian)
+        gradient = np.einsum('nki,nk->ni', jacobian, r)
+        diagonal = np.einsum('nii->ni', hessian)
+        damped = hessian + (damping[:, np.newaxis] * diagonal + 1e-12)[..., np.newaxis] * np.eye(4)
+        with np.errstate(all='ignore'):
+            step = -np.einsum('nij,nj->ni', np.linalg.pinv(damped), gradient)
+            trial = params + step
+            trial_r, trial_u = residuals(trial)
+            trial_cost = (trial_r ** 2).sum(axis=-1)
+        better = active & np.isfinite(trial_cost) & (trial_cost < cost)
+        improvement = np.where(better, cost - trial_cost, 0.0)
+        params = np.where(better[:, np.newaxis], trial, params)
+        r = np.where(better[:, np.newaxis], trial_r, r)
+        u = np.where(better[:, np.newaxis], trial_u, u)
+        cost = np.where(better, trial_cost, cost)
+        damping = np.where(better, damping / 3, np.minimum(damping * 4, 1e12))
+        active &= ~(better & (improvement <= tol * np.maximum(cost, tol))) & (damping < 1e12)
+        if not active.any():
+            break
+
+    a, b, log_c, d = params.T
+    with np.errstate(over='ignore'):
+        return np.stack([a * scale, b, np.exp(log_c), d * scale], axis=-1)
+
+def evaluate_curves(model, coefficients, rfu):
+    """Concentrations for (N, k) RFU from (N, p) coefficients of one model"""
+    rfu = np.asarray(rfu, dtype=float)
+    c = np.asarray(coefficients, dtype=float)
+    with np.errstate(all='ignore'):
+        if model in LINEAR_MODELS:
+            return c[:, 0:1] * rfu + c[:, 1:2]
+        if model == 'loglog':
+            return np.exp(c[:, 0:1] + c[:, 1:2] * np.log(np.where(rfu > 0, rfu, np.nan)))
+        if model == 'quadratic':
+            return c[:, 0:1] + c[:, 1:2] * rfu + c[:, 2:3] * rfu ** 2
+        if model == '4pl':
+            a, b, c50, d = (c[:, i:i + 1] for i in range(4))
+            ratio = (a - d) / (rfu - d) - 1
+            return c50 * np.where(ratio > 0, ratio, np.nan) ** (1 / b)
+    raise ValueError(f"Unknown standard curve model '{model}' (choose from {', '.join(CURVE_MODELS)})")
+
+def _fit_model(model, rfu, conc, valid):
+    """(N, p) coefficients of `model`, plus the slope standard error for linear models"""
+    x = np.where(valid, rfu, 0.0)
+    y = np.where(valid, conc, 0.0)
+    no_std_err = np.full(len(rfu), np.nan)
+    if model in LINEAR_MODELS:
+        power = LINEAR_MODELS.index(model)  # Weight 1, 1/x or 1/x²
+        w = np.where(valid, np.abs(np.where(valid, conc, 1.0)) ** -power, 0.0)
+        slope, intercept, std_err = _weighted_line(x, y, w)
+        return np.stack([slope, intercept], axis=-1), std_err
+    if model == 'loglog':
+        positive = valid & (rfu > 0) & (conc > 0)
+        log_x = np.log(np.where(positive, rfu, 1.0))
+        log_y = np.log(np.where(positive, conc, 1.0))
+        slope, intercept, _ = _weighted_line(log_x, log_y, positive.astype(float))
+        return np.stack([intercept, slope], axis=-1), no_std_err
+    if model == 'quadratic':
+        w = np.where(valid, 1 / np.where(valid & (conc != 0), conc, np.inf) ** 2, 0.0)
+        return _fit_polynomial(x, y, w, 2), no_std_err
+    if model == '4pl':
+        return _fit_4pl(conc, rfu, valid & (conc > 0)), no_std_err
+    raise ValueError(f"Unknown standard curve model '{model}' (choose from {', '.join(CURVE_MODELS)})")
+
+def fit_curves(rfu, concentrations, model='linear'):
+    """Fit one model to N standard curves at once
+
+    Returns a dict of arrays: coefficients (N, p), r_squared (concentration-
+    space R² of the back-calculated standards), rel_rmse (relative back-
+    calculation error, sqrt(sum(((fit - nominal) / nominal)²) / (n - p)), the
+    model-selection score) and std_err (slope standard error, linear models only).
+    """
+    rfu, conc, valid = _as_stack(rfu, concentrations)
+    with np.errstate(all='ignore'):
+        coefficients, std_err = _fit_model(model, rfu, conc, valid)
+        fitted = evaluate_curves(model, coefficients, rfu)
+        used = valid & np.isfinite(fitted)
+        residuals = np.where(used, fitted - conc, 0.0)
+        y_mean = np.where(valid, conc, 0.0).sum(axis=-1) / valid.sum(axis=-1)
+        total = np.where(valid, (conc - y_mean[:, np.newaxis]) ** 2, 0.0).sum(axis=-1)
+        r_squared = 1 - (residuals ** 2).sum(axis=-1) / total
+        relative = np.where(used & (conc != 0), residuals / np.where(conc != 0, conc, 1.0), 0.0)
+        df = used.sum(axis=-1) - N_PARAMS[model]
+        rel_rmse = np.sqrt((relative ** 2).sum(axis=-1) / np.where(df > 0, df, np.nan))
+        # A curve that cannot back-calculate some standards is not a usable fit
+        rel_rmse = np.where(used.sum(axis=-1) == valid.sum(axis=-1), rel_rmse, np.nan)
+    return {'model': model, 'coefficients': coefficients, 'r_squared': r_squared, 'rel_rmse': rel_rmse,
+            'std_err': std_err}
+
+def fit_standard_curves(rfu, concentrations, model='linear', candidates=CURVE_MODELS):
+    """Fit N standard curves and return one params dict per curve
+
+    With model='auto' every candidate model is fitted to the whole stack and
+    each curve keeps the earliest (simplest) candidate whose rel_rmse is within
+    SELECTION_TOLERANCE of the best one; the scores are kept under 'selection'.
+    """
+    models = list(candidates) if model == AUTO_MODEL else [model]
+    fits = [fit_curves(rfu, concentrations, name) for name in models]
+    scores = np.stack([np.where(np.isfinite(fit['rel_rmse']), fit['rel_rmse'], np.inf) for fit in fits])
+    best = (scores <= scores.min(axis=0) * (1 + SELECTION_TOLERANCE) + 1e-12).argmax(axis=0)
+
+    params = []
+    for i, choice in enumerate(best):
+        fit = fits[choice]
+        coefficients = [float(c) for c in fit['coefficients'][i]]
+        linear = fit['model'] in LINEAR_MODELS
+        curve = {
+            'slope': coefficients[0] if linear else None,
+            'intercept': coefficients[1] if linear else None,
+            'r_squared': float(fit['r_squared'][i]),
+            'std_err': float(fit['std_err'][i]) if linear else None,
+            'model': fit['model'],
+            'weighting': WEIGHTING[fit['model']],
+            'coefficients': coefficients,
+            'rel_rmse': float(fit['rel_rmse'][i]),
+        }
+        if model == AUTO_MODEL:
+            curve['selection'] = {name: float(f['rel_rmse'][i]) for name, f in zip(models, fits)}
+        params.append(curve)
+    return params
+
+def fit_standard_curve(rfu, concentrations, model='linear', candidates=CURVE_MODELS):
+    """Params dict for a single curve (see fit_standard_curves)"""
+    return fit_standard_curves(np.asarray(rfu, dtype=float)[np.newaxis], concentrations, model, candidates)[0]
+
+def evaluate_curve(standard_curve_params, rfu):
+    """Concentrations for RFU of any shape from a params dict (older params without 'model' are linear)"""
+    model = standard_curve_params.get('model', 'linear')
+    coefficients = standard_curve_params.get('coefficients') or \
+        [standard_curve_params['slope'], standard_curve_params['intercept']]
+    rfu = np.asarray(rfu, dtype=float)
+    return evaluate_curves(model, np.asarray(coefficients, dtype=float)[np.newaxis],
+                           rfu.reshape(1, -1)).reshape(rfu.shape)
+
+def curve_equation(standard_curve_params):
+    """Human-readable equation; linear models keep the analyzer's 'y = ...x + ...' form"""
+    model = standard_curve_params.get('model', 'linear')
+    if model in LINEAR_MODELS:
+        return f"y = {standard_curve_params['slope']:.8f}x + {standard_curve_params['intercept']:.8f}"
+    c = standard_curve_params['coefficients']
+    if model == 'loglog':
+        return f"log(y) = {c[0]:.6f} + {c[1]:.6f}·log(x)"
+    if model == 'quadratic':
+        return f"y = {c[0]:.6g} + {c[1]:.6g}x + {c[2]:.6g}x²"
+    return f"x = {c[3]:.6g} + ({c[0]:.6g} - {c[3]:.6g}) / (1 + (y / {c[2]:.6g})^{c[1]:.4f})"
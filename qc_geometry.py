@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Plate geometry for the Dispenser QC Analyzer
+
+A PlateGeometry describes one plate format - its rows and columns, well names
+and where the standards and dispenser groups sit - so parsing, grouping,
+naming and plotting work the same on 96, 384 and 1536-well plates:
+
+    96     8 x 12   rows A-H
+    384   16 x 24   rows A-P
+    1536  32 x 48   rows A-Z, AA-AF
+
+The standards scale with the plate: STD1-STD8 sit in the first 3 columns of
+evenly spaced rows (every row, every 2nd, every 4th). How each liquid handler's
+nozzles or tips cover the plate is declared in handlers.json (see qc_handlers).
+"""
+
+import numpy as np
+
+N_STANDARDS = 8
+STANDARD_COLS = (0, 1, 2)  # Standard triplicates in columns 1-3
+
+def row_label(row):
+    """Row letter(s) for a 0-based row index: A..Z, then AA, AB, ..."""
+    label = ""
+    row += 1
+    while row:
+        row, remainder = divmod(row - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+def row_index(label):
+    """0-based row index of a row label (inverse of row_label)"""
+    row = 0
+    for letter in label.upper():
+        row = row * 26 + ord(letter) - 64
+    return row - 1
+
+class PlateGeometry:
+    """Rows, columns, well names and standard positions of one plate format"""
+    def __init__(self, name, rows, cols):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.n_wells = rows * cols
+        self.row_labels = tuple(row_label(row) for row in range(rows))
+        self.standard_rows = tuple(range(0, rows, rows // N_STANDARDS))  # STD1 .. STD8
+        self.standard_cols = STANDARD_COLS
+        self._well_names = None
+
+    def __repr__(self):
+        return f"PlateGeometry({self.name!r}, {self.rows}, {self.cols})"
+
+    def __reduce__(self):
+        return geometry_by_name, (self.name,)  # Known formats unpickle to the shared instance
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    def well_name(self, row, col):
+        return f"{self.row_labels[row]}{col + 1}"
+
+    def well_names(self):
+        """Names of all wells in row-major (flat index) order, built once per geometry"""
+        if self._well_names is None:
+            self._well_names = np.array([self.well_name(row, col) for row in range(self.rows)
+                                         for col in range(self.cols)], dtype=object)
+        return self._well_names
+
+    def parse_well(self, well_id):
+        """(row, col) of a well name such as 'D7' or 'AB12'"""
+        letters = well_id.rstrip('0123456789')
+        row, col = row_index(letters), int(well_id[len(letters):]) - 1
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Well {well_id} is outside a {self.name}-well plate")
+        return row, col
+
+PLATE_96 = PlateGeometry('96', 8, 12)
+PLATE_384 = PlateGeometry('384', 16, 24)
+PLATE_1536 = PlateGeometry('1536', 32, 48)
+GEOMETRIES = {geometry.name: geometry for geometry in (PLATE_96, PLATE_384, PLATE_1536)}
+DEFAULT_GEOMETRY = PLATE_384
+MAX_COLS = max(geometry.cols for geometry in GEOMETRIES.values())
+
+def geometry_by_name(name):
+    if name not in GEOMETRIES:
+        raise ValueError(f"Unknown plate format '{name}' (choose from {', '.join(GEOMETRIES)})")
+    return GEOMETRIES[name]
+
+def geometry_for_shape(shape):
+    """Geometry of a (rows, cols) plate array"""
+    for geometry in GEOMETRIES.values():
+        if tuple(shape) == geometry.shape:
+            return geometry
+    raise ValueError(f"No {' / '.join(GEOMETRIES)}-well plate has shape {tuple(shape)}")
+
+def geometry_for_columns(n_cols, default=DEFAULT_GEOMETRY):
+    """Geometry with n_cols columns (read from an export's column header row), else `default`"""
+    for geometry in GEOMETRIES.values():
+        if geometry.cols == n_cols:
+            return geometry
+    return default
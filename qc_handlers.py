@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Liquid handler registry for the Dispenser QC Analyzer
+
+Every dispenser is described declaratively in handlers.json - plus an optional
+JSON or YAML file named by the QC_CHECK_HANDLERS environment variable, whose
+entries are added to (or replace) the built-in ones. A new dispenser needs
+only a new entry, e.g. a 16-nozzle chip:
+
+    "Mantis": {"pattern": "rows", "nozzles": 16, "component": "Nozzle",
+               "abbreviation": "N", "configurable_chips": true}
+
+Fields:
+    pattern                  how wells form QC groups:
+                               rows    `nozzles` bands of consecutive rows
+                                       (rows_per_nozzle, default rows / nozzles)
+                               single  all wells form one group
+                               blocks  a multi-tip head, head = [tip rows, tip
+                                       cols]; each tip covers a (rows / tip rows)
+                                       x (cols / tip cols) square, one square
+                                       every `row_spacing` squares down
+                               wells   one group per well, numbered among the
+                                       wells holding data
+    component                group name in ids, plots and the summary
+    abbreviation             summary prefix (N1, Q1, W1; alone for one group)
+    default_chip_id          chip id when no chips are configured
+    standard_columns         1-based columns of the standard triplicates (1, 2, 3)
+    positive_only            only positive concentrations count (false)
+    separate_standard_curve  curve from a separate standards plate (false)
+    configurable_chips       chips and column ranges are set in the GUI (false)
+    description              GUI help text
+
+Each layout is compiled once per plate geometry into a flat well -> group
+array (see group_map), so grouping a plate is one fancy-indexing operation.
+"""
+
+import functools
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+REGISTRY_FILE = Path(__file__).resolve().with_name('handlers.json')
+PATTERNS = ('rows', 'single', 'blocks', 'wells')
+DEFAULT_HANDLER = 'Tempest'
+REQUIRED_FIELDS = ('pattern', 'component', 'abbreviation')
+OPTIONAL_FIELDS = {
+    'description': "",
+    'default_chip_id': None,
+    'nozzles': None,
+    'rows_per_nozzle': None,
+    'head': None,
+    'row_spacing': 1,
+    'standard_columns': [1, 2, 3],
+    'positive_only': False,
+    'separate_standard_curve': False,
+    'configurable_chips': False,
+}
+
+class HandlerLayout:
+    """One liquid handler's well -> QC group layout, validated from its registry entry"""
+    def __init__(self, name, spec):
+        unknown = set(spec) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS)
+        missing = [field for field in REQUIRED_FIELDS if field not in spec]
+        if unknown or missing:
+            raise ValueError(f"Handler '{name}': " + "; ".join(
+                ([f"unknown field(s) {', '.join(sorted(unknown))}"] if unknown else []) +
+                ([f"missing field(s) {', '.join(missing)}"] if missing else [])))
+        spec = {**OPTIONAL_FIELDS, **spec}
+        if spec['pattern'] not in PATTERNS:
+            raise ValueError(f"Handler '{name}': unknown pattern '{spec['pattern']}' (choose from {', '.join(PATTERNS)})")
+        if spec['pattern'] == 'rows' and not spec['nozzles']:
+            raise ValueError(f"Handler '{name}': the rows pattern needs a nozzle count")
+        if spec['pattern'] == 'blocks' and (not spec['head'] or len(spec['head']) != 2):
+            raise ValueError(f"Handler '{name}': the blocks pattern needs head = [tip rows, tip columns]")
+        self.name = name
+        self.pattern = spec['pattern']
+        self.component = spec['component']
+        self.abbreviation = spec['abbreviation']
+        self.description = spec['description']
+        self.default_chip_id = spec['default_chip_id'] or f"{name}_Chip"
+        self.nozzles = spec['nozzles']
+        self.rows_per_nozzle = spec['rows_per_nozzle']
+        self.head = tuple(spec['head']) if spec['head'] else None
+        self.row_spacing = spec['row_spacing']
+        self.standard_cols = tuple(col - 1 for col in spec['standard_columns'])
+        self.positive_only = bool(spec['positive_only'])
+        self.separate_standard_curve = bool(spec['separate_standard_curve'])
+        self.configurable_chips = bool(spec['configurable_chips'])
+
+    def __repr__(self):
+        return f"HandlerLayout({self.name!r}, pattern={self.pattern!r})"
+
+    @property
+    def per_well(self):
+        return self.pattern == 'wells'
+
+    @property
+    def single_group(self):
+        return self.pattern == 'single'
+
+    @property
+    def first_sample_col(self):
+        """0-based first column after the standard curve columns"""
+        return max(self.standard_cols) + 1 if self.standard_cols else 0
+
+    def group_name(self, chip_id, number=None):
+        """nozzle_id of a group (Chip_1_Nozzle_3); without a number the bare prefix (Single_Nozzle_Single_Nozzle)"""
+        name = f"{chip_id}_{self.component.replace(' ', '_')}"
+        return name if number is None else f"{name}_{number}"
+
+    def short_name(self, nozzle_id):
+        """Summary label of a group: N3, Q12, W40 - or the abbreviation alone for single-group layouts"""
+        if self.single_group:
+            return self.abbreviation
+        marker = f"_{self.component.replace(' ', '_')}_"
+        return f"{self.abbreviation}{nozzle_id.split(marker)[1]}" if marker in nozzle_id else nozzle_id
+
+    def group_map(self, geometry):
+        """(read-only flat well -> group array, -1 outside every group; number of groups) - built once per geometry"""
+        return _group_map(self, geometry)
+
+@functools.lru_cache(maxsize=64)
+def _group_map(layout, geometry):
+    rows = np.arange(geometry.rows)[:, np.newaxis]
+    cols = np.arange(geometry.cols)[np.newaxis, :]
+    shape = geometry.shape
+    if layout.pattern == 'single':
+        groups, n_groups = np.zeros(shape, dtype=np.intp), 1
+    elif layout.pattern == 'wells':
+        groups, n_groups = np.arange(geometry.n_wells, dtype=np.intp).reshape(shape), geometry.n_wells
+    elif layout.pattern == 'rows':
+        band = layout.rows_per_nozzle or geometry.rows // layout.nozzles
+        if band < 1 or band * layout.nozzles > geometry.rows:
+            raise ValueError(f"Handler '{layout.name}': {layout.nozzles} nozzles do not fit a {geometry.name}-well plate")
+        nozzle = np.broadcast_to(rows // band, shape)
+        groups, n_groups = np.where(nozzle < layout.nozzles, nozzle, -1), layout.nozzles
+    else:  # blocks
+        tip_rows, tip_cols = layout.head
+        block_rows, block_cols = geometry.rows // tip_rows, geometry.cols // tip_cols
+        if block_rows < 1 or block_cols < 1:
+            raise ValueError(f"Handler '{layout.name}': a {tip_rows}x{tip_cols} head does not fit a {geometry.name}-well plate")
+        step = block_rows * layout.row_spacing
+        start = layout.first_sample_col
+        n_col_groups = -(-(geometry.cols - start) // block_cols)
+        covered = (rows % step < block_rows) & (cols >= start)
+        groups = np.where(covered, rows // step * n_col_groups + (cols - start) // block_cols, -1)
+        n_groups = len(range(0, geometry.rows, step)) * n_col_groups
+    groups = np.ascontiguousarray(groups, dtype=np.intp).ravel()
+    groups.setflags(write=False)
+    return groups, n_groups
+
+def _read_registry_file(path):
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml  # Optional - only needed for YAML registries
+            except ImportError:
+                raise ValueError(f"Reading {path} needs PyYAML (pip install pyyaml) - or use JSON") from None
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+def load_registry(*paths):
+    """Handler layouts from registry files, later files adding to or replacing earlier entries"""
+    registry = {}
+    for path in paths:
+        for name, spec in _read_registry_file(path).items():
+            registry[name] = HandlerLayout(name, spec)
+    return registry
+
+HANDLERS = load_registry(REGISTRY_FILE, *filter(None, [os.environ.get('QC_CHECK_HANDLERS')]))
+
+def get_handler(name):
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown liquid handler '{name}' (choose from {', '.join(HANDLERS)})")
+    return HANDLERS[name]
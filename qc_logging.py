@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Logging setup for the Dispenser QC Analyzer
+
+The analyzer logs through one logger per pipeline area:
+
+    qc_check            pipeline steps
+    qc_check.load       parsing and standard-curve extraction
+    qc_check.curve      curve fitting
+    qc_check.qc         concentrations and QC metrics
+    qc_check.output     processed file, plots, result store
+    qc_check.summary    the end-of-run report
+    qc_check.batch      batch progress
+    qc_check.watch      watch-mode events
+    qc_check.archive    plate archive import and re-analysis
+    qc_check.spc        control chart updates and rule violations
+
+Levels are given as "LEVEL" or "LEVEL,logger=LEVEL,...", e.g.
+"WARNING,qc_check.qc=DEBUG". Per-well detail is logged at DEBUG.
+
+The command line calls configure_logging(). Library callers that set up no
+logging of their own get the interactive console output on the first
+analysis (see ensure_logging); an application with its own handlers keeps
+full control over the records.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import sys
+from datetime import datetime
+
+ROOT_LOGGER = 'qc_check'
+INTERACTIVE_LEVELS = 'INFO'
+# Batch and watch runs only report per-plate progress and problems
+QUIET_LEVELS = 'WARNING,qc_check.batch=INFO,qc_check.watch=INFO'
+
+_current_plate = contextvars.ContextVar('qc_plate', default=None)
+_handler = None  # The handler installed by configure_logging
+
+def parse_levels(levels):
+    """'WARNING,qc_check.qc=DEBUG' -> {'qc_check': 'WARNING', 'qc_check.qc': 'DEBUG'}"""
+    parsed = {}
+    for item in str(levels).split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, level = item.rpartition('=')
+        level = level.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Unknown log level '{level}'")
+        parsed[name.strip() or ROOT_LOGGER] = level
+    return parsed
+
+class PlainFormatter(logging.Formatter):
+    """Console output: the message only, as the analyzer always printed it"""
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and the plate being analyzed"""
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+        }
+        plate = _current_plate.get()
+        if plate:
+            entry['plate'] = plate
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def configure_logging(levels=INTERACTIVE_LEVELS, json_lines=False, log_file=None, stream=None):
+    """Install the analyzer's log handler (replacing any earlier one) and set per-logger levels"""
+    global _handler
+    root = logging.getLogger(ROOT_LOGGER)
+    if _handler is not None:
+        root.removeHandler(_handler)
+        _handler.close()
+
+    if log_file:
+        _handler = logging.FileHandler(log_file, encoding='utf-8')
+    else:
+        _handler = logging.StreamHandler(stream or sys.stdout)
+    _handler.setFormatter(JsonLinesFormatter() if json_lines else PlainFormatter())
+    root.addHandler(_handler)
+    root.propagate = False
+
+    parsed = parse_levels(levels)
+    root.setLevel(parsed.pop(ROOT_LOGGER, 'INFO'))
+    for name in list(logging.Logger.manager.loggerDict):
+        if name.startswith(ROOT_LOGGER + '.'):
+            logging.getLogger(name).setLevel(logging.NOTSET)  # Inherit unless overridden below
+    for name, level in parsed.items():
+        logging.getLogger(name).setLevel(level)
+    return root
+
+def logging_configured():
+    return _handler is not None
+
+def ensure_logging(levels=INTERACTIVE_LEVELS):
+    """Install the console handler unless logging is already set up here or by the application
+
+    Without any handler only warnings would reach stderr, and a library
+    caller would lose the report the analyzer prints.
+    """
+    if _handler is None and not logging.getLogger(ROOT_LOGGER).handlers and not logging.getLogger().handlers:
+        configure_logging(levels)
+
+class _ErrorCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage().strip())
+
+@contextlib.contextmanager
+def capture_errors(logger_name=ROOT_LOGGER):
+    """Collect the ERROR messages logged inside the block (independent of the console handler)"""
+    collector = _ErrorCollector()
+    logger = logging.getLogger(logger_name)
+    logger.addHandler(collector)
+    try:
+        yield collector.messages
+    finally:
+        logger.removeHandler(collector)
+
+@contextlib.contextmanager
+def plate_context(csv_file):
+    """Tag JSON-lines records logged inside the block with the plate file"""
+    token = _current_plate.set(str(csv_file))
+    try:
+        yield
+    finally:
+        _current_plate.reset(token)
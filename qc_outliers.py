@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Outlier rejection for the Dispenser QC Analyzer
+
+Detectors work on a padded (G, m) array - one row per replicate group (a
+standard level's triplicate, a nozzle's wells), NaN for missing entries - and
+return a boolean mask of the entries to exclude. Each test runs on all groups
+at once, so a whole plate stack is screened without per-well loops.
+
+    grubbs   two-sided Grubbs test at significance alpha, repeated (one point
+             per group per pass) while it keeps rejecting
+    dixon    Dixon's Q test (r10) at alpha 0.10, 0.05 or 0.01, groups of 3-10,
+             a single pass
+    mad      robust z-score 0.6745 * |x - median| / MAD above threshold (3.5)
+    iqr      outside the Tukey fences Q1 - k * IQR, Q3 + k * IQR (k = 1.5)
+
+Groups with fewer than MIN_GROUP_SIZE values are never tested.
+"""
+
+import functools
+import warnings
+
+import numpy as np
+
+OUTLIER_METHODS = ('grubbs', 'dixon', 'mad', 'iqr')
+DEFAULT_ALPHA = 0.05
+MAD_THRESHOLD = 3.5
+IQR_FACTOR = 1.5
+MIN_GROUP_SIZE = 3
+
+# Two-sided critical Q (r10) for n = 3..10 (Rorabacher, Anal. Chem. 1991)
+DIXON_Q = {
+    0.10: (0.941, 0.765, 0.642, 0.560, 0.507, 0.468, 0.437, 0.412),
+    0.05: (0.970, 0.829, 0.710, 0.625, 0.568, 0.526, 0.493, 0.466),
+    0.01: (0.994, 0.926, 0.821, 0.740, 0.680, 0.634, 0.598, 0.568),
+}
+DIXON_MAX_GROUP = MIN_GROUP_SIZE + len(DIXON_Q[DEFAULT_ALPHA]) - 1
+
+@functools.lru_cache(maxsize=32)
+def _grubbs_critical(max_n, alpha):
+    """Critical G for n = 0..max_n (NaN below 3)"""
+    from scipy import stats  # Only loaded when Grubbs is used - keeps SciPy out of startup
+    n = np.arange(MIN_GROUP_SIZE, max_n + 1, dtype=float)
+    t = stats.t.ppf(1 - alpha / (2 * n), n - 2)
+    critical = (n - 1) / np.sqrt(n) * np.sqrt(t ** 2 / (n - 2 + t ** 2))
+    return tuple([np.nan] * MIN_GROUP_SIZE + critical.tolist())
+
+def _extreme(values, valid, largest):
+    """Column index of each row's largest (or smallest) valid value"""
+    fill = -np.inf if largest else np.inf
+    masked = np.where(valid, values, fill)
+    return masked.argmax(axis=1) if largest else masked.argmin(axis=1)
+
+def grubbs_outliers(values, alpha=DEFAULT_ALPHA):
+    values = np.array(values, dtype=float)
+    outliers = np.zeros(values.shape, dtype=bool)
+    if values.shape[1] < MIN_GROUP_SIZE:
+        return outliers
+    critical = np.array(_grubbs_critical(values.shape[1], alpha))
+    rows = np.arange(len(values))
+    for _ in range(values.shape[1] - MIN_GROUP_SIZE + 1):
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=1)
+        testable = n >= MIN_GROUP_SIZE
+        if not testable.any():
+            break
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, values, 0.0).sum(axis=1) / n
+            deviation = np.where(valid, np.abs(values - mean[:, np.newaxis]), 0.0)
+            std = np.sqrt((deviation ** 2).sum(axis=1) / (n - 1))
+            suspect = deviation.argmax(axis=1)
+            g = deviation[rows, suspect] / std
+        reject = testable & (std > 0) & (g > critical[np.minimum(n, len(critical) - 1)])
+        if not reject.any():
+            break
+        outliers[rows[reject], suspect[reject]] = True
+        values[rows[reject], suspect[reject]] = np.nan
+    return outliers
+
+def dixon_outliers(values, alpha=DEFAULT_ALPHA):
+    if alpha not in DIXON_Q:
+        raise ValueError(f"Dixon's Q test supports alpha {', '.join(map(str, DIXON_Q))}, not {alpha}")
+    values = np.asarray(values, dtype=float)
+    outliers = np.zeros(values.shape, dtype=bool)
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=1)
+    ordered = np.sort(values, axis=1)  # NaN sorts last
+    rows = np.arange(len(values))
+    low, high = ordered[:, 0], ordered[rows, np.maximum(n - 1, 0)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = high - low
+        q_low = (ordered[:, 1 % max(values.shape[1], 1)] - low) / spread
+        q_high = (high - ordered[rows, np.maximum(n - 2, 0)]) / spread
+    table = np.array((np.nan,) * MIN_GROUP_SIZE + DIXON_Q[alpha])
+    critical = np.where(n < len(table), table[np.minimum(n, len(table) - 1)], np.nan)
+    testable = (n >= MIN_GROUP_SIZE) & (n < len(table)) & (spread > 0)
+    reject_high = testable & (q_high >= q_low) & (q_high > critical)
+    reject_low = testable & (q_low > q_high) & (q_low > critical)
+    outliers[rows[reject_high], _extreme(values, valid, True)[reject_high]] = True
+    outliers[rows[reject_low], _extreme(values, valid, False)[reject_low]] = True
+    return outliers
+
+def mad_outliers(values, threshold=MAD_THRESHOLD):
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN padding rows
+        median = np.nanmedian(values, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(values - median), axis=1, keepdims=True)
+        robust_z = 0.6745 * np.abs(values - median) / mad
+    testable = (valid.sum(axis=1, keepdims=True) >= MIN_GROUP_SIZE) & (mad > 0)
+    return valid & testable & (robust_z > threshold)
+
+def iqr_outliers(values, factor=IQR_FACTOR):
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        q1, q3 = np.nanpercentile(values, [25, 75], axis=1, keepdims=True)
+    spread = q3 - q1
+    testable = valid.sum(axis=1, keepdims=True) >= MIN_GROUP_SIZE
+    with np.errstate(invalid='ignore'):
+        return valid & testable & ((values < q1 - factor * spread) | (values > q3 + factor * spread))
+
+def detect_outliers(values, method, alpha=DEFAULT_ALPHA, threshold=None):
+    """Outlier mask for a padded (G, m) array of replicate groups
+
+    alpha is the significance level of the Grubbs and Dixon tests; threshold
+    overrides the MAD z-score cut-off or the IQR fence factor.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        return detect_outliers(values[np.newaxis], method, alpha, threshold)[0]
+    if method == 'grubbs':
+        return grubbs_outliers(values, alpha)
+    if method == 'dixon':
+        return dixon_outliers(values, alpha)
+    if method == 'mad':
+        return mad_outliers(values, MAD_THRESHOLD if threshold is None else threshold)
+    if method == 'iqr':
+        return iqr_outliers(values, IQR_FACTOR if threshold is None else threshold)
+    raise ValueError(f"Unknown outlier method '{method}' (choose from {', '.join(OUTLIER_METHODS)})")
+
+def check_outlier_alpha(method, alpha):
+    """Raise ValueError if method cannot run at significance alpha (before any plate is read)"""
+    if method == 'dixon' and alpha not in DIXON_Q:
+        raise ValueError(f"Dixon's Q test supports alpha {', '.join(map(str, DIXON_Q))}, not {alpha}")
+    if method == 'grubbs' and not 0 < alpha < 1:
+        raise ValueError(f"Grubbs' test needs an alpha between 0 and 1, not {alpha}")
+
+def flag_grouped_outliers(values, bins, n_bins, method, **options):
+    """Outlier flags for flat values labelled with group bins (as in calculate_qc_table)
+
+    The values are scattered into a padded (n_bins, largest group) array,
+    tested with detect_outliers and the mask is gathered back.
+    """
+    values = np.asarray(values, dtype=float)
+    bins = np.asarray(bins, dtype=np.intp)
+    if not len(values):
+        return np.zeros(0, dtype=bool)
+    order = np.argsort(bins, kind='stable')
+    sorted_bins = bins[order]
+    counts = np.bincount(bins, minlength=n_bins)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(bins)) - starts[sorted_bins]
+    padded = np.full((n_bins, counts.max()), np.nan)
+    padded[sorted_bins, position] = values[order]
+    flags = np.empty(len(values), dtype=bool)
+    flags[order] = detect_outliers(padded, method, **options)[sorted_bins, position]
+    return flags
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Stage instrumentation for the Dispenser QC Analyzer
+
+A Profiler records nested, context-managed spans with wall time, CPU time,
+peak traced memory and arbitrary counts (wells, groups, ...), and exports
+them as a JSON trace or a Chrome trace (chrome://tracing, Perfetto).
+When profiling is off the analyzer uses NULL_PROFILER, whose spans do nothing.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+def peak_rss_mb():
+    """Peak resident memory of this process (None where the resource module is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3  # bytes on macOS, KiB on Linux
+
+class Span:
+    """One timed stage; `count()` attaches counts such as wells or groups processed"""
+    __slots__ = ('name', 'parent', 'depth', 'start', 'wall', 'cpu', 'peak_mb', 'counts', 'pid', '_cpu_start',
+                 '_child_peak')
+
+    def __init__(self, name, parent=None, counts=None):
+        self.name = name
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.counts = dict(counts or {})
+        self.start = self.wall = self.cpu = self._cpu_start = 0.0
+        self.peak_mb = None
+        self.pid = os.getpid()
+        self._child_peak = 0
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def to_dict(self):
+        return {'name': self.name, 'parent': self.parent.name if self.parent else None, 'depth': self.depth,
+                'start_s': self.start, 'wall_s': self.wall, 'cpu_s': self.cpu, 'peak_mb': self.peak_mb,
+                'pid': self.pid, 'counts': self.counts}
+
+class _SpanContext:
+    def __init__(self, profiler, span):
+        self.profiler = profiler
+        self.span = span
+
+    def __enter__(self):
+        self.profiler._enter(self.span)
+        return self.span
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit(self.span)
+        return False
+
+class Profiler:
+    """Collects spans for one analysis run
+
+    Memory is tracked with tracemalloc (peak Python heap per span, children
+    included); it roughly doubles the run time, so it can be switched off with
+    track_memory=False to get clean timings.
+    """
+    enabled = True
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def span(self, name, **counts):
+        """Context manager timing the block as a child of the current span"""
+        return _SpanContext(self, Span(name, self._stack[-1] if self._stack else None, counts))
+
+    def _enter(self, span):
+        if self.track_memory and tracemalloc.is_tracing():
+            if self._stack:
+                # Keep the parent's peak so far before the child resets it
+                parent = self._stack[-1]
+                parent._child_peak = max(parent._child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(span)
+        self.spans.append(span)
+        span._cpu_start = time.process_time()
+        span.start = time.perf_counter()
+
+    def _exit(self, span):
+        span.wall = time.perf_counter() - span.start
+        span.cpu = time.process_time() - span._cpu_start
+        span.start -= self._origin
+        self._stack.pop()
+        if self.track_memory and tracemalloc.is_tracing():
+            peak = max(span._child_peak, tracemalloc.get_traced_memory()[1])
+            span.peak_mb = peak / 1e6
+            if self._stack:
+                self._stack[-1]._child_peak = max(self._stack[-1]._child_peak, peak)
+
+    def add_span(self, name, start, wall, cpu, pid=None, **counts):
+        """Record a span measured elsewhere (e.g. in a worker process) under the current span
+
+        `start` is a time.perf_counter() value; it is comparable across
+        processes on the same machine.
+        """
+        span = Span(name, self._stack[-1] if self._stack else None, counts)
+        span.start = start - self._origin
+        span.wall = wall
+        span.cpu = cpu
+        span.pid = pid or span.pid
+        self.spans.append(span)
+        return span
+
+    def close(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def to_dict(self):
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'track_memory': self.track_memory,
+            'peak_rss_mb': peak_rss_mb(),
+            'spans': [span.to_dict() for span in self.spans],
+        }
+
+    def write_json(self, path):
+        """JSON trace: one entry per span, in start order"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return str(path)
+
+    def write_chrome_trace(self, path):
+        """Chrome trace-event file (complete 'X' events, microseconds)"""
+        events = []
+        for span in self.spans:
+            args = dict(span.counts, cpu_ms=round(span.cpu * 1000, 3))
+            if span.peak_mb is not None:
+                args['peak_mb'] = round(span.peak_mb, 3)
+            events.append({'name': span.name, 'ph': 'X', 'ts': span.start * 1e6, 'dur': span.wall * 1e6,
+                           'pid': span.pid, 'tid': span.pid, 'args': args})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return str(path)
+
+    def summary(self):
+        """Indented text table of the spans"""
+        lines = [f"{'Stage':<40} {'Wall ms':>10} {'CPU ms':>10} {'Peak MB':>9}  Counts"]
+        for span in self.spans:
+            peak = f"{span.peak_mb:9.2f}" if span.peak_mb is not None else f"{'-':>9}"
+            counts = ', '.join(f"{k}={v}" for k, v in span.counts.items())
+            lines.append(f"{'  ' * span.depth + span.name:<40} {span.wall * 1000:10.2f} {span.cpu * 1000:10.2f} "
+                         f"{peak}  {counts}")
+        return '\n'.join(lines)
+
+class _NullSpan:
+    """Shared no-op span: profiling off costs one attribute lookup and call per stage"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def count(self, **counts):
+        pass
+
+class NullProfiler:
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, name, **counts):
+        return self._span
+
+    def add_span(self, *args, **kwargs):
+        return self._span
+
+    def close(self):
+        pass
+
+NULL_PROFILER = NullProfiler()
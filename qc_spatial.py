@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Spatial artifact detection for the Dispenser QC Analyzer
+
+Evaporation at the plate edges and gradients across the dispense path show
+up as row, column and edge patterns that inflate a nozzle's %CV without
+being nozzle imprecision. Every model here is fitted to each plate of an
+(N, rows, cols) stack at once, over the wells in `mask` (the QC sample
+wells) that hold a value:
+
+    twoway         least squares: level + linear row gradient + linear column
+                   gradient + an offset for the wells on the plate edge
+                   (outer rows and columns). Four terms per plate, so nozzle
+                   offsets are not absorbed.
+    median_polish  Tukey's median polish: one robust effect per row and per
+                   column, then the median edge residual. Catches non-linear
+                   patterns, but row effects also absorb row-band nozzle
+                   offsets (Tempest, Combi).
+
+Magnitudes are reported in % of each plate's median: row_gradient and
+col_gradient are the peak-to-peak change of the fitted row / column term
+across the sample wells, edge_effect is the signed edge offset (positive =
+edge wells read high, as with evaporation).
+"""
+
+import warnings
+
+import numpy as np
+
+SPATIAL_METHODS = ('twoway', 'median_polish')
+SPATIAL_COLUMNS = ('row_gradient', 'col_gradient', 'edge_effect')
+POLISH_ITERATIONS = 10
+
+def edge_wells(shape):
+    """Boolean (rows, cols) mask of the wells on the outer rows and columns of the plate"""
+    edge = np.zeros(shape, dtype=bool)
+    edge[[0, -1], :] = True
+    edge[:, [0, -1]] = True
+    return edge
+
+def _nanmedian(values, axis):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN rows / columns / plates
+        return np.nanmedian(values, axis=axis)
+
+def _peak_to_peak(effects, present):
+    """max - min of each plate's effects over the rows/columns that hold fitted wells"""
+    effects = np.where(present, effects, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nan_to_num(np.nanmax(effects, axis=1) - np.nanmin(effects, axis=1))
+
+def _fit_twoway(values, fitted, edge):
+    n_plates, rows, cols = values.shape
+    row_index, col_index = np.indices((rows, cols))
+    design = np.stack([np.ones(rows * cols), row_index.ravel() / max(rows - 1, 1),
+                       col_index.ravel() / max(cols - 1, 1), edge.ravel()], axis=1).astype(float)  # (wells, 4)
+    weights = fitted.reshape(n_plates, -1).astype(float)
+    y = np.where(fitted, values, 0.0).reshape(n_plates, -1)
+    # Batched normal equations - one 4x4 system per plate; pinv copes with plates lacking edge wells
+    normal = np.einsum('nw,wi,wj->nij', weights, design, design)
+    moments = np.einsum('nw,wi->ni', weights * y, design)
+    coefficients = np.einsum('nij,nj->ni', np.linalg.pinv(normal), moments)
+    surface = np.einsum('wi,ni->nw', design[:, 1:], coefficients[:, 1:]).reshape(values.shape)
+
+    # Peak-to-peak over the fitted span: |slope| x the fraction of the plate the fitted wells cover
+    row_span = np.where(fitted.any(axis=2), row_index[:, 0], np.nan)
+    col_span = np.where(fitted.any(axis=1), col_index[0], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        row_fraction = np.nan_to_num((np.nanmax(row_span, axis=1) - np.nanmin(row_span, axis=1)) / max(rows - 1, 1))
+        col_fraction = np.nan_to_num((np.nanmax(col_span, axis=1) - np.nanmin(col_span, axis=1)) / max(cols - 1, 1))
+    return (surface, np.abs(coefficients[:, 1]) * row_fraction, np.abs(coefficients[:, 2]) * col_fraction,
+            coefficients[:, 3])
+
+def _fit_median_polish(values, fitted, edge, max_iter=POLISH_ITERATIONS, tol=1e-9):
+    residuals = np.where(fitted, values, np.nan)
+    row_effects = np.zeros(values.shape[:2])
+    col_effects = np.zeros((values.shape[0], values.shape[2]))
+    for _ in range(max_iter):
+        row_medians = np.nan_to_num(_nanmedian(residuals, axis=2))
+        residuals -= row_medians[:, :, np.newaxis]
+        row_effects += row_medians
+        col_medians = np.nan_to_num(_nanmedian(residuals, axis=1))
+        residuals -= col_medians[:, np.newaxis, :]
+        col_effects += col_medians
+        if max(np.abs(row_medians).max(initial=0), np.abs(col_medians).max(initial=0)) <= tol:
+            break
+    edge_effect = np.nan_to_num(_nanmedian(np.where(edge, residuals, np.nan).reshape(len(values), -1), axis=1))
+    surface = row_effects[:, :, np.newaxis] + col_effects[:, np.newaxis, :] + edge_effect[:, np.newaxis, np.newaxis] * edge
+    return (surface, _peak_to_peak(row_effects, fitted.any(axis=2)), _peak_to_peak(col_effects, fitted.any(axis=1)),
+            edge_effect)
+
+def fit_spatial_effects(stack, mask, method='twoway'):
+    """Fit row/column/edge effects to every plate of an (N, rows, cols) stack
+
+    mask is a (rows, cols) boolean array of the wells to fit (NaN wells are
+    skipped per plate). Returns a dict of:
+        surface      (N, rows, cols) fitted spatial effect, zero-mean over each
+                     plate's fitted wells and 0 elsewhere - subtract it to correct
+        level        (N,) median of each plate's fitted wells
+        row_gradient, col_gradient, edge_effect
+                     (N,) magnitudes in % of level (see the module docstring)
+    """
+    if method not in SPATIAL_METHODS:
+        raise ValueError(f"Unknown spatial method '{method}' (choose from {', '.join(SPATIAL_METHODS)})")
+    values = np.asarray(stack, dtype=float)
+    if values.ndim != 3 or np.shape(mask) != values.shape[1:]:
+        raise ValueError(f"Expected an (N, rows, cols) stack and a (rows, cols) mask, got {values.shape} and {np.shape(mask)}")
+    fitted = np.asarray(mask, dtype=bool) & np.isfinite(values)
+    edge = edge_wells(values.shape[1:])
+    fit = _fit_twoway if method == 'twoway' else _fit_median_polish
+    surface, row_gradient, col_gradient, edge_effect = fit(values, fitted, edge)
+
+    counts = fitted.sum(axis=(1, 2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        surface_mean = np.where(fitted, surface, 0.0).sum(axis=(1, 2)) / counts
+    surface = np.where(fitted, surface - surface_mean[:, np.newaxis, np.newaxis], 0.0)
+    level = _nanmedian(np.where(fitted, values, np.nan).reshape(len(values), -1), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(level != 0, 100.0 / np.abs(level), np.nan)
+    return {'surface': surface, 'level': level, 'row_gradient': row_gradient * scale,
+            'col_gradient': col_gradient * scale, 'edge_effect': edge_effect * scale}
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Statistical process control for the Dispenser QC Analyzer
+
+Every run is also a point on a control chart per (instrument, chip, nozzle)
+and metric (%CV and %Accuracy), so slow nozzle degradation shows up before a
+run crosses the fixed 5/10/15% thresholds. Each chart keeps only incremental
+state - running moments, the EWMA, the two CUSUM sums and the last
+CHART_POINTS points - so a run updates it in O(1) without re-reading history:
+
+    baseline   the first `baseline_runs` points set the center line and sigma
+               (average moving range / 1.128); no rules are checked yet
+    Shewhart   Western Electric rules on the individual values:
+                 WE1  one point beyond 3 sigma
+                 WE2  2 of 3 points beyond 2 sigma on one side
+                 WE3  4 of 5 points beyond 1 sigma on one side
+                 WE4  8 points in a row on one side of the center line
+    EWMA       exponentially weighted mean (lambda 0.2) beyond its 3-sigma limit
+    CUSUM      tabular CUSUM (k = 0.5 sigma) beyond h = 5 sigma, then restarted
+
+Charts are kept in a local SQLite database next to the result store's, and
+points are added in the order runs are analyzed.
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from qc_cache import file_sha256
+
+SPC_METRICS = {'cv_percent': '%CV', 'accuracy_percent': '%Accuracy'}
+DEFAULT_BASELINE_RUNS = 20
+CHART_POINTS = 50  # Points kept per chart for the rules and for rendering
+MOVING_RANGE_D2 = 1.128  # Expected moving range of two points, in sigma
+EWMA_LAMBDA = 0.2
+EWMA_WIDTH = 3.0
+CUSUM_K = 0.5
+CUSUM_H = 5.0
+
+RULES = {
+    'WE1': 'one point beyond 3 sigma',
+    'WE2': '2 of 3 points beyond 2 sigma',
+    'WE3': '4 of 5 points beyond 1 sigma',
+    'WE4': '8 points in a row on one side',
+    'EWMA': 'weighted mean beyond its control limit',
+    'CUSUM': 'cumulative sum beyond 5 sigma',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spc_charts (
+    instrument TEXT NOT NULL,
+    chip_id TEXT NOT NULL,
+    nozzle_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (instrument, chip_id, nozzle_id, metric)
+);
+CREATE TABLE IF NOT EXISTS spc_runs (
+    instrument TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    analyzed_at TEXT NOT NULL,
+    PRIMARY KEY (instrument, source_file, run_date)
+);
+CREATE TABLE IF NOT EXISTS spc_violations (
+    instrument TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    chip_id TEXT,
+    nozzle_id TEXT,
+    metric TEXT,
+    rule TEXT,
+    direction TEXT,
+    value REAL,
+    center REAL
+);
+CREATE INDEX IF NOT EXISTS idx_spc_violations ON spc_violations (instrument, run_date);
+"""
+
+VIOLATION_COLUMNS = ('chip_id', 'nozzle_id', 'metric', 'rule', 'direction', 'value', 'center')
+
+def new_chart(baseline_runs=DEFAULT_BASELINE_RUNS):
+    """Empty chart state (a JSON-compatible dict)"""
+    return {'baseline_runs': int(baseline_runs), 'n': 0, 'mean': 0.0, 'm2': 0.0, 'mr_sum': 0.0, 'last': None,
+            'center': None, 'sigma': None, 'n_monitored': 0, 'ewma': None, 'cusum_high': 0.0, 'cusum_low': 0.0,
+            'points': []}
+
+def _run_rule(points, length, needed, threshold, side):
+    """True if `needed` of the last `length` monitored points (the newest among them) lie beyond threshold on side"""
+    recent = [p['z'] for p in points[-length:] if p['z'] is not None]
+    if len(recent) < needed or side * recent[-1] <= threshold:
+        return False
+    return sum(1 for z in recent if side * z > threshold) >= needed
+
+def update_chart(chart, value, run_date=None):
+    """Add one run's value to a chart in place; returns the [(rule, direction), ...] it triggers
+
+    During the baseline the point only updates the running moments; the run
+    that completes it freezes the center line and sigma.
+    """
+    value = float(value)
+    point = {'run_date': run_date, 'value': value, 'z': None, 'ewma': None, 'ewma_limit': None,
+             'cusum_high': None, 'cusum_low': None, 'rules': []}
+    violations = []
+    if chart['center'] is None:
+        # Phase I - Welford moments and the moving range, nothing is judged yet
+        chart['n'] += 1
+        delta = value - chart['mean']
+        chart['mean'] += delta / chart['n']
+        chart['m2'] += delta * (value - chart['mean'])
+        if chart['last'] is not None:
+            chart['mr_sum'] += abs(value - chart['last'])
+        if chart['n'] >= chart['baseline_runs']:
+            sigma = chart['mr_sum'] / max(chart['n'] - 1, 1) / MOVING_RANGE_D2
+            if sigma <= 0:
+                sigma = math.sqrt(chart['m2'] / max(chart['n'] - 1, 1))
+            chart['center'] = chart['mean']
+            chart['sigma'] = sigma if sigma > 0 else max(abs(chart['mean']) * 1e-6, 1e-9)
+            chart['ewma'] = chart['center']
+    else:
+        # Phase II - judge the point against the frozen limits
+        center, sigma = chart['center'], chart['sigma']
+        z = (value - center) / sigma
+        chart['n'] += 1
+        chart['n_monitored'] += 1
+        chart['ewma'] = EWMA_LAMBDA * value + (1 - EWMA_LAMBDA) * chart['ewma']
+        ewma_limit = EWMA_WIDTH * sigma * math.sqrt(
+            EWMA_LAMBDA / (2 - EWMA_LAMBDA) * (1 - (1 - EWMA_LAMBDA) ** (2 * chart['n_monitored'])))
+        chart['cusum_high'] = max(0.0, chart['cusum_high'] + z - CUSUM_K)
+        chart['cusum_low'] = max(0.0, chart['cusum_low'] - z - CUSUM_K)
+        point.update(z=z, ewma=chart['ewma'], ewma_limit=ewma_limit, cusum_high=chart['cusum_high'],
+                     cusum_low=chart['cusum_low'])
+
+        points = chart['points'] + [point]
+        side = 1 if z > 0 else -1
+        direction = 'high' if side > 0 else 'low'
+        if abs(z) > 3:
+            violations.append(('WE1', direction))
+        if _run_rule(points, 3, 2, 2, side):
+            violations.append(('WE2', direction))
+        if _run_rule(points, 5, 4, 1, side):
+            violations.append(('WE3', direction))
+        if _run_rule(points, 8, 8, 0, side):
+            violations.append(('WE4', direction))
+        if abs(chart['ewma'] - center) > ewma_limit:
+            violations.append(('EWMA', 'high' if chart['ewma'] > center else 'low'))
+        for name, direction in (('cusum_high', 'high'), ('cusum_low', 'low')):
+            if chart[name] > CUSUM_H:
+                violations.append(('CUSUM', direction))
+                chart[name] = 0.0  # Restart after a signal
+        point['rules'] = [rule for rule, _ in violations]
+    chart['last'] = value
+    chart['points'] = (chart['points'] + [point])[-CHART_POINTS:]
+    return violations
+
+def _chart_key(instrument, result, metric):
+    return (str(instrument), str(result.get('chip_id')), str(result['nozzle_id']), metric)
+
+class ControlChartStore:
+    """Control chart state per (instrument, chip, nozzle, metric) in a local SQLite database
+
+    Like the result store, every run is applied in one BEGIN IMMEDIATE
+    transaction, so batch and watch workers can share the file. A run
+    (instrument, source file, run date) is applied once; analyzing it again
+    returns the violations it raised the first time. Exports without an assay
+    start time are identified by their content hash instead of a date.
+    """
+    def __init__(self, db_path, baseline_runs=DEFAULT_BASELINE_RUNS, timeout=30.0):
+        self.db_path = str(db_path)
+        self.baseline_runs = baseline_runs
+        self.timeout = timeout
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        return contextlib.closing(conn)
+
+    def update(self, source_file, qc_results, instrument, run_date=None):
+        """Add a run's %CV and %Accuracy to every nozzle's charts; returns the rule violations as dicts
+
+        Each violation has chip_id, nozzle_id, metric, rule, direction
+        ('high' / 'low'), value and center.
+        """
+        analyzed_at = datetime.now().isoformat(timespec='seconds')
+        source_file = str(Path(source_file).resolve())
+        # Undated exports: the analysis time changes on every re-run, the file's bytes do not
+        run_key = run_date or f"sha256:{file_sha256(source_file)}"
+        instrument = str(instrument)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seen = conn.execute("SELECT analyzed_at FROM spc_runs WHERE instrument = ? AND source_file = ? "
+                                    "AND run_date = ?", (instrument, source_file, run_key)).fetchone()
+                if seen:
+                    # Undated runs' points and violations carry the time of their first analysis
+                    rows = conn.execute(f"SELECT {', '.join(VIOLATION_COLUMNS)} FROM spc_violations "
+                                        "WHERE instrument = ? AND source_file = ? AND run_date = ? ORDER BY rowid",
+                                        (instrument, source_file, run_date or seen[0])).fetchall()
+                    conn.execute("COMMIT")
+                    return [dict(zip(VIOLATION_COLUMNS, row)) for row in rows]
+
+                run_date = run_date or analyzed_at
+                charts = {tuple(row[:4]): json.loads(row[4]) for row in conn.execute(
+                    "SELECT instrument, chip_id, nozzle_id, metric, state FROM spc_charts WHERE instrument = ?",
+                    (instrument,))}
+                violations, updated = [], []
+                for result in qc_results:
+                    for metric in SPC_METRICS:
+                        value = result.get(metric)
+                        if value is None or not math.isfinite(value):
+                            continue
+                        key = _chart_key(instrument, result, metric)
+                        chart = charts.get(key) or new_chart(self.baseline_runs)
+                        for rule, direction in update_chart(chart, value, run_date):
+                            violations.append({'chip_id': key[1], 'nozzle_id': key[2], 'metric': metric, 'rule': rule,
+                                               'direction': direction, 'value': float(value),
+                                               'center': chart['center']})
+                        updated.append((*key, analyzed_at, json.dumps(chart)))
+                conn.executemany("INSERT OR REPLACE INTO spc_charts (instrument, chip_id, nozzle_id, metric, "
+                                 "updated_at, state) VALUES (?,?,?,?,?,?)", updated)
+                conn.execute("INSERT INTO spc_runs (instrument, source_file, run_date, analyzed_at) VALUES (?,?,?,?)",
+                             (instrument, source_file, run_key, analyzed_at))
+                conn.executemany(f"INSERT INTO spc_violations (instrument, source_file, run_date, "
+                                 f"{', '.join(VIOLATION_COLUMNS)}) VALUES (?,?,?,{','.join('?' * len(VIOLATION_COLUMNS))})",
+                                 [(instrument, source_file, run_date, *(v[c] for c in VIOLATION_COLUMNS))
+                                  for v in violations])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return violations
+
+    def chart(self, instrument, chip_id, nozzle_id, metric='cv_percent'):
+        """One chart's stored state, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT state FROM spc_charts WHERE instrument = ? AND chip_id = ? AND nozzle_id = ? "
+                               "AND metric = ?", (str(instrument), str(chip_id), str(nozzle_id), metric)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def status(self, instrument=None):
+        """One row per chart: phase, center line, sigma, EWMA, CUSUM sums and the last point's rules"""
+        sql = "SELECT instrument, chip_id, nozzle_id, metric, updated_at, state FROM spc_charts"
+        args = ()
+        if instrument is not None:
+            sql += " WHERE instrument = ?"
+            args = (str(instrument),)
+        with self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY instrument, chip_id, nozzle_id, metric", args).fetchall()
+        records = []
+        for instrument_name, chip_id, nozzle_id, metric, updated_at, state in rows:
+            chart = json.loads(state)
+            records.append({'instrument': instrument_name, 'chip_id': chip_id, 'nozzle_id': nozzle_id,
+                            'metric': metric, 'n': chart['n'],
+                            'phase': 'monitoring' if chart['center'] is not None else 'baseline',
+                            'center': chart['center'], 'sigma': chart['sigma'], 'ewma': chart['ewma'],
+                            'cusum_high': chart['cusum_high'], 'cusum_low': chart['cusum_low'],
+                            'last_value': chart['last'], 'last_rules': ','.join(chart['points'][-1]['rules']),
+                            'updated_at': updated_at})
+        return pd.DataFrame(records)
+
+    def violations(self, instrument=None, start=None, end=None):
+        """Recorded rule violations as a DataFrame, oldest first"""
+        conditions, args = [], []
+        if instrument is not None:
+            conditions.append("instrument = ?")
+            args.append(str(instrument))
+        if start:
+            conditions.append("run_date >= ?")
+            args.append(str(start))
+        if end:
+            end = str(end)
+            conditions.append("run_date <= ?")
+            args.append(end + 'T23:59:59' if len(end) == 10 else end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connect() as conn:
+            return pd.read_sql_query(f"SELECT * FROM spc_violations {where} ORDER BY run_date, rowid", conn,
+                                     params=args)
+
+def describe_violation(violation):
+    """One-line description, e.g. 'Chip_1_Nozzle_3 %CV 6.10% (center 3.20%): WE1 (one point beyond 3 sigma), high'"""
+    center = violation['center']
+    return (f"{violation['nozzle_id']} {SPC_METRICS.get(violation['metric'], violation['metric'])} "
+            f"{violation['value']:.2f}% (center {center:.2f}%): {violation['rule']} ({RULES[violation['rule']]}), "
+            f"{violation['direction']}")
+
+def render_control_chart(chart, path, title=None, dpi=100):
+    """Individuals, EWMA and CUSUM panels of one stored chart state"""
+    from matplotlib.figure import Figure
+
+    points = chart['points']
+    x = list(range(chart['n'] - len(points) + 1, chart['n'] + 1))
+    values = [p['value'] for p in points]
+    fig = Figure(figsize=(12, 9))
+    ax_values, ax_ewma, ax_cusum = fig.subplots(3, 1, sharex=True)
+
+    ax_values.plot(x, values, 'o-', color='steelblue', markersize=4)
+    center, sigma = chart['center'], chart['sigma']
+    if center is not None:
+        ax_values.axhline(center, color='green', linewidth=1)
+        for width, style in ((1, ':'), (2, '--'), (3, '-')):
+            for side in (1, -1):
+                ax_values.axhline(center + side * width * sigma, color='red', linestyle=style, linewidth=0.8,
+                                  alpha=0.4 + 0.2 * width)
+    flagged = [(xi, p['value']) for xi, p in zip(x, points) if p['rules']]
+    if flagged:
+        ax_values.scatter(*zip(*flagged), color='red', s=60, zorder=3, label='Rule violation')
+        ax_values.legend(loc='upper left')
+    ax_values.set_ylabel('Value')
+    ax_values.set_title(title or 'Control Chart')
+
+    monitored = [(xi, p) for xi, p in zip(x, points) if p['ewma'] is not None]
+    if monitored:
+        xs = [xi for xi, _ in monitored]
+        ax_ewma.plot(xs, [p['ewma'] for _, p in monitored], 'o-', color='purple', markersize=3)
+        ax_ewma.plot(xs, [center + p['ewma_limit'] for _, p in monitored], 'r--', linewidth=0.8)
+        ax_ewma.plot(xs, [center - p['ewma_limit'] for _, p in monitored], 'r--', linewidth=0.8)
+        ax_ewma.axhline(center, color='green', linewidth=1)
+        ax_cusum.plot(xs, [p['cusum_high'] for _, p in monitored], 'o-', color='darkorange', markersize=3,
+                      label='C+ (high)')
+        ax_cusum.plot(xs, [p['cusum_low'] for _, p in monitored], 'o-', color='teal', markersize=3, label='C- (low)')
+        ax_cusum.axhline(CUSUM_H, color='red', linestyle='--', linewidth=0.8)
+        ax_cusum.legend(loc='upper left')
+    else:
+        ax_ewma.text(0.5, 0.5, f"Baseline: {chart['n']} of {chart['baseline_runs']} runs", ha='center',
+                     va='center', transform=ax_ewma.transAxes)
+    ax_ewma.set_ylabel(f'EWMA (λ={EWMA_LAMBDA})')
+    ax_cusum.set_ylabel('CUSUM (sigma)')
+    ax_cusum.set_xlabel('Run')
+    ax_cusum.xaxis.get_major_locator().set_params(integer=True)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return str(path)
+
+def main():
+    """Show control chart status and violations, or render a chart, from the command line"""
+    parser = argparse.ArgumentParser(description='Statistical process control charts of the QC runs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    status_parser = subparsers.add_parser('status', help='Phase, limits, EWMA and CUSUM of every chart')
+    status_parser.add_argument('spc', help='Control chart database (.sqlite)')
+    status_parser.add_argument('--instrument', help='Instrument name')
+    violations_parser = subparsers.add_parser('violations', help='Recorded rule violations')
+    violations_parser.add_argument('spc', help='Control chart database (.sqlite)')
+    violations_parser.add_argument('--instrument', help='Instrument name')
+    violations_parser.add_argument('--start', help='First run date (YYYY-MM-DD)')
+    violations_parser.add_argument('--end', help='Last run date (YYYY-MM-DD)')
+    chart_parser = subparsers.add_parser('chart', help='Render one control chart from its stored state')
+    chart_parser.add_argument('spc', help='Control chart database (.sqlite)')
+    chart_parser.add_argument('--instrument', required=True, help='Instrument name')
+    chart_parser.add_argument('--chip', required=True, help='Chip ID')
+    chart_parser.add_argument('--nozzle', required=True, help='Nozzle ID (e.g. Chip_1_Nozzle_3)')
+    chart_parser.add_argument('--metric', choices=list(SPC_METRICS), default='cv_percent',
+                              help='Charted metric (default: cv_percent)')
+    chart_parser.add_argument('--output', '-o', required=True, help='Image file (.png, .svg, .pdf)')
+    for subparser in (status_parser, violations_parser):
+        subparser.add_argument('--output', '-o', help='Write the table to a CSV file instead of stdout')
+    args = parser.parse_args()
+
+    if not Path(args.spc).exists():
+        print(f"Error: Control chart database not found: {args.spc}")
+        sys.exit(1)
+    charts = ControlChartStore(args.spc)
+    if args.command == 'chart':
+        chart = charts.chart(args.instrument, args.chip, args.nozzle, args.metric)
+        if chart is None:
+            print(f"Error: No {args.metric} chart for {args.instrument} / {args.chip} / {args.nozzle}")
+            sys.exit(1)
+        title = f"{args.instrument} - {args.nozzle} {SPC_METRICS[args.metric]}"
+        print(f"Control chart saved: {render_control_chart(chart, args.output, title)}")
+        return
+    table = charts.status(args.instrument) if args.command == 'status' else \
+        charts.violations(args.instrument, args.start, args.end)
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"{len(table)} rows saved: {args.output}")
+    else:
+        print(table.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Longitudinal result store for the Dispenser QC Analyzer
+
+Every analyzed plate is appended to a local SQLite database (one run row, its
+standard curve parameters and one row per nozzle/quadrant/well), so a nozzle
+can be trended across months with a single indexed query instead of
+re-parsing old *_processed.csv files. Re-analyzing a plate replaces its run.
+"""
+
+import argparse
+import contextlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_file TEXT NOT NULL,
+    analyzed_at TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    instrument TEXT,
+    liquid_handler TEXT,
+    assay_id TEXT,
+    serial_number TEXT,
+    protocol_id TEXT,
+    protocol_name TEXT,
+    assay_started TEXT,
+    assay_finished TEXT,
+    assay_exported TEXT,
+    target_concentration REAL,
+    standard_concentrations TEXT
+);
+CREATE TABLE IF NOT EXISTS standard_curve_params (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(run_id),
+    slope REAL,
+    intercept REAL,
+    r_squared REAL,
+    std_err REAL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS qc_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    instrument TEXT,
+    run_date TEXT NOT NULL,
+    chip_id TEXT,
+    nozzle_id TEXT,
+    handler_type TEXT,
+    column_range TEXT,
+    mean_concentration REAL,
+    std_concentration REAL,
+    cv_percent REAL,
+    accuracy_percent REAL,
+    n_measurements INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_qc_nozzle ON qc_results (instrument, chip_id, nozzle_id, run_date);
+CREATE INDEX IF NOT EXISTS idx_qc_date ON qc_results (run_date);
+CREATE INDEX IF NOT EXISTS idx_runs_date ON runs (instrument, run_date);
+CREATE INDEX IF NOT EXISTS idx_runs_source ON runs (source_file, assay_started, assay_id);
+"""
+
+QC_COLUMNS = ('chip_id', 'nozzle_id', 'handler_type', 'column_range', 'mean_concentration',
+              'std_concentration', 'cv_percent', 'accuracy_percent', 'n_measurements')
+
+def _sql_value(value):
+    """Convert NumPy scalars to plain Python types for sqlite3"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+class ResultStore:
+    """SQLite store of QC runs, one per plate
+
+    A run is identified by its source file, assay start time and assay id;
+    analyzing the same plate again (other settings, --force) replaces it so
+    nozzle history never counts a plate twice. The database runs in WAL mode
+    and every run is written in one BEGIN IMMEDIATE transaction, so batch and
+    watch workers can append to the same file concurrently; readers never see
+    a half-written run.
+    """
+    def __init__(self, db_path, timeout=30.0):
+        self.db_path = str(db_path)
+        self.timeout = timeout
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _connect(self):
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        return contextlib.closing(conn)
+
+    def append_run(self, source_file, qc_results, standard_curve_params, metadata=None,
+                   instrument=None, liquid_handler=None, target_concentration=None,
+                   standard_concentrations=None):
+        """Append one analyzed plate, replacing an earlier run of the same plate, and return its run_id
+
+        `metadata` is PlateExport.assay_metadata(); the run is dated by its
+        assay start time, falling back to the time of analysis.
+        """
+        metadata = metadata or {}
+        analyzed_at = datetime.now().isoformat(timespec='seconds')
+        run_date = metadata.get('assay_started') or analyzed_at
+        instrument = instrument or liquid_handler
+        params = {k: _sql_value(v) for k, v in standard_curve_params.items()}
+        source_file = str(Path(source_file).resolve())
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = [row[0] for row in conn.execute(
+                    "SELECT run_id FROM runs WHERE source_file = ? AND assay_started IS ? AND assay_id IS ?",
+                    (source_file, metadata.get('assay_started'), metadata.get('assay_id')))]
+                for table in ('qc_results', 'standard_curve_params', 'runs'):
+                    conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in previous])
+                cursor = conn.execute(
+                    "INSERT INTO runs (source_file, analyzed_at, run_date, instrument, liquid_handler, assay_id, "
+                    "serial_number, protocol_id, protocol_name, assay_started, assay_finished, assay_exported, "
+                    "target_concentration, standard_concentrations) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (source_file, analyzed_at, run_date, instrument, liquid_handler,
+                     metadata.get('assay_id'), metadata.get('serial_number'), metadata.get('protocol_id'),
+                     metadata.get('protocol_name'), metadata.get('assay_started'), metadata.get('assay_finished'),
+                     metadata.get('assay_exported'), _sql_value(target_concentration),
+                     json.dumps([float(c) for c in standard_concentrations or []])))
+                run_id = cursor.lastrowid
+                conn.execute(
+                    "INSERT INTO standard_curve_params (run_id, slope, intercept, r_squared, std_err, params) "
+                    "VALUES (?,?,?,?,?,?)",
+                    (run_id, params.get('slope'), params.get('intercept'), params.get('r_squared'),
+                     params.get('std_err'), json.dumps(params, default=str)))
+                conn.executemany(
+                    f"INSERT INTO qc_results (run_id, instrument, run_date, {', '.join(QC_COLUMNS)}) "
+                    f"VALUES (?,?,?,{','.join('?' * len(QC_COLUMNS))})",
+                    [(run_id, instrument, run_date, *(_sql_value(result.get(column)) for column in QC_COLUMNS))
+                     for result in qc_results])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return run_id
+
+    def query(self, instrument=None, chip_id=None, nozzle_id=None, start=None, end=None):
+        """Nozzle history as a DataFrame, oldest first
+
+        `start`/`end` are ISO dates or datetimes (inclusive); a bare date as
+        `end` covers that whole day.
+        """
+        conditions, args = [], []
+        for column, value in (('q.instrument', instrument), ('q.chip_id', chip_id), ('q.nozzle_id', nozzle_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                args.append(str(value))
+        if start:
+            conditions.append("q.run_date >= ?")
+            args.append(str(start))
+        if end:
+            end = str(end)
+            conditions.append("q.run_date <= ?")
+            args.append(end + 'T23:59:59' if len(end) == 10 else end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sql = (f"SELECT q.run_id, q.run_date, q.instrument, {', '.join('q.' + c for c in QC_COLUMNS)}, "
+               "r.assay_id, r.serial_number, r.source_file, s.slope, s.intercept, s.r_squared "
+               "FROM qc_results q JOIN runs r ON r.run_id = q.run_id "
+               f"LEFT JOIN standard_curve_params s ON s.run_id = q.run_id {where} "
+               "ORDER BY q.run_date, q.run_id")
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=args)
+
+    def runs(self):
+        """All stored runs with their standard curve parameters"""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT r.*, s.slope, s.intercept, s.r_squared, s.std_err, s.params "
+                "FROM runs r LEFT JOIN standard_curve_params s ON s.run_id = r.run_id ORDER BY r.run_date, r.run_id",
+                conn)
+
+def main():
+    """Query nozzle history from the command line"""
+    parser = argparse.ArgumentParser(description='Query the QC result store')
+    parser.add_argument('store', help='Result store database (.sqlite)')
+    parser.add_argument('--instrument', help='Instrument name')
+    parser.add_argument('--chip', help='Chip ID')
+    parser.add_argument('--nozzle', help='Nozzle ID (e.g. Chip_1_Nozzle_3)')
+    parser.add_argument('--start', help='First date (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--output', '-o', help='Write the history to a CSV file instead of stdout')
+    args = parser.parse_args()
+
+    if not Path(args.store).exists():
+        print(f"Error: Result store not found: {args.store}")
+        sys.exit(1)
+    history = ResultStore(args.store).query(args.instrument, args.chip, args.nozzle, args.start, args.end)
+    if args.output:
+        history.to_csv(args.output, index=False)
+        print(f"{len(history)} rows saved: {args.output}")
+    else:
+        print(history.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
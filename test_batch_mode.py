@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for batch/directory mode
+"""
+
+import sys
+import os
+import json
+import shutil
+import subprocess
+import textwrap
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import collect_batch_files, run_batch, write_batch_summary
+import pandas as pd
+import pytest
+
+SETTINGS = {
+    'standard_concentrations': [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875],
+    'target_concentration': 75.0,
+    'generate_plots': False,
+}
+
+@pytest.fixture
+def batch_dir(tmp_path, example_file):
+    """Two good plates, one truncated export and a stale processed file"""
+    for name in ["plate_1.csv", "plate_2.csv"]:
+        shutil.copy(example_file, tmp_path / name)
+    with open(example_file, 'r', encoding='utf-8') as f:
+        head = ''.join(f.readlines()[:20])
+    (tmp_path / "corrupt.csv").write_text(head, encoding='utf-8')
+    (tmp_path / "plate_0_processed.csv").write_text("Row_A,1,2\n", encoding='utf-8')
+    return tmp_path
+
+def test_collect_batch_files(batch_dir):
+    files = collect_batch_files(str(batch_dir))
+    assert [os.path.basename(f) for f in files] == ["corrupt.csv", "plate_1.csv", "plate_2.csv"]
+    assert collect_batch_files(str(batch_dir / "plate_*.csv")) == files[1:]
+
+def test_corrupt_file_does_not_stop_batch(batch_dir):
+    files = collect_batch_files(str(batch_dir))
+    results = run_batch(files, SETTINGS, workers=2)
+
+    assert [r['file'] for r in results] == files
+    assert [r['success'] for r in results] == [False, True, True]
+    assert "fluorescence data section" in results[0]['error']
+    assert results[1]['n_nozzles'] == 8
+    assert abs(results[1]['mean_cv'] - 3.60) < 0.01
+    assert os.path.exists(results[2]['output_file'])
+
+    summary_file = write_batch_summary(results, batch_dir / "batch_summary.csv")
+    summary = pd.read_csv(summary_file)
+    assert list(summary['Status']) == ["FAILED", "OK", "OK"]
+
+def test_spawned_workers(tmp_path, batch_dir):
+    """Workers started with spawn (Windows, macOS, the packaged exe) analyze plates without re-running main()"""
+    script = tmp_path / "spawn_batch.py"
+    script.write_text(textwrap.dedent(f"""
+        import json, multiprocessing, os, sys
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+        import qc_check
+        qc_check.main = lambda: sys.exit("main() re-run in a worker")
+
+        if __name__ == "__main__":
+            multiprocessing.freeze_support()
+            multiprocessing.set_start_method('spawn', force=True)
+            results = qc_check.run_batch(qc_check.collect_batch_files({str(batch_dir)!r}), {SETTINGS!r}, workers=2)
+            print(json.dumps([r['success'] for r in results]))
+    """), encoding='utf-8')
+    completed = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == [False, True, True]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite and its synthetic plate generator
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_qc import (ExportTemplate, STAGES, TEMPLATE_FILE, compare_reports, run_benchmarks,
+                          write_synthetic_exports)
+from qc_check import LIQUID_HANDLERS, parse_plate_export
+import numpy as np
+
+def test_synthetic_exports_keep_template_format(tmp_path):
+    """Only the plate blocks and assay metadata differ from the example export"""
+    template = ExportTemplate()
+    with open(TEMPLATE_FILE, 'rb') as f:
+        expected = f.read().decode('utf-8').splitlines(keepends=True)
+    changed_rows = set(range(template.calculated_start, template.calculated_start + 16)) | \
+                   set(range(template.fluorescence_start, template.fluorescence_start + 16))
+
+    for handler_type in LIQUID_HANDLERS:
+        files, std_curve_file = write_synthetic_exports(tmp_path / handler_type, handler_type, 2)
+        assert len(files) == 2
+        assert (std_curve_file is not None) == (handler_type == "Bravo - 384")
+        with open(files[1], 'rb') as f:
+            lines = f.read().decode('utf-8').splitlines(keepends=True)
+        assert len(lines) == len(expected)
+        for i, (line, original) in enumerate(zip(lines, expected)):
+            if i in changed_rows:
+                assert line.split(',', 1)[0] == original.split(',', 1)[0]
+                assert line.count(',') == original.count(',') and line.endswith('\r\n')
+            elif not line.startswith(("Assay ID", "Assay Started", "Assay Finished", "Assay Exported")):
+                assert line == original, (i, line, original)
+
+        export = parse_plate_export(files[1])
+        assert export.fluorescence.shape == (16, 24)
+        assert not np.isnan(export.fluorescence).any()
+        assert export.assay_metadata()['assay_id'] == '10001'
+        assert export.assay_metadata()['assay_started'] == '2025-07-16T16:20:58'
+
+def test_benchmark_report(tmp_path):
+    report = run_benchmarks(["Tempest", "Bravo - 384"], plate_counts=(1, 3), plot_plates=0, work_dir=tmp_path)
+    assert len(report['results']) == 4
+    for result in report['results']:
+        assert set(result['stages']) == set(STAGES)
+        for stage in STAGES:
+            if stage == 'plots':
+                assert result['stages'][stage]['plates'] == 0
+            else:
+                assert result['stages'][stage]['total_s'] > 0
+                assert result['stages'][stage]['peak_heap_mb'] > 0
+        assert result['stack']['per_plate_ms'] > 0
+
+    slower = {'results': [dict(r, stages={s: dict(v, per_plate_ms=v['per_plate_ms'] and v['per_plate_ms'] * 2)
+                                          for s, v in r['stages'].items()}) for r in report['results']]}
+    assert compare_reports(report, report) == []
+    assert len(compare_reports(slower, report, min_delta_ms=0)) == 4 * (len(STAGES) - 1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized concentration engine
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, apply_standard_curve, calculate_concentrations_batch
+import pandas as pd
+import numpy as np
+
+PARAMS = {'slope': 0.00023472, 'intercept': -2.55327080}
+
+def reference_concentrations(plate):
+    """Per-well reference implementation (the original iloc loop)"""
+    result = plate.copy()
+    for row_idx in range(plate.shape[0]):
+        for col_idx in range(plate.shape[1]):
+            fluorescence = plate[row_idx, col_idx]
+            if pd.notna(fluorescence) and fluorescence > 0:
+                result[row_idx, col_idx] = fluorescence * PARAMS['slope'] + PARAMS['intercept']
+    return result
+
+def make_plate(seed):
+    np.random.seed(seed)
+    plate = np.random.rand(16, 24) * 300000
+    plate[1, 0:3] = np.nan  # Empty wells
+    plate[3, 5] = 0
+    plate[5, 7] = -12.0
+    return plate
+
+def test_single_plate_matches_reference():
+    """Masked conversion must match the per-well loop exactly"""
+    plate = make_plate(1)
+    np.testing.assert_array_equal(apply_standard_curve(plate, PARAMS), reference_concentrations(plate))
+
+def test_non_positive_and_nan_pass_through():
+    plate = make_plate(2)
+    result = apply_standard_curve(plate, PARAMS)
+    assert np.isnan(result[1, 0:3]).all()
+    assert result[3, 5] == 0
+    assert result[5, 7] == -12.0
+
+def test_batch_matches_single_plates():
+    stack = np.stack([make_plate(seed) for seed in range(5)])
+    result = calculate_concentrations_batch(stack, PARAMS)
+    assert result.shape == (5, 16, 24)
+    for i in range(5):
+        np.testing.assert_array_equal(result[i], reference_concentrations(stack[i]))
+
+def test_batch_rejects_wrong_shape():
+    try:
+        calculate_concentrations_batch(np.zeros((16, 24)), PARAMS)
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for a 2D input")
+
+def test_analyzer_keeps_dataframe_layout():
+    """calculate_concentrations keeps the fluorescence DataFrame index/columns"""
+    analyzer = DispenserQCAnalyzerFixedBug()
+    plate = make_plate(3)
+    analyzer.fluorescence_data = pd.DataFrame(plate, index=range(37, 53), columns=range(1, 25))
+    analyzer.standard_curve_params = PARAMS
+    assert analyzer.calculate_concentrations()
+    assert list(analyzer.calculated_concentrations.index) == list(range(37, 53))
+    assert list(analyzer.calculated_concentrations.columns) == list(range(1, 25))
+    np.testing.assert_array_equal(analyzer.calculated_concentrations.values, reference_concentrations(plate))
+
+def test_analyzer_accepts_integer_rfu():
+    """Integer RFU columns (as parsed from the export) are converted without dtype errors"""
+    analyzer = DispenserQCAnalyzerFixedBug()
+    plate = np.arange(1, 16 * 24 + 1, dtype=np.int64).reshape(16, 24) * 1000
+    analyzer.fluorescence_data = pd.DataFrame(plate)
+    analyzer.standard_curve_params = PARAMS
+    assert analyzer.calculate_concentrations()
+    np.testing.assert_allclose(analyzer.calculated_concentrations.values,
+                               plate * PARAMS['slope'] + PARAMS['intercept'])
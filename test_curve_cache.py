@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent standard-curve cache (Bravo 384)
+"""
+
+import sys
+import os
+import io
+import time
+import shutil
+import contextlib
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug
+from qc_cache import StandardCurveCache
+import pandas as pd
+import pytest
+
+CONCENTRATIONS = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+
+@pytest.fixture
+def run_bravo_384(make_analyzer, plate_file):
+    def run(cache, std_curve_file=None, curve_name=None, concentrations=CONCENTRATIONS):
+        analyzer = make_analyzer("Bravo - 384", target=75.0, standard_concentrations=list(concentrations),
+                                 curve_cache=cache, curve_name=curve_name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = analyzer.process_qc_analysis(str(plate_file), std_curve_file, generate_plots=False)
+        return success, analyzer
+    return run
+
+def test_second_plate_skips_reading_and_fitting(tmp_path, example_file, run_bravo_384):
+    cache = StandardCurveCache(tmp_path / "cache")
+    curve_file = str(tmp_path / "curve.csv")
+    shutil.copy(example_file, curve_file)
+
+    success, first = run_bravo_384(cache, curve_file)
+    assert success and first.cached_curve_params is None
+
+    # A cache hit must not touch the file parser or the regression
+    original = DispenserQCAnalyzerFixedBug.load_standard_curve_from_file
+    DispenserQCAnalyzerFixedBug.load_standard_curve_from_file = lambda self, f: (_ for _ in ()).throw(AssertionError("re-read"))
+    try:
+        success, second = run_bravo_384(cache, curve_file)
+    finally:
+        DispenserQCAnalyzerFixedBug.load_standard_curve_from_file = original
+    assert success
+    assert second.cached_curve_params is not None
+    assert second.standard_curve_params['slope'] == first.standard_curve_params['slope']
+    assert second.qc_results == first.qc_results
+
+def test_key_depends_on_content_and_concentrations(plate_file):
+    key = StandardCurveCache.make_key(plate_file, CONCENTRATIONS)
+    assert key == StandardCurveCache.make_key(plate_file, [float(c) for c in CONCENTRATIONS])
+    assert key != StandardCurveCache.make_key(plate_file, CONCENTRATIONS[::-1])
+    with open(plate_file, 'a', encoding='utf-8') as f:
+        f.write("\n")
+    assert key != StandardCurveCache.make_key(plate_file, CONCENTRATIONS)
+
+def test_named_curve_reused_without_file(tmp_path, example_file, plate_file, make_analyzer, run_bravo_384):
+    cache = StandardCurveCache(tmp_path / "cache")
+    success, _ = run_bravo_384(cache, example_file, curve_name="line_3_curve")
+    assert success
+    success, analyzer = run_bravo_384(cache, None, curve_name="line_3_curve")
+    assert success and analyzer.cached_curve_params is not None
+
+    # Unknown names and mismatched concentrations are rejected
+    assert not run_bravo_384(cache, None, curve_name="missing")[0]
+    assert not run_bravo_384(cache, None, curve_name="line_3_curve", concentrations=CONCENTRATIONS[::-1])[0]
+
+    # Handlers with standards on the plate never swap them for a named curve
+    analyzer = make_analyzer(curve_cache=cache, curve_name="line_3_curve")
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert not analyzer.load_and_clean_data(str(plate_file))
+
+def test_eviction_by_size_and_age(tmp_path):
+    cache = StandardCurveCache(tmp_path / "cache", max_entries=3, max_age_days=30)
+    curve = pd.DataFrame({'concentration': [1.0, 2.0], 'fluorescence': [10.0, 20.0]})
+    params = {'slope': 0.1, 'intercept': 0.0, 'r_squared': 1.0, 'std_err': 0.0}
+    for i in range(5):
+        cache.put(f"key{i}", curve, params, [1, 2])
+        old_time = time.time() - (5 - i)  # Spread last-use times
+        os.utime(cache.cache_dir / f"key{i}.json", (old_time, old_time))
+    cache.evict()
+    assert sorted(p.stem for p in cache.cache_dir.glob('*.json')) == ["key2", "key3", "key4"]
+
+    expired = time.time() - 31 * 86400
+    os.utime(cache.cache_dir / "key4.json", (expired, expired))
+    assert cache.get("key4") is None
+    cache.evict()
+    assert not (cache.cache_dir / "key4.json").exists()
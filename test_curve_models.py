@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the standard-curve models (weighted, log-log, quadratic, 4PL, auto selection)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import apply_standard_curve
+from qc_curve import (AUTO_MODEL, CURVE_MODELS, curve_equation, evaluate_curve, fit_curves, fit_standard_curve,
+                      fit_standard_curves)
+import numpy as np
+
+CONCENTRATIONS = np.array([600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875])
+
+def saturating_rfu(a=2000.0, b=1.1, c=800.0, d=3.5e6):
+    """Fluorescence that flattens out towards the top standard (4PL)"""
+    return d + (a - d) / (1 + (CONCENTRATIONS / c) ** b)
+
+def linregress(x, y):
+    """Closed-form ordinary least squares, as scipy.stats.linregress: slope, intercept, r, slope standard error"""
+    x_dev, y_dev = x - x.mean(), y - y.mean()
+    ssxm, ssym, ssxym = np.mean(x_dev ** 2), np.mean(y_dev ** 2), np.mean(x_dev * y_dev)
+    slope = ssxym / ssxm
+    r_value = ssxym / np.sqrt(ssxm * ssym)
+    return slope, y.mean() - slope * x.mean(), r_value, np.sqrt((1 - r_value ** 2) * ssym / ssxm / (len(x) - 2))
+
+def test_linear_matches_linregress():
+    rng = np.random.default_rng(1)
+    rfu = rng.uniform(1e4, 3e6, 8)
+    slope, intercept, r_value, std_err = linregress(rfu, CONCENTRATIONS)
+    params = fit_standard_curve(rfu, CONCENTRATIONS)
+    assert params['model'] == 'linear' and params['weighting'] == 'none'
+    assert np.isclose(params['slope'], slope, rtol=1e-12) and np.isclose(params['intercept'], intercept, rtol=1e-12)
+    assert np.isclose(params['r_squared'], r_value ** 2) and np.isclose(params['std_err'], std_err)
+    assert curve_equation(params) == f"y = {slope:.8f}x + {intercept:.8f}"
+
+def test_models_recover_their_curves():
+    """Each model reproduces noise-free data generated from its own equation"""
+    rfu = np.linspace(1e4, 2.6e6, 8)
+    exact = {
+        'linear': 2.3e-4 * rfu - 1.5,
+        'linear_1/x': 2.3e-4 * rfu - 1.5,
+        'linear_1/x2': 2.3e-4 * rfu - 1.5,
+        'loglog': np.exp(-8.0 + 1.05 * np.log(rfu)),
+        'quadratic': 0.2 + 2.2e-4 * rfu + 4e-12 * rfu ** 2,
+    }
+    for model, concentrations in exact.items():
+        params = fit_standard_curve(rfu, concentrations, model)
+        np.testing.assert_allclose(evaluate_curve(params, rfu), concentrations, rtol=1e-8)
+        assert params['rel_rmse'] < 1e-8, model
+
+    params = fit_standard_curve(saturating_rfu(), CONCENTRATIONS, '4pl')
+    np.testing.assert_allclose(params['coefficients'], [2000.0, 1.1, 800.0, 3.5e6], rtol=1e-6)
+    np.testing.assert_allclose(evaluate_curve(params, saturating_rfu()), CONCENTRATIONS, rtol=1e-6)
+    assert np.isnan(evaluate_curve(params, [4e6]))[0]  # Above the top plateau: not quantifiable
+
+def test_weighting_favours_low_standards():
+    """1/x² weighting keeps the low end of a saturating dilution series accurate"""
+    rfu = saturating_rfu()
+    errors = {}
+    for model in ('linear', 'linear_1/x', 'linear_1/x2'):
+        fitted = evaluate_curve(fit_standard_curve(rfu, CONCENTRATIONS, model), rfu)
+        errors[model] = abs(fitted[-1] - CONCENTRATIONS[-1]) / CONCENTRATIONS[-1]
+    assert errors['linear_1/x2'] < errors['linear_1/x'] < errors['linear']
+
+def test_auto_selection():
+    rng = np.random.default_rng(2)
+    params = fit_standard_curve(saturating_rfu() * (1 + rng.normal(0, 0.002, 8)), CONCENTRATIONS, AUTO_MODEL)
+    assert params['model'] == '4pl'
+    assert set(params['selection']) == set(CURVE_MODELS)
+    assert params['rel_rmse'] == min(params['selection'].values())
+
+    linear_rfu = 4000 * CONCENTRATIONS + 500
+    assert fit_standard_curve(linear_rfu, CONCENTRATIONS, AUTO_MODEL)['model'] == 'linear'  # Ties go to the simplest
+
+def test_stack_matches_single_fits():
+    """One call fits every plate's curve; results match curve-by-curve fits"""
+    rng = np.random.default_rng(3)
+    stack = saturating_rfu() * (1 + rng.normal(0, 0.01, (200, 8)))
+    stack[5, 2] = np.nan  # A missing standard is ignored
+    for model in CURVE_MODELS:
+        fits = fit_curves(stack, CONCENTRATIONS, model)
+        assert fits['coefficients'].shape == (200, len(fit_standard_curve(stack[0], CONCENTRATIONS, model)['coefficients']))
+        for i in (0, 5, 199):
+            single = fit_standard_curve(stack[i], CONCENTRATIONS, model)
+            np.testing.assert_allclose(fits['coefficients'][i], single['coefficients'], rtol=1e-6)
+    chosen = fit_standard_curves(stack, CONCENTRATIONS, AUTO_MODEL)
+    assert len(chosen) == 200 and all(p['model'] in CURVE_MODELS for p in chosen)
+
+def test_apply_standard_curve_with_models():
+    plate = np.full((16, 24), 1.5e6)
+    plate[0, 0] = np.nan
+    plate[1, 1] = -5.0
+    params = fit_standard_curve(saturating_rfu(), CONCENTRATIONS, '4pl')
+    result = apply_standard_curve(plate, params)
+    assert np.isnan(result[0, 0]) and result[1, 1] == -5.0
+    assert np.isclose(result[2, 2], evaluate_curve(params, [1.5e6])[0])
+
+def test_analyzer_curve_model(tmp_path, make_analyzer, plate_file):
+    analyzer = make_analyzer(curve_model=AUTO_MODEL)
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=True, plot_format='preview', plot_workers=1)
+    params = analyzer.standard_curve_params
+    assert params['model'] in CURVE_MODELS and params['rel_rmse'] < params['selection']['linear']
+    assert (tmp_path / "plate-plots" / "standard_curve.png").exists()
+    with open(tmp_path / "plate_processed.csv", encoding='utf-8') as f:
+        processed = f.read()
+    assert f"Standard Curve Model,{params['model']}" in processed
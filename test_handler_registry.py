@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the liquid handler registry (declared layouts, compiled group maps, new dispensers)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, compile_group_index, default_chip_configurations
+from qc_handlers import HANDLERS, HandlerLayout, get_handler, load_registry
+from qc_geometry import PLATE_96, PLATE_384, PLATE_1536
+from benchmark_qc import STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, write_synthetic_exports
+import json
+import subprocess
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANTIS = {"pattern": "rows", "nozzles": 16, "component": "Nozzle", "abbreviation": "N",
+          "configurable_chips": True, "description": "16 nozzles, 1 row per nozzle"}
+
+def test_builtin_layouts_unchanged():
+    assert list(HANDLERS) == ["D2", "Bravo - 96", "Bravo - 384", "Nano", "Combi", "Tempest"]
+    tempest = compile_group_index(default_chip_configurations('Tempest'))
+    assert tempest['nozzle_id'].tolist() == [f"Chip_1_Nozzle_{n}" for n in range(1, 9)]
+    assert set(tempest['column_range']) == {'4-24'} and not tempest['positive_only'].any()
+    d2 = compile_group_index(default_chip_configurations('D2'))
+    assert d2['nozzle_id'].tolist() == ["Single_Nozzle_Single_Nozzle"] and len(d2['wells']) == 16 * 21
+    bravo_96 = compile_group_index(default_chip_configurations('Bravo - 96'))
+    assert bravo_96['nozzle_id'][43] == "Bravo - 96_Chip_Quadrant_44" and bravo_96['positive_only'].all()
+    assert sorted(bravo_96['wells'][bravo_96['groups'] == 43].tolist()) == [12 * 24 + 23, 13 * 24 + 23]
+    bravo_384 = compile_group_index(default_chip_configurations('Bravo - 384'))
+    assert bravo_384['per_well'].all() and bravo_384['column_range'][:2].tolist() == ['A4', 'A5']
+    assert get_handler('Bravo - 384').short_name("Bravo - 384_Chip_Well_7") == "W7"
+    assert get_handler('Nano').short_name("Single_Nozzle_Single_Nozzle") == "Single"
+
+def test_group_maps_compiled_once():
+    groups, n_groups = get_handler('Combi').group_map(PLATE_1536)
+    assert groups is get_handler('Combi').group_map(PLATE_1536)[0] and not groups.flags.writeable
+    assert n_groups == 8 and groups.reshape(32, 48)[:, 0].tolist() == np.repeat(np.arange(8), 4).tolist()
+    groups, n_groups = get_handler('Bravo - 96').group_map(PLATE_96)
+    assert n_groups == 4 * 9 and groups.reshape(8, 12)[1].tolist() == [-1] * 12  # Every other row
+
+def test_invalid_layouts_rejected(tmp_path):
+    for spec in ({"pattern": "rows", "component": "Nozzle", "abbreviation": "N"},
+                 {"pattern": "spiral", "component": "Nozzle", "abbreviation": "N"},
+                 {**MANTIS, "nozzle_count": 16}):
+        try:
+            HandlerLayout("Broken", spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {spec}")
+    try:
+        HandlerLayout("Wide", {**MANTIS, "nozzles": 32}).group_map(PLATE_384)  # 32 nozzles on 16 rows
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError for more nozzles than rows")
+
+    registry_file = tmp_path / "handlers.yaml"
+    registry_file.write_text("Mantis:\n  pattern: rows\n  nozzles: 16\n  component: Nozzle\n  abbreviation: N\n")
+    try:
+        import yaml  # noqa: F401
+    except ImportError:
+        try:
+            load_registry(registry_file)
+        except ValueError as e:
+            assert "PyYAML" in str(e)
+            return
+        raise AssertionError("Expected ValueError without PyYAML")
+    assert load_registry(registry_file)['Mantis'].nozzles == 16
+
+def test_new_dispenser_needs_no_code(tmp_path):
+    """A 16-nozzle chip declared in a registry file is analyzed end to end"""
+    registry_file = tmp_path / "site_handlers.json"
+    registry_file.write_text(json.dumps({"Mantis": MANTIS}))
+    code = "import qc_check; print(qc_check.LIQUID_HANDLERS[-1], qc_check.HANDLERS['Mantis'].nozzles)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'QC_CHECK_HANDLERS': str(registry_file)})
+    assert result.stdout.split() == ['Mantis', '16']
+
+    HANDLERS.update(load_registry(registry_file))
+    try:
+        files, _ = write_synthetic_exports(tmp_path / "plates", 'Mantis', 1)
+        analyzer = DispenserQCAnalyzerFixedBug()
+        analyzer.standard_concentrations = list(STANDARD_CONCENTRATIONS)
+        analyzer.target_concentration = TARGET_CONCENTRATION
+        analyzer.liquid_handler = 'Mantis'
+        analyzer.chip_configurations = [
+            {'chip_id': 'Chip_1', 'start_col': 3, 'end_col': 12, 'handler_type': 'Mantis'},
+            {'chip_id': 'Chip_2', 'start_col': 13, 'end_col': 23, 'handler_type': 'Mantis'},
+        ]
+        assert analyzer.process_qc_analysis(str(files[0]), generate_plots=False)
+        assert len(analyzer.qc_results) == 32
+        assert analyzer.qc_results[15]['nozzle_id'] == "Chip_1_Nozzle_16"
+        assert {r['n_measurements'] for r in analyzer.qc_results} == {10, 11}  # One row per nozzle
+        means = [r['mean_concentration'] for r in analyzer.qc_results]
+        assert abs(np.mean(means) - TARGET_CONCENTRATION) < 0.1 * TARGET_CONCENTRATION
+        assert get_handler('Mantis').group_map(PLATE_1536)[1] == 16  # 2 rows per nozzle on 1536 wells
+    finally:
+        HANDLERS.pop('Mantis')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for structured logging (levels, JSON lines, deferred per-well detail)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import analyze_plate_file
+from qc_logging import (INTERACTIVE_LEVELS, QUIET_LEVELS, capture_errors, configure_logging, parse_levels,
+                        plate_context)
+import io
+import json
+import logging
+import subprocess
+import textwrap
+
+def run_logged(levels, analyzer, csv_file):
+    stream = io.StringIO()
+    configure_logging(levels, stream=stream)
+    try:
+        assert analyzer.process_qc_analysis(str(csv_file), generate_plots=False)
+    finally:
+        configure_logging(INTERACTIVE_LEVELS, stream=sys.stdout)
+    return stream.getvalue()
+
+def test_parse_levels():
+    assert parse_levels("info") == {'qc_check': 'INFO'}
+    assert parse_levels("WARNING, qc_check.qc=debug") == {'qc_check': 'WARNING', 'qc_check.qc': 'DEBUG'}
+    try:
+        parse_levels("LOUD")
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for an unknown level")
+
+def test_interactive_output(make_analyzer, plate_file):
+    """INFO keeps the familiar console report; per-well standard lines are DEBUG only"""
+    output = run_logged(INTERACTIVE_LEVELS, make_analyzer(), plate_file)
+    assert output.startswith("Starting Dispenser QC Analysis")
+    assert "Step 4: Calculating QC metrics..." in output
+    assert "Chip_1_Nozzle_1: Using 42 measurements from columns 4-24" in output
+    assert "QC ANALYSIS SUMMARY" in output
+    assert "STD1 well A1" not in output
+
+    debug_output = run_logged("INFO,qc_check.load=DEBUG", make_analyzer(), plate_file)
+    assert "STD1 well A1: RFU = 2539792.0, Conc = 600" in debug_output
+
+def test_quiet_batch_levels(make_analyzer, plate_file):
+    """Batch/watch default: nothing per plate unless something goes wrong"""
+    assert run_logged(QUIET_LEVELS, make_analyzer(), plate_file) == ""
+
+def test_bravo_384_wells_only_at_debug(make_analyzer, plate_file):
+    output = run_logged(INTERACTIVE_LEVELS, make_analyzer('Bravo - 96'), plate_file)
+    assert "Quadrant_1: Using" in output
+
+    analyzer_output = run_logged("WARNING,qc_check.qc=INFO", make_analyzer(), plate_file)
+    assert "QC metrics calculated for 8" in analyzer_output and "Step 1" not in analyzer_output
+
+def test_per_well_detail_is_deferred():
+    """Per-well arguments are never formatted unless DEBUG is enabled"""
+    formatted = []
+
+    class Probe:
+        def __str__(self):
+            formatted.append(1)
+            return "probe"
+
+    stream = io.StringIO()
+    configure_logging(INTERACTIVE_LEVELS, stream=stream)
+    try:
+        logging.getLogger('qc_check.load').debug("well %s", Probe())
+        assert formatted == [] and stream.getvalue() == ""
+        configure_logging("DEBUG", stream=stream)
+        logging.getLogger('qc_check.load').debug("well %s", Probe())
+        assert formatted and stream.getvalue() == "well probe\n"
+    finally:
+        configure_logging(INTERACTIVE_LEVELS, stream=sys.stdout)
+
+def test_json_lines():
+    stream = io.StringIO()
+    configure_logging("INFO", json_lines=True, stream=stream)
+    try:
+        with plate_context("plate_7.csv"):
+            logging.getLogger('qc_check.qc').warning("\nSomething odd: %d wells", 3)
+        logging.getLogger('qc_check').info("done")
+    finally:
+        configure_logging(INTERACTIVE_LEVELS, stream=sys.stdout)
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first['level'] == 'WARNING' and first['logger'] == 'qc_check.qc'
+    assert first['message'] == "Something odd: 3 wells" and first['plate'] == "plate_7.csv"
+    assert second['message'] == "done" and 'plate' not in second
+
+def test_errors_reach_batch_summary(tmp_path):
+    """analyze_plate_file reports the logged errors even when the console is quiet"""
+    corrupt = tmp_path / "corrupt.csv"
+    corrupt.write_text("not,a,plate\n")
+    stream = io.StringIO()
+    configure_logging(QUIET_LEVELS, stream=stream)
+    try:
+        with capture_errors() as errors:
+            logging.getLogger('qc_check.curve').error("Error building standard curve: %s", "flat")
+        assert errors == ["Error building standard curve: flat"]
+
+        result = analyze_plate_file(str(corrupt), {
+            'standard_concentrations': [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875],
+            'target_concentration': 60, 'generate_plots': False, 'use_curve_cache': False})
+    finally:
+        configure_logging(INTERACTIVE_LEVELS, stream=sys.stdout)
+    assert not result['success']
+    assert result['error'] == "Error loading data: Could not find fluorescence data section | Failed to load data"
+    assert "Troubleshooting tips" not in stream.getvalue()
+
+def test_library_callers_without_logging_setup(tmp_path, plate_file):
+    """A script that never configures logging still gets the report; one with its own handlers keeps control"""
+    outputs = {}
+    for setup in ("", "logging.basicConfig(level=logging.WARNING)"):
+        script = tmp_path / "library_caller.py"
+        script.write_text(textwrap.dedent(f"""
+            import logging, sys
+            sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+            from qc_check import DispenserQCAnalyzerFixedBug, default_chip_configurations
+            {setup}
+            analyzer = DispenserQCAnalyzerFixedBug()
+            analyzer.standard_concentrations = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+            analyzer.target_concentration = 60
+            analyzer.chip_configurations = default_chip_configurations('Tempest')
+            assert analyzer.process_qc_analysis({str(plate_file)!r}, generate_plots=False)
+        """), encoding='utf-8')
+        completed = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=120)
+        assert completed.returncode == 0, completed.stderr
+        outputs[setup] = completed.stdout + completed.stderr
+    assert "QC ANALYSIS SUMMARY" in outputs[""] and "Average %CV: 3.60%" in outputs[""]
+    assert "QC ANALYSIS SUMMARY" not in outputs["logging.basicConfig(level=logging.WARNING)"]
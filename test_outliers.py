@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for outlier rejection (Grubbs, Dixon, MAD, IQR) on standards and nozzle groups
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import (calculate_qc_table, compile_group_index, default_chip_configurations,
+                      reduce_standard_replicates, standard_replicates)
+from qc_outliers import OUTLIER_METHODS, check_outlier_alpha, detect_outliers, flag_grouped_outliers
+from qc_cache import StandardCurveCache
+import numpy as np
+import subprocess
+
+TARGET = 60
+
+def test_detectors_flag_a_single_bad_drop():
+    groups = np.array([
+        [70.1, 69.8, 70.3, 70.0, 69.9, 70.2, 95.0],  # One clogged-nozzle drop
+        [70.1, 69.8, 70.3, 70.0, 69.9, 70.2, 70.05],
+        [70.0, 71.0, np.nan, np.nan, np.nan, np.nan, np.nan],  # Too few values to test
+    ])
+    for method in OUTLIER_METHODS:
+        flags = detect_outliers(groups, method)
+        assert flags[0].tolist() == [False] * 6 + [True], method
+        assert not flags[1:].any(), method
+
+def test_grubbs_repeats_and_dixon_table():
+    # Two high drops in a nozzle's wells: Grubbs keeps rejecting until the rest is consistent
+    values = np.append(np.random.default_rng(7).normal(10.0, 0.1, 20), [12.0, 13.0])
+    assert np.flatnonzero(detect_outliers(values, 'grubbs')).tolist() == [20, 21]
+    # Triplicate at alpha 0.05 (critical Q 0.970): Q = 0.80 is kept, Q = 0.99 is rejected
+    assert detect_outliers(np.array([1.0, 1.1, 1.5]), 'dixon').tolist() == [False, False, False]
+    assert detect_outliers(np.array([1.0, 1.01, 2.0]), 'dixon').tolist() == [False, False, True]
+    try:
+        detect_outliers(values, 'dixon', alpha=0.2)
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for an unsupported Dixon alpha")
+
+def test_grouped_flags_match_per_group():
+    rng = np.random.default_rng(4)
+    values = rng.normal(70, 1, 300)
+    bins = rng.integers(0, 12, 300)
+    values[[3, 50, 120]] = [110.0, 20.0, 140.0]
+    flags = flag_grouped_outliers(values, bins, 12, 'grubbs')
+    for group in range(12):
+        members = np.flatnonzero(bins == group)
+        np.testing.assert_array_equal(flags[members], detect_outliers(values[members], 'grubbs'))
+    assert flags[[3, 50, 120]].all()
+
+def test_standard_replicates_stack():
+    rng = np.random.default_rng(5)
+    stack = rng.uniform(1e5, 2e6, (4, 16, 24))
+    stack[1, 2, 0] = np.nan  # Missing STD2 replicate
+    stack[2, 4, 1] = stack[2, 4, 0] * 1.8  # STD3 outlier
+    replicates = standard_replicates(stack)
+    assert replicates.shape == (4, 8, 3)
+    medians, excluded = reduce_standard_replicates(replicates)
+    assert not excluded.any()
+    assert np.isclose(medians[1, 1], np.median(stack[1, 2, 1:3]))  # Median of the wells present
+    medians, excluded = reduce_standard_replicates(
+        np.stack([np.tile([1000.0, 1010.0, 1005.0], (8, 1))] * 2) * np.array([1, 1, 1.5])[np.newaxis, np.newaxis], 'dixon')
+    assert excluded[..., 2].all() and np.allclose(medians, 1005.0)
+
+def test_qc_table_excludes_and_reports():
+    rng = np.random.default_rng(6)
+    stack = rng.normal(70, 1.5, (3, 16, 24))
+    stack[1, 4, 10] = 130.0  # Nozzle 3 (rows E-F), well E11
+    group_index = compile_group_index(default_chip_configurations('Tempest'))
+    plain = calculate_qc_table(stack, group_index, TARGET)
+    screened = calculate_qc_table(stack, group_index, TARGET, 'grubbs')
+    assert 'excluded_wells' not in plain.columns
+
+    row = screened[(screened['plate'] == 1) & (screened['nozzle_id'] == 'Chip_1_Nozzle_3')].iloc[0]
+    assert row['excluded_wells'].split(';').count('E11') == 1 and row['n_excluded'] >= 1
+    assert row['n_measurements'] == 42 - row['n_excluded']
+    before = plain[(plain['plate'] == 1) & (plain['nozzle_id'] == 'Chip_1_Nozzle_3')].iloc[0]
+    assert row['cv_percent'] < before['cv_percent']
+    assert (screened['n_measurements'] + screened['n_excluded'] == plain['n_measurements']).all()
+
+def test_analyzer_reports_excluded_wells(tmp_path, make_analyzer, plate_file):
+    analyzer = make_analyzer(outlier_method='iqr')
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    samples = [w for w in analyzer.excluded_wells if w['kind'] == 'sample']
+    assert samples and all(w['method'] == 'iqr' for w in samples)
+    assert sum(r['n_excluded'] for r in analyzer.qc_results) == len(samples)
+    with open(tmp_path / "plate_processed.csv", encoding='utf-8') as f:
+        processed = f.read()
+    assert "Excluded Wells,Type,Group,Well,Value,Units,Method" in processed
+    assert f",sample,{samples[0]['group']},{samples[0]['well']}," in processed
+
+    analyzer = make_analyzer(outlier_method='mad', outlier_scope='standards')
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert analyzer.excluded_wells and {w['kind'] for w in analyzer.excluded_wells} == {'standard'}
+    assert 'excluded_wells' not in analyzer.qc_results[0]
+
+def test_cached_curve_keeps_standard_exclusions(tmp_path, make_analyzer, plate_file):
+    """Bravo 384: the curve cache is keyed by the outlier settings and replays the rejected standards"""
+    cache = StandardCurveCache(tmp_path / "cache")
+    results = []
+    for method in ('mad', 'mad', None):
+        analyzer = make_analyzer('Bravo - 384', outlier_method=method, outlier_scope='standards', curve_cache=cache)
+        assert analyzer.process_qc_analysis(str(plate_file), str(plate_file), generate_plots=False)
+        results.append((analyzer.excluded_wells, analyzer.standard_curve_params['slope']))
+    assert results[0][0] and results[1] == results[0]
+    assert results[2][0] == [] and results[2][1] != results[0][1]
+
+def test_dixon_settings_rejected_up_front(make_analyzer, plate_file, caplog):
+    """Dixon's Q test has no critical values above 10 wells or for other alphas - say so before any plate is read"""
+    check_outlier_alpha('dixon', 0.01)
+    check_outlier_alpha('mad', 0.02)  # Alpha only matters to the Grubbs and Dixon tests
+    for method, alpha in (('dixon', 0.02), ('grubbs', 1.5)):
+        try:
+            check_outlier_alpha(method, alpha)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Expected ValueError for {method} at alpha {alpha}")
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qc_check.py")
+    for options, message in ((['--outlier-alpha', '0.02', '--outlier-scope', 'standards'], "supports alpha"),
+                             ([], "nozzle groups have 42 wells")):
+        result = subprocess.run([sys.executable, script, '-f', str(plate_file), '--outliers', 'dixon',
+                                 *options], capture_output=True, text=True)
+        assert result.returncode == 2 and message in result.stderr, result.stderr
+
+    # Library callers still run, with a warning that the nozzle groups went unscreened
+    analyzer = make_analyzer(outlier_method='dixon')
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert "8 of 8 nozzle groups are larger and were not screened" in caplog.text
+    assert all(r['n_excluded'] == 0 for r in analyzer.qc_results)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped plate archive (CSV import and streamed re-analysis)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_archive import PlateArchive, analyze_archive
+from qc_check import DispenserQCAnalyzerFixedBug
+from qc_geometry import PLATE_96
+from benchmark_qc import STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, write_synthetic_exports
+import numpy as np
+
+def analyze_file(csv_file, handler_type, curve_model, std_curve_file=None):
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.standard_concentrations = list(STANDARD_CONCENTRATIONS)
+    analyzer.target_concentration = TARGET_CONCENTRATION
+    analyzer.liquid_handler = handler_type
+    analyzer.chip_configurations = None
+    analyzer.curve_model = curve_model
+    assert analyzer.process_qc_analysis(str(csv_file), std_curve_file and str(std_curve_file), generate_plots=False)
+    return analyzer
+
+def test_import_and_memory_map(tmp_path):
+    files, _ = write_synthetic_exports(tmp_path / "exports", 'Tempest', 3)
+    files_96, _ = write_synthetic_exports(tmp_path / "exports_96", 'Tempest', 2, geometry=PLATE_96)
+    archive = PlateArchive(tmp_path / "archive")
+    assert archive.import_exports(files + files_96) == [1, 2, 3, 4, 5]
+    assert archive.import_exports(files) == []  # Unchanged files are not imported twice
+    (tmp_path / "exports" / "broken.csv").write_text("not an export\n")
+    assert archive.import_exports([tmp_path / "exports" / "broken.csv"]) == []
+
+    reopened = PlateArchive(tmp_path / "archive")
+    assert len(reopened) == 5 and reopened.index['plate_format'].tolist() == ['384'] * 3 + ['96'] * 2
+    assert reopened.index['assay_id'].notna().all()
+    plates = reopened.plates('384')
+    assert isinstance(plates, np.memmap) and plates.dtype == np.float32 and plates.shape == (3, 16, 24)
+    assert not plates.flags.writeable
+    analyzer = analyze_file(files[1], 'Tempest', 'linear')
+    np.testing.assert_array_equal(reopened.plate(2), analyzer.fluorescence_data.to_numpy(dtype=float))
+    assert reopened.plates('96').shape == (2, 8, 12)
+
+def test_streamed_analysis_matches_files(tmp_path):
+    """Chunked re-analysis of archived plates gives the per-file analyzer's QC results"""
+    files, _ = write_synthetic_exports(tmp_path / "exports", 'Tempest', 5)
+    archive = PlateArchive(tmp_path / "archive")
+    plate_ids = archive.import_exports(files)
+    for curve_model in ('linear', 'auto'):
+        table = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, 'Tempest',
+                                curve_model=curve_model, chunk_size=2)
+        assert table['plate'].unique().tolist() == plate_ids
+        for plate_id, csv_file in zip(plate_ids, files):
+            analyzer = analyze_file(csv_file, 'Tempest', curve_model)
+            rows = table[table['plate'] == plate_id]
+            assert rows['nozzle_id'].tolist() == [r['nozzle_id'] for r in analyzer.qc_results]
+            assert rows['curve_model'].iloc[0] == analyzer.standard_curve_params['model']
+            for column in ('mean_concentration', 'cv_percent', 'accuracy_percent', 'n_measurements'):
+                np.testing.assert_allclose(rows[column].to_numpy(dtype=float),
+                                           [r[column] for r in analyzer.qc_results], rtol=1e-9)
+
+    subset = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, plate_ids=plate_ids[3:])
+    assert subset['plate'].unique().tolist() == plate_ids[3:]
+
+def test_separate_curve_and_unusable_plates(tmp_path):
+    files, std_curve_file = write_synthetic_exports(tmp_path / "exports", 'Bravo - 384', 2)
+    archive = PlateArchive(tmp_path / "archive")
+    archive.import_exports(files)
+    archive.add_plates([np.full((16, 24), np.nan)], [{'source_file': 'empty.csv'}])
+    table = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, 'Bravo - 384',
+                            std_curve_file=std_curve_file)
+    analyzer = analyze_file(files[0], 'Bravo - 384', 'linear', std_curve_file)
+    assert len(table[table['plate'] == 1]) == len(analyzer.qc_results)
+    np.testing.assert_allclose(table[table['plate'] == 1]['mean_concentration'].to_numpy(dtype=float),
+                               [r['mean_concentration'] for r in analyzer.qc_results], rtol=1e-9)
+
+    # The empty plate has no standards of its own - it is skipped, the others are analyzed
+    table = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, 'Tempest')
+    assert sorted(table['plate'].unique().tolist()) == [1, 2]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for plate geometries (96, 384 and 1536-well parsing, naming and grouping)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, calculate_qc_table, compile_group_index, default_chip_configurations
+from qc_geometry import GEOMETRIES, PLATE_96, PLATE_384, PLATE_1536, geometry_for_shape, row_index, row_label
+from qc_handlers import get_handler
+from benchmark_qc import STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, write_synthetic_exports
+import numpy as np
+import pickle
+
+def test_row_labels_and_well_names():
+    assert [row_label(row) for row in (0, 15, 25, 26, 31)] == ['A', 'P', 'Z', 'AA', 'AF']
+    assert all(row_index(row_label(row)) == row for row in range(60))
+    assert PLATE_1536.well_name(31, 47) == 'AF48' and PLATE_1536.parse_well('AF48') == (31, 47)
+    assert PLATE_384.well_names()[PLATE_384.cols + 3] == 'B4'
+    assert PLATE_1536.standard_rows == (0, 4, 8, 12, 16, 20, 24, 28)
+    assert geometry_for_shape((8, 12)) is PLATE_96
+    assert pickle.loads(pickle.dumps(PLATE_1536)) is PLATE_1536
+    try:
+        PLATE_384.parse_well('Q1')
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for a well outside the plate")
+
+def test_384_layout_unchanged():
+    """The generalized groups reproduce the original hard-coded 384-well layout"""
+    tempest = compile_group_index(default_chip_configurations('Tempest'))
+    nozzle_1 = tempest['wells'][tempest['groups'] == 0]
+    assert sorted(nozzle_1.tolist()) == [row * 24 + col for row in (0, 1) for col in range(3, 24)]
+    bravo_96 = compile_group_index(default_chip_configurations('Bravo - 96'))
+    assert bravo_96['n_groups'] == 44 and bravo_96['column_range'][0] == 'quadrant_44'
+    assert sorted(bravo_96['wells'][bravo_96['groups'] == 0].tolist()) == [3, 4, 27, 28]
+
+def test_group_index_is_built_once_per_geometry():
+    configs = default_chip_configurations('Bravo - 384', PLATE_1536)
+    first = compile_group_index(configs, PLATE_1536)
+    second = compile_group_index([dict(config) for config in configs], PLATE_1536)
+    assert first['wells'] is second['wells'] and not first['wells'].flags.writeable
+    assert first['n_groups'] == 32 * 45
+    assert compile_group_index(configs, PLATE_384)['n_groups'] == 16 * 21  # Columns clipped to the smaller plate
+
+    stack = np.full((2, 32, 48), 60.0)
+    assert len(calculate_qc_table(stack, first, TARGET_CONCENTRATION)) == 2 * 32 * 45
+    try:
+        calculate_qc_table(np.full((1, 16, 24), 60.0), first, TARGET_CONCENTRATION)
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for plates of another format")
+
+def analyze(files, std_curve_file, handler_type):
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.standard_concentrations = list(STANDARD_CONCENTRATIONS)
+    analyzer.target_concentration = TARGET_CONCENTRATION
+    analyzer.liquid_handler = handler_type
+    analyzer.chip_configurations = None  # Defaults for the plate format found in the file
+    assert analyzer.process_qc_analysis(str(files[0]), std_curve_file and str(std_curve_file), generate_plots=False)
+    return analyzer
+
+def bravo_96_quadrants(geometry):
+    """Squares stamped by the registry's Bravo - 96 head, every row_spacing squares down, after the standards"""
+    layout = get_handler('Bravo - 96')
+    block = geometry.cols // layout.head[1]
+    return len(range(0, geometry.rows, layout.row_spacing * block)) * len(range(layout.first_sample_col, geometry.cols, block))
+
+def test_every_format_end_to_end(tmp_path):
+    expected_groups = {'Tempest': lambda g: 8, 'D2': lambda g: 1,
+                       'Bravo - 96': bravo_96_quadrants,
+                       'Bravo - 384': lambda g: g.rows * (g.cols - 3)}
+    for geometry in GEOMETRIES.values():
+        for handler_type, n_groups in expected_groups.items():
+            files, std_curve_file = write_synthetic_exports(tmp_path / geometry.name, handler_type, 1, geometry=geometry)
+            analyzer = analyze(files, std_curve_file, handler_type)
+            assert analyzer.geometry is geometry
+            assert analyzer.calculated_concentrations.shape == geometry.shape
+            assert len(analyzer.qc_results) == n_groups(geometry), (geometry.name, handler_type)
+            means = [r['mean_concentration'] for r in analyzer.qc_results]
+            assert abs(np.mean(means) - TARGET_CONCENTRATION) < 0.1 * TARGET_CONCENTRATION
+            if handler_type == 'Tempest':
+                tempest = compile_group_index(default_chip_configurations('Tempest', geometry), geometry)
+                assert analyzer.qc_results[0]['n_measurements'] == np.count_nonzero(tempest['groups'] == 0)
+
+    with open(files[0].with_name(files[0].stem + "_processed.csv"), encoding='utf-8') as f:
+        processed = f.read()
+    assert "Row_AF," in processed and "AF48" in processed  # 1536-well Bravo 384 run
+
+def test_chip_columns_checked_against_plate(make_analyzer, plate_file, caplog):
+    """Chip ranges that only fit a 1536-well plate fail on 384 wells instead of reporting clipped groups"""
+    chips = [{'chip_id': 'Chip_1', 'start_col': 3, 'end_col': 47, 'handler_type': 'Tempest'}]
+    assert not make_analyzer(chip_configurations=chips).process_qc_analysis(str(plate_file), generate_plots=False)
+    assert "Chip_1 columns 4-48 run past the 24 columns of a 384-well plate" in caplog.text
+
+    chips[0]['end_col'] = 23
+    assert make_analyzer(chip_configurations=chips).process_qc_analysis(str(plate_file), generate_plots=False)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming, section-indexed plate-reader parser
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, cross_check_calculated_cv, parse_plate_export
+from pathlib import Path
+import pandas as pd
+import numpy as np
+
+def legacy_fluorescence_block(csv_file):
+    """Fluorescence block as extracted by the original read_csv_manual/iterrows path"""
+    raw_data = DispenserQCAnalyzerFixedBug().read_csv_manual(csv_file)
+    fluorescence_start = None
+    for i, row in raw_data.iterrows():
+        if pd.notna(row[0]) and "Results for Fluorescein" in str(row[0]):
+            fluorescence_start = i + 1
+            break
+    block = raw_data.iloc[fluorescence_start+1:fluorescence_start+17, 1:25].copy()
+    for col in block.columns:
+        block[col] = pd.to_numeric(block[col], errors='coerce')
+    return fluorescence_start, block.to_numpy(dtype=float)
+
+def test_matches_legacy_extraction(example_file):
+    """The streaming parser yields the same block as the DataFrame-based path"""
+    export = parse_plate_export(example_file)
+    fluorescence_start, expected = legacy_fluorescence_block(example_file)
+    assert export.fluorescence.shape == (16, 24)
+    assert export.fluorescence_line == fluorescence_start
+    np.testing.assert_array_equal(export.fluorescence, expected)
+
+def test_section_index(example_file):
+    """Every section header is indexed by byte offset"""
+    export = parse_plate_export(example_file)
+    titles = [section[0] for section in export.sections]
+    assert titles[0].startswith("Plate information")
+    assert any(title.startswith("Calculated results") for title in titles)
+    assert any(title.startswith("Results for Fluorescein(1)") for title in titles)
+    assert any(title.startswith("Basic assay information") for title in titles)
+
+    with open(example_file, 'rb') as f:
+        for title, offset, _ in export.sections:
+            f.seek(offset)
+            assert f.readline().decode('utf-8').startswith(title)
+
+def test_read_plate_block_by_offset(example_file):
+    """A block can be re-read with a single seek from its indexed offset"""
+    export = parse_plate_export(example_file)
+    _, offset, _ = export.find_sections("Results for Fluorescein")[0]
+    np.testing.assert_array_equal(export.read_plate_block(offset), export.fluorescence)
+
+    _, calc_offset, _ = export.find_sections("Calculated results")[0]
+    calculated = export.read_plate_block(calc_offset)
+    assert np.isnan(calculated[1, 0])  # B1 is blank in the %CV block
+    assert np.isclose(calculated[0, 0], 1.79928445213)
+
+def test_stops_at_protocol_footer(tmp_path, example_file):
+    """Sections after the protocol footer are not scanned"""
+    with open(example_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    csv_file = tmp_path / "export.csv"
+    csv_file.write_text(content + "\nResults for Fluorescein(9) - channel 1 (RFU)\n", encoding='utf-8')
+    export = parse_plate_export(csv_file)
+    assert export.sections[-1][0].startswith("Protocol information")
+    assert len(export.find_sections("Results for")) == 1
+
+def test_missing_fluorescence_section(tmp_path):
+    csv_file = tmp_path / "empty.csv"
+    csv_file.write_text("Plate information\nPlate,Repeat\n1,1\n", encoding='utf-8')
+    export = parse_plate_export(csv_file)
+    assert export.fluorescence is None
+    assert len(export.sections) == 1
+
+def multi_repeat_export(tmp_path, example_file, scale=3):
+    """The example with a second read of the plate appended - Repeat 2, every RFU times `scale`"""
+    lines = Path(example_file).read_text(encoding='utf-8').splitlines()
+    footer = next(i for i, line in enumerate(lines) if line.startswith("Basic assay information"))
+    start = max(i for i in range(footer) if lines[i].startswith("Plate information"))
+    repeat = lines[start:footer]
+    repeat[2] = "1,2," + repeat[2].split(',', 2)[2]
+    header = next(i for i, line in enumerate(repeat) if line.startswith("Results for")) + 1
+    for i in range(header + 1, header + 17):
+        label, *values = repeat[i].split(',')
+        repeat[i] = ','.join([label] + [str(int(v) * scale) if v.isdigit() else v for v in values])
+    csv_file = tmp_path / "repeats.csv"
+    csv_file.write_text('\n'.join(lines[:footer] + repeat + lines[footer:]) + '\n', encoding='utf-8')
+    return csv_file
+
+def test_multi_repeat_sections(tmp_path, example_file):
+    """Every repeat is parsed in the same pass; the QC engine sees their per-well mean"""
+    csv_file = multi_repeat_export(tmp_path, example_file)
+    export = parse_plate_export(csv_file)
+    single = parse_plate_export(example_file).fluorescence
+    assert export.repeats.shape == (2, 16, 24) and export.repeat_numbers == [1, 2]
+    assert list(export.channels) == ["Fluorescein(1) - channel 1 (RFU)"]
+    np.testing.assert_array_equal(export.repeats[0], single)
+    np.testing.assert_allclose(export.fluorescence, 2 * single)
+
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.liquid_handler = 'Tempest'
+    assert analyzer.load_and_clean_data(str(csv_file))
+    np.testing.assert_allclose(analyzer.fluorescence_data.to_numpy(dtype=float), 2 * single)
+    assert analyzer.reader_cv_mismatches == []  # The %CV block belongs to repeat 1
+
+def test_reader_cv_cross_check(tmp_path, example_file):
+    """The reader's %CV block is checked against the parsed RFU without reading the file again"""
+    export = parse_plate_export(example_file)
+    (title, repeat, block), = export.calculated
+    assert "%CV" in title and repeat == 1
+    n_groups, worst, wells = cross_check_calculated_cv(export.fluorescence, block)
+    assert n_groups == 32 and worst < 1e-6 and len(wells) == 0
+
+    # A1-A3 (one standard triplicate) carry a %CV that does not match their RFU
+    lines = Path(example_file).read_text(encoding='utf-8').splitlines()
+    row_a = next(i for i, line in enumerate(lines) if line.startswith("A,1.79928445213"))
+    lines[row_a] = lines[row_a].replace("1.79928445213", "9.5", 3)
+    csv_file = tmp_path / "tampered.csv"
+    csv_file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.liquid_handler = 'Tempest'
+    assert analyzer.load_and_clean_data(str(csv_file))
+    assert analyzer.reader_cv_mismatches == ['A1', 'A2', 'A3']
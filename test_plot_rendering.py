@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for plot rendering (formats, presets and parallel workers)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, heatmap_limits
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+def analyzer_with_results(n_chips=3):
+    """An analyzer holding made-up nozzle results and a curve, as if the plate had been analyzed"""
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.target_concentration = 60
+    analyzer.qc_results = []
+    for chip in range(1, n_chips + 1):
+        for nozzle in range(1, 9):
+            analyzer.qc_results.append({
+                'nozzle_id': f'Chip_{chip}_Nozzle_{nozzle}', 'chip_id': f'Chip_{chip}',
+                'mean_concentration': 65.0 + nozzle, 'std_concentration': 2.0,
+                'cv_percent': 2.0 + nozzle / 10, 'accuracy_percent': 8.0 + nozzle,
+                'n_measurements': 14, 'column_range': '4-10', 'handler_type': 'Tempest'
+            })
+    analyzer.standard_curve_data = pd.DataFrame({
+        'fluorescence': [2539792, 1338202, 654337, 338513, 164766, 82937, 40810, 20072],
+        'concentration': [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+    })
+    analyzer.standard_curve_params = {'slope': 0.00023472, 'intercept': -2.55327080, 'r_squared': 0.9993}
+    return analyzer
+
+EXPECTED_PLOTS = ["standard_curve", "chip_1_nozzle_performance", "chip_2_nozzle_performance",
+                  "chip_3_nozzle_performance", "all_chips_nozzle_performance"]
+
+def test_svg_output(tmp_path):
+    assert analyzer_with_results().generate_plots(tmp_path, plot_format='svg', workers=1)
+    for name in EXPECTED_PLOTS:
+        assert (tmp_path / "plots" / f"{name}.svg").read_text().lstrip().startswith("<?xml")
+
+def test_preview_is_smaller_than_full_resolution(tmp_path):
+    full_dir = tmp_path / "full"
+    preview_dir = tmp_path / "preview"
+    full_dir.mkdir()
+    preview_dir.mkdir()
+    assert analyzer_with_results().generate_plots(full_dir, workers=1)
+    assert analyzer_with_results().generate_plots(preview_dir, plot_format='preview', workers=1)
+    for name in EXPECTED_PLOTS:
+        assert (preview_dir / "plots" / f"{name}.png").stat().st_size < (full_dir / "plots" / f"{name}.png").stat().st_size
+
+def test_parallel_workers_render_every_chip(tmp_path):
+    assert analyzer_with_results().generate_plots(tmp_path, plot_format='preview', workers=2)
+    for name in EXPECTED_PLOTS:
+        assert (tmp_path / "plots" / f"{name}.png").exists()
+
+def test_unknown_format_fails(tmp_path):
+    assert not analyzer_with_results().generate_plots(tmp_path, plot_format='gif')
+
+def run_plate(analyzer, csv_file):
+    assert analyzer.process_qc_analysis(str(csv_file), plot_format='preview', plot_workers=1)
+    return sorted(Path(path).name for path in analyzer.plot_files), analyzer
+
+def test_heatmap_replaces_per_well_bars(tmp_path, make_analyzer, plate_file):
+    plots, analyzer = run_plate(make_analyzer('Bravo - 384', target=75.0), plate_file)
+    assert plots == ["plate_heatmap.png", "standard_curve.png"]
+    task = analyzer.heatmap_task(str(tmp_path / "h.png"), "plate")
+    assert [panel['values'].shape for panel in task['panels']] == [(16, 24)] * 4
+    accuracy = task['panels'][2]['values']
+    assert np.isnan(accuracy[:, :3]).all() and np.isfinite(accuracy[:, 3:]).all()  # Samples only
+    assert task['panels'][3]['vmin'] == -task['panels'][3]['vmax']
+
+    plots, _ = run_plate(make_analyzer('Bravo - 384', target=75.0, heatmaps='off'), plate_file)
+    assert plots == ["bravo___384_chip_well_performance.png", "standard_curve.png"]
+    plots, _ = run_plate(make_analyzer(target=75.0), plate_file)
+    assert "plate_heatmap.png" not in plots
+    plots, _ = run_plate(make_analyzer(target=75.0, heatmaps='all'), plate_file)  # Overview next to the nozzle bars
+    assert plots == ["chip_1_nozzle_performance.png", "plate_heatmap.png", "standard_curve.png"]
+
+def test_heatmap_limits():
+    values = np.array([1.0, 2.0, np.nan, 1000.0])
+    low, high = heatmap_limits(values, reference=np.linspace(10, 20, 101))
+    assert np.isclose(low, 10.2) and np.isclose(high, 19.8)  # Scaled to the reference, the rest clips
+    assert heatmap_limits(np.array([-3.0, 1.0]), centered=True)[0] < 0
+    assert heatmap_limits(np.full(4, np.nan)) == (None, None)
+    assert heatmap_limits(np.full(4, 5.0)) == (4.0, 6.0)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for per-stage instrumentation (--profile)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, save_profile
+from qc_profile import NULL_PROFILER, Profiler
+from test_plot_rendering import analyzer_with_results
+import json
+import time
+
+def test_nested_spans():
+    profiler = Profiler()
+    try:
+        with profiler.span('outer', plates=1) as outer:
+            with profiler.span('inner') as inner:
+                block = bytearray(2_000_000)
+                time.sleep(0.01)
+                inner.count(wells=384)
+            del block
+            with profiler.span('small'):
+                pass
+    finally:
+        profiler.close()
+
+    assert [span.name for span in profiler.spans] == ['outer', 'inner', 'small']
+    outer, inner, small = profiler.spans
+    assert inner.parent is outer and inner.depth == 1
+    assert outer.counts == {'plates': 1} and inner.counts == {'wells': 384}
+    assert inner.wall >= 0.01 and outer.wall >= inner.wall
+    assert inner.start >= outer.start
+    # The child's allocation counts towards the parent's peak, but not towards a later sibling's
+    assert inner.peak_mb >= 2.0 and outer.peak_mb >= inner.peak_mb
+    assert small.peak_mb < 1.0
+
+def test_null_profiler_is_inert():
+    with NULL_PROFILER.span('anything', wells=1) as span:
+        span.count(groups=2)
+    assert not NULL_PROFILER.enabled
+    assert DispenserQCAnalyzerFixedBug().profiler is NULL_PROFILER
+
+def test_analysis_trace(make_analyzer, plate_file):
+    analyzer = make_analyzer(profiler=Profiler())
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=True, plot_format='preview', plot_workers=1)
+    json_file, trace_file = save_profile(analyzer.profiler, plate_file, chrome_trace=True)
+
+    with open(json_file) as f:
+        trace = json.load(f)
+    spans = {span['name']: span for span in trace['spans']}
+    for stage in ('load', 'parse', 'curve', 'concentrations', 'qc', 'compile_groups', 'grouped_reduction',
+                  'output', 'plots', 'plot:standard_curve', 'plot:Chip_1'):
+        assert stage in spans, stage
+        assert spans[stage]['wall_s'] >= 0 and spans[stage]['cpu_s'] >= 0
+    assert spans['parse']['parent'] == 'load'
+    assert spans['plot:Chip_1']['parent'] == 'plots' and spans['plot:Chip_1']['counts'] == {'bars': 8}
+    assert spans['grouped_reduction']['counts'] == {'wells': 336, 'groups': 8}
+    assert spans['load']['counts']['wells'] == 384
+    assert spans['plots']['peak_mb'] > 0
+
+    with open(trace_file) as f:
+        events = json.load(f)['traceEvents']
+    assert len(events) == len(trace['spans'])
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+
+def test_parallel_plots_get_spans(tmp_path):
+    """Figures rendered in worker processes still show up as per-chip spans"""
+    analyzer = analyzer_with_results(n_chips=3)
+    analyzer.profiler = Profiler(track_memory=False)
+    with analyzer.profiler.span('plots'):
+        assert analyzer.generate_plots(tmp_path, plot_format='preview', workers=2)
+    names = [span.name for span in analyzer.profiler.spans]
+    assert sorted(names) == ['plot:Chip_1', 'plot:Chip_2', 'plot:Chip_3', 'plot:all_chips', 'plot:standard_curve',
+                             'plots']
+    assert all(span.parent.name == 'plots' for span in analyzer.profiler.spans[1:])
+    assert {span.pid for span in analyzer.profiler.spans[1:]} != {os.getpid()}
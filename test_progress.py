@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for stage progress reporting and cancellation (used by the GUI worker thread)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import PIPELINE_STAGES
+import queue
+import threading
+
+def test_stages_reported_in_order(make_analyzer, plate_file):
+    analyzer = make_analyzer()
+    stages = []
+    analyzer.progress_callback = stages.append
+    assert analyzer.process_qc_analysis(str(plate_file), plot_format='preview', plot_workers=1)
+    assert stages == list(PIPELINE_STAGES)
+
+    stages.clear()
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert stages == list(PIPELINE_STAGES)[:-1]
+
+def test_cancel_from_another_thread(tmp_path, make_analyzer, plate_file):
+    """The worker stops at the next stage boundary; the analyzer stays usable for the next run"""
+    analyzer = make_analyzer()
+    events = queue.Queue()
+    resume = threading.Event()
+    analyzer.cancel_event = threading.Event()
+
+    def report(stage):
+        events.put(stage)
+        if stage == 'curve':
+            resume.wait(5)  # Hold the worker inside the curve stage until the test has cancelled
+
+    analyzer.progress_callback = report
+    results = []
+    worker = threading.Thread(target=lambda: results.append(analyzer.process_qc_analysis(str(plate_file))))
+    worker.start()
+    while events.get(timeout=5) != 'curve':
+        pass
+    analyzer.cancel_event.set()
+    resume.set()
+    worker.join(10)
+    assert results == [False]
+    assert events.empty()  # Nothing after the curve stage started
+    assert not (tmp_path / "plate_processed.csv").exists()
+
+    analyzer.cancel_event = threading.Event()
+    analyzer.progress_callback = None
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert (tmp_path / "plate_processed.csv").exists()
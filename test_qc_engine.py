@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the grouped-reduction QC engine (multi-plate tensor path)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import DispenserQCAnalyzerFixedBug, compile_group_index, calculate_qc_table
+import pandas as pd
+import numpy as np
+
+TARGET = 75.0
+
+def make_stack(n_plates, seed=0):
+    rng = np.random.default_rng(seed)
+    stack = rng.normal(70, 3, size=(n_plates, 16, 24))
+    stack[:, 1::2, 0:3] = -2.4  # Blank wells next to the standards
+    stack[0, 4, 10] = np.nan
+    stack[-1, 6, 12] = -1.0
+    stack[-1, 0:2, 3:5] = np.nan  # Empty first Bravo-96 quadrant on the last plate
+    return stack
+
+def analyzer_qc_results(plate, chip_configurations):
+    """QC metrics through the analyzer's calculate_qc_metrics"""
+    analyzer = DispenserQCAnalyzerFixedBug()
+    analyzer.target_concentration = TARGET
+    analyzer.chip_configurations = chip_configurations
+    analyzer.calculated_concentrations = pd.DataFrame(plate)
+    assert analyzer.calculate_qc_metrics()
+    return analyzer.qc_results
+
+def reference_groups(plate, config):
+    """Plain-Python grouping taken from the original calculate_qc_metrics loops"""
+    start_col, end_col, handler_type = config['start_col'], config['end_col'], config['handler_type']
+    groups = []
+    if handler_type in ["D2", "Nano"]:
+        groups.append([v for v in plate[:, start_col:end_col+1].ravel() if not np.isnan(v)])
+    elif handler_type == "Bravo - 96":
+        for row_group in range(0, 16, 4):
+            for col_group in range(3, 24, 2):
+                groups.append([plate[r, c] for r in (row_group, row_group+1) for c in (col_group, col_group+1)
+                               if c < 24 and not np.isnan(plate[r, c]) and plate[r, c] > 0])
+    elif handler_type == "Bravo - 384":
+        for r in range(16):
+            for c in range(start_col, end_col+1):
+                if not np.isnan(plate[r, c]) and plate[r, c] > 0:
+                    groups.append([plate[r, c]])
+    else:
+        for i in range(0, 16, 2):
+            groups.append([v for v in plate[i:i+2, start_col:end_col+1].ravel() if not np.isnan(v)])
+    return [g for g in groups if g]
+
+CONFIGS = {
+    'Tempest': [{'chip_id': f'Chip_{i+1}', 'start_col': s, 'end_col': e, 'handler_type': 'Tempest'}
+                for i, (s, e) in enumerate([(3, 9), (10, 16), (17, 23)])],
+    'D2': [{'chip_id': 'Single_Nozzle', 'start_col': 3, 'end_col': 23, 'handler_type': 'D2'}],
+    'Bravo - 96': [{'chip_id': 'Bravo - 96_Chip', 'start_col': 3, 'end_col': 23, 'handler_type': 'Bravo - 96'}],
+    'Bravo - 384': [{'chip_id': 'Bravo - 384_Chip', 'start_col': 3, 'end_col': 23, 'handler_type': 'Bravo - 384'}],
+}
+
+def test_stack_matches_reference_for_every_handler():
+    stack = make_stack(4)
+    for handler, configs in CONFIGS.items():
+        table = calculate_qc_table(stack, compile_group_index(configs), TARGET)
+        for plate_idx in range(len(stack)):
+            plate_table = table[table['plate'] == plate_idx]
+            expected = reference_groups(stack[plate_idx], configs[0]) if len(configs) == 1 else \
+                [g for config in configs for g in reference_groups(stack[plate_idx], config)]
+            assert len(plate_table) == len(expected), handler
+            np.testing.assert_allclose(plate_table['mean_concentration'], [np.mean(g) for g in expected], rtol=1e-12)
+            np.testing.assert_allclose(plate_table['std_concentration'], [np.std(g) for g in expected], rtol=1e-9, atol=1e-12)
+            assert list(plate_table['n_measurements']) == [len(g) for g in expected]
+            np.testing.assert_allclose(plate_table['accuracy_percent'],
+                                       [(np.mean(g) - TARGET) / TARGET * 100 for g in expected], rtol=1e-10)
+
+def test_table_is_columnar():
+    table = calculate_qc_table(make_stack(3), compile_group_index(CONFIGS['Tempest']), TARGET)
+    assert isinstance(table, pd.DataFrame)
+    assert len(table) == 3 * 24
+    assert table['mean_concentration'].dtype == np.float64
+    assert list(table['nozzle_id'][:2]) == ['Chip_1_Nozzle_1', 'Chip_1_Nozzle_2']
+
+def test_bravo_384_wells_numbered_per_plate():
+    stack = make_stack(2)
+    table = calculate_qc_table(stack, compile_group_index(CONFIGS['Bravo - 384']), TARGET)
+    last_plate = table[table['plate'] == 1]
+    assert last_plate['nozzle_id'].iloc[0] == 'Bravo - 384_Chip_Well_1'
+    assert last_plate['nozzle_id'].iloc[-1] == f'Bravo - 384_Chip_Well_{len(last_plate)}'
+    assert (last_plate['cv_percent'] == 0).all()
+
+def test_analyzer_results_match_table():
+    plate = make_stack(1)[0]
+    results = analyzer_qc_results(plate, CONFIGS['Tempest'])
+    assert len(results) == 24
+    assert results[0]['column_range'] == '4-10'
+    assert results[-1]['nozzle_id'] == 'Chip_3_Nozzle_8'
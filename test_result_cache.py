@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the whole-analysis result cache (batch re-runs over unchanged plates)
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import analyze_plate_file
+from qc_cache import ResultCache
+import pytest
+import shutil
+import subprocess
+
+CONCENTRATIONS = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+
+@pytest.fixture
+def run(make_analyzer):
+    def analyze(cache, csv_file, target=75.0, force=False, generate_plots=False, export_format=None, heatmaps='auto'):
+        """Analyze csv_file; returns the analyzer and whether the plate was actually re-read"""
+        analyzer = make_analyzer(target=target, result_cache=cache, force_reanalysis=force, export_format=export_format,
+                                 heatmaps=heatmaps)
+        loads = []
+        load = analyzer.load_and_clean_data
+        analyzer.load_and_clean_data = lambda *args: loads.append(args) or load(*args)
+        assert analyzer.process_qc_analysis(str(csv_file), generate_plots=generate_plots, plot_format='preview')
+        return analyzer, bool(loads)
+    return analyze
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_unchanged_plate_is_restored(tmp_path, run, plate_file):
+    cache = ResultCache(tmp_path / "cache")
+    first, loaded = run(cache, plate_file, generate_plots=True)
+    assert loaded and len(first.plot_files) == 2
+    output_file = tmp_path / "plate_processed.csv"
+    outputs = {path: read_bytes(path) for path in [output_file, *first.plot_files]}
+
+    # Deleted outputs come back from the cache, without parsing, fitting or plotting
+    output_file.unlink()
+    shutil.rmtree(tmp_path / "plate-plots")
+    second, loaded = run(cache, plate_file, generate_plots=True)
+    assert not loaded
+    assert second.qc_results == first.qc_results
+    assert second.standard_curve_params['r_squared'] == first.standard_curve_params['r_squared']
+    assert {path: read_bytes(path) for path in outputs} == outputs
+
+    # The key is the file content, not its path
+    shutil.copy(plate_file, tmp_path / "copy.csv")
+    _, loaded = run(cache, tmp_path / "copy.csv", generate_plots=True)
+    assert not loaded and read_bytes(tmp_path / "copy_processed.csv") == outputs[output_file]
+
+def test_changed_inputs_and_force_reanalyze(tmp_path, run, plate_file):
+    cache = ResultCache(tmp_path / "cache")
+    assert run(cache, plate_file)[1]
+    assert not run(cache, plate_file)[1]
+    assert run(cache, plate_file, target=60.0)[1]  # Settings are part of the key
+    assert run(cache, plate_file, generate_plots=True)[1]
+    assert run(cache, plate_file, force=True)[1]
+
+    with open(plate_file, 'a', encoding='utf-8') as f:
+        f.write("\n")  # Same path, size changed - a new export
+    assert run(cache, plate_file)[1]
+    assert not run(cache, plate_file)[1]
+
+    settings = {'standard_concentrations': CONCENTRATIONS, 'target_concentration': 75.0, 'liquid_handler': 'Tempest',
+                'generate_plots': False, 'use_result_cache': True, 'curve_cache_dir': str(tmp_path / "cache")}
+    first = analyze_plate_file(str(plate_file), settings)
+    second = analyze_plate_file(str(plate_file), settings)
+    assert first['success'] and second['success'] and first['qc_results'] == second['qc_results']
+
+def test_only_batch_and_watch_use_the_cache(plate_file, cache_dir):
+    """A single-file CLI run always analyzes the plate and leaves the result cache alone"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qc_check.py")
+    for _ in range(2):
+        completed = subprocess.run([sys.executable, script, '-f', str(plate_file), '--no-plots'],
+                                   capture_output=True, text=True, timeout=120)
+        assert completed.returncode == 0, completed.stderr
+        assert "Step 1" in completed.stdout and "restored the results" not in completed.stdout
+    assert not (cache_dir / "results").exists()
+
+def test_exported_tables_restored(tmp_path, run, plate_file):
+    cache = ResultCache(tmp_path / "cache")
+    first, loaded = run(cache, plate_file, export_format='csv')
+    assert loaded and len(first.export_files) == 2
+    tables = {path: read_bytes(path) for path in first.export_files}
+    for path in tables:
+        os.remove(path)
+    second, loaded = run(cache, plate_file, export_format='csv')
+    assert not loaded and second.export_files == first.export_files
+    assert {path: read_bytes(path) for path in tables} == tables
+
+    # The tables name the plate after its file, so a copy is analyzed (and named) afresh
+    shutil.copy(plate_file, tmp_path / "copy.csv")
+    assert run(cache, tmp_path / "copy.csv", export_format='csv')[1]
+
+def test_heatmap_title_names_the_file(tmp_path, run, plate_file):
+    """The plate heatmap is titled with the file name, so a copy of the export draws its own"""
+    cache = ResultCache(tmp_path / "cache")
+    assert run(cache, plate_file, generate_plots=True, heatmaps='all')[1]
+    assert not run(cache, plate_file, generate_plots=True, heatmaps='all')[1]
+    shutil.copy(plate_file, tmp_path / "copy.csv")
+    assert run(cache, tmp_path / "copy.csv", generate_plots=True, heatmaps='all')[1]
+    assert run(cache, plate_file, generate_plots=True, heatmaps='off')[1]
+    assert not run(cache, tmp_path / "copy.csv", generate_plots=True, heatmaps='off')[1]  # Without one the path is no key
+
+def test_least_recently_used_evicted(tmp_path):
+    output_file = tmp_path / "plate_processed.csv"
+    output_file.write_text("QC Results\n", encoding='utf-8')
+    cache = ResultCache(tmp_path / "cache", max_entries=2)
+    for age, key in enumerate(['c', 'b', 'a']):
+        cache.put(key, {'qc_results': []}, output_file)
+        stamp = time.time() - 100 * (3 - age)
+        os.utime(cache.cache_dir / key / ResultCache.ENTRY_FILE, (stamp, stamp))
+    cache.evict()
+    assert cache.get('c') is None and cache.get('b') is not None  # get() marks 'b' as used
+    cache.put('d', {'qc_results': []}, output_file)
+    assert cache.get('a') is None and cache.get('b') is not None and cache.get('d') is not None
+    assert cache.get('b')['output_file'].endswith(ResultCache.OUTPUT_FILE)
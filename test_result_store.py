@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the longitudinal QC result store
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import parse_plate_export
+from qc_store import ResultStore
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+PARAMS = {'slope': np.float64(0.000235), 'intercept': np.float64(-2.55), 'r_squared': np.float64(0.9993),
+          'std_err': np.float64(1e-6)}
+
+def make_results(chip_id, n_nozzles=8, cv=3.0):
+    return [{'nozzle_id': f'{chip_id}_Nozzle_{i}', 'chip_id': chip_id, 'mean_concentration': np.float64(60.0 + i),
+             'std_concentration': np.float64(1.0), 'cv_percent': np.float64(cv), 'accuracy_percent': np.float64(i),
+             'n_measurements': np.int64(42), 'column_range': '4-24', 'handler_type': 'Tempest'}
+            for i in range(1, n_nozzles + 1)]
+
+def append_worker(args):
+    db_path, export, worker = args
+    store = ResultStore(db_path)
+    for day in range(1, 6):
+        metadata = {'assay_id': f'{worker}-{day}', 'assay_started': f'2025-07-{day:02d}T10:00:00'}
+        store.append_run(export, make_results('Chip_1'), PARAMS, metadata, instrument=f'Tempest-{worker}')
+    return worker
+
+def test_assay_metadata(example_file):
+    """Plate metadata comes from the Basic assay information section"""
+    metadata = parse_plate_export(example_file).assay_metadata()
+    assert metadata['assay_id'] == '5764'
+    assert metadata['serial_number'] == '1030344'
+    assert metadata['protocol_name'] == 'Fluorescein_QC_384'
+    assert metadata['assay_started'] == '2025-07-16T15:20:58'
+    assert metadata['assay_exported'] == '2025-07-16T15:36:21'
+
+def test_query_by_nozzle_and_date(tmp_path, example_file):
+    store = ResultStore(tmp_path / "qc.sqlite")
+    for day, cv in ((1, 2.0), (15, 4.0), (31, 6.0)):
+        store.append_run(example_file, make_results('Chip_1', cv=cv), PARAMS,
+                         {'assay_started': f'2025-07-{day:02d}T09:30:00', 'serial_number': '1030344'},
+                         instrument='Tempest-A', liquid_handler='Tempest')
+    store.append_run(tmp_path / "tempest_b.csv", make_results('Chip_1'), PARAMS,  # Another plate, same start time
+                     {'assay_started': '2025-07-15T09:30:00'}, instrument='Tempest-B')
+
+    history = store.query(instrument='Tempest-A', nozzle_id='Chip_1_Nozzle_3')
+    assert list(history['cv_percent']) == [2.0, 4.0, 6.0]
+    assert (history['serial_number'] == '1030344').all()
+    assert np.isclose(history['slope'].iloc[0], 0.000235)
+
+    july = store.query(instrument='Tempest-A', chip_id='Chip_1', start='2025-07-10', end='2025-07-15')
+    assert len(july) == 8 and set(july['run_date']) == {'2025-07-15T09:30:00'}
+    assert len(store.query(start='2025-07-15', end='2025-07-15')) == 16
+
+    runs = store.runs()
+    assert len(runs) == 4
+    assert list(runs['instrument']) == ['Tempest-A', 'Tempest-A', 'Tempest-B', 'Tempest-A']  # By date, then run_id
+
+def test_concurrent_appends(tmp_path, example_file):
+    """Several processes appending to one store lose no rows"""
+    db_path = str(tmp_path / "qc.sqlite")
+    ResultStore(db_path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        assert sorted(executor.map(append_worker, [(db_path, example_file, worker) for worker in range(4)])) == [0, 1, 2, 3]
+    store = ResultStore(db_path)
+    assert len(store.runs()) == 20
+    assert len(store.query()) == 160
+    assert len(store.query(instrument='Tempest-2', nozzle_id='Chip_1_Nozzle_8')) == 5
+
+def test_analysis_records_run(tmp_path, make_analyzer, plate_file):
+    """process_qc_analysis appends the run when a store is attached"""
+    analyzer = make_analyzer(result_store=ResultStore(tmp_path / "qc.sqlite"))
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+
+    runs = analyzer.result_store.runs()
+    assert len(runs) == 1
+    assert runs['assay_id'].iloc[0] == '5764'
+    assert runs['instrument'].iloc[0] == 'Tempest'
+    assert np.isclose(runs['r_squared'].iloc[0], analyzer.standard_curve_params['r_squared'])
+    history = analyzer.result_store.query(start='2025-07-16', end='2025-07-16')
+    assert len(history) == len(analyzer.qc_results)
+    np.testing.assert_allclose(history['cv_percent'], [r['cv_percent'] for r in analyzer.qc_results])
+
+    # Analyzing the plate again with other settings (a fresh analyzer, as a second CLI run) replaces the run
+    rerun = make_analyzer(target=75.0, result_store=ResultStore(tmp_path / "qc.sqlite"))
+    assert rerun.process_qc_analysis(str(plate_file), generate_plots=False)
+    runs = rerun.result_store.runs()
+    assert len(runs) == 1 and runs['target_concentration'].iloc[0] == 75.0
+    assert len(rerun.result_store.query()) == len(rerun.qc_results)
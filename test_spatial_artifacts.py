@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the spatial artifact stage (row/column/edge effects and corrected %CV)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_spatial import edge_wells, fit_spatial_effects
+from qc_check import calculate_qc_table, compile_group_index, default_chip_configurations, spatial_qc_table
+from qc_archive import PlateArchive, analyze_archive
+from qc_geometry import DEFAULT_GEOMETRY
+from benchmark_qc import STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, write_synthetic_exports
+import numpy as np
+
+def gradient_stack(n_plates, noise=0.5, seed=0):
+    """Plates of 100 with a 10% row gradient, a 4% column gradient and edge wells reading 6% high"""
+    rows, cols = DEFAULT_GEOMETRY.shape
+    row_index, col_index = np.indices((rows, cols))
+    surface = 10.0 * row_index / (rows - 1) + 4.0 * col_index / (cols - 1) + 6.0 * edge_wells((rows, cols))
+    rng = np.random.default_rng(seed)
+    return 100.0 + surface + rng.normal(0, noise, (n_plates, rows, cols))
+
+def test_recovers_planted_gradients():
+    stack = gradient_stack(500)
+    mask = np.ones(DEFAULT_GEOMETRY.shape, dtype=bool)
+    mask[:, :3] = False  # Standard columns
+    fit = fit_spatial_effects(stack, mask, 'twoway')
+    assert fit['surface'].shape == stack.shape and len(fit['level']) == 500
+    # Fitted span is the 21 sample columns, so the column gradient is 4% x 20/23 of ~108
+    np.testing.assert_allclose(np.median(fit['row_gradient']), 10.0 / 1.08, rtol=0.05)
+    np.testing.assert_allclose(np.median(fit['col_gradient']), 4.0 * 20 / 23 / 1.08, rtol=0.1)
+    np.testing.assert_allclose(np.median(fit['edge_effect']), 6.0 / 1.08, rtol=0.05)
+    assert not fit['surface'][:, ~mask].any()
+    np.testing.assert_allclose(fit['surface'][:, mask].mean(axis=1), 0, atol=1e-9)
+
+    # Median polish sees the same plate as row and column effects
+    polish = fit_spatial_effects(stack, mask, 'median_polish')
+    residual = (stack - polish['surface'])[:, mask]
+    assert np.median(residual.std(axis=1)) < 1.0 < np.median(stack[:, mask].std(axis=1))
+
+    # NaN wells are skipped per plate, and bad input is rejected
+    stack[0, :, 5] = np.nan
+    assert np.isfinite(fit_spatial_effects(stack[:2], mask)['row_gradient']).all()
+    for args in ((stack, mask, 'loess'), (stack[0], mask)):
+        try:
+            fit_spatial_effects(*args)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Expected ValueError for {args[2:] or 'a 2-D stack'}")
+
+def test_corrected_cv_below_raw():
+    stack = gradient_stack(20)
+    group_index = compile_group_index(default_chip_configurations('Tempest'), DEFAULT_GEOMETRY)
+    raw = calculate_qc_table(stack, group_index, 100.0)
+    table, effects = spatial_qc_table(raw, stack, group_index, 100.0, 'twoway')
+    assert len(effects) == 20 and table['nozzle_id'].tolist() == raw['nozzle_id'].tolist()
+    np.testing.assert_array_equal(table['cv_percent'], raw['cv_percent'])  # Raw %CV is kept next to it
+    assert (table['corrected_cv_percent'] < table['cv_percent']).all()
+    assert table['corrected_cv_percent'].mean() < 0.3 * table['cv_percent'].mean()  # Down to the 0.5% noise
+
+def test_analyzer_report(tmp_path, make_analyzer, plate_file):
+    reports = {}
+    for spatial_method in (None, 'twoway'):
+        analyzer = make_analyzer(target=75.0, spatial_method=spatial_method)
+        assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+        reports[spatial_method] = (tmp_path / "plate_processed.csv").read_text(encoding='utf-8')
+    assert "Corrected %CV" not in reports[None] and "Row Gradient" not in reports[None]
+    assert "Corrected %CV" in reports['twoway'] and "Edge Effect" in reports['twoway']
+    assert set(analyzer.spatial_effects) == {'row_gradient', 'col_gradient', 'edge_effect'}
+    assert all(np.isfinite(r['corrected_cv_percent']) for r in analyzer.qc_results)
+
+def test_archive_columns(tmp_path):
+    files, _ = write_synthetic_exports(tmp_path / "exports", 'Tempest', 3)
+    archive = PlateArchive(tmp_path / "archive")
+    plate_ids = archive.import_exports(files)
+    plain = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, 'Tempest')
+    table = analyze_archive(archive, STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, 'Tempest',
+                            spatial_method='median_polish', chunk_size=2)
+    assert 'corrected_cv_percent' not in plain.columns
+    np.testing.assert_array_equal(table['cv_percent'], plain['cv_percent'])
+    per_plate = table.groupby('plate')[['row_gradient', 'col_gradient', 'edge_effect']].nunique()
+    assert per_plate.index.tolist() == plate_ids and (per_plate == 1).all().all()
+    assert table['corrected_cv_percent'].notna().all()
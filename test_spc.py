@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the statistical process control charts (incremental Shewhart/EWMA/CUSUM state per nozzle)
+"""
+
+import sys
+import os
+import json
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_spc import CHART_POINTS, ControlChartStore, new_chart, render_control_chart, update_chart
+from benchmark_qc import (STANDARD_CONCENTRATIONS, TARGET_CONCENTRATION, ExportTemplate, synthetic_plate,
+                          write_synthetic_exports)
+import numpy as np
+import pytest
+
+def baseline_chart(n=20, seed=0):
+    chart = new_chart(baseline_runs=n)
+    rng = np.random.default_rng(seed)
+    for value in rng.normal(3.0, 0.3, n):
+        assert update_chart(chart, value) == []  # Nothing is judged during the baseline
+    return chart
+
+def test_rules():
+    chart = baseline_chart()
+    assert chart['center'] is not None and 0.15 < chart['sigma'] < 0.5
+    center, sigma = chart['center'], chart['sigma']
+
+    assert ('WE1', 'high') in update_chart(chart, center + 4 * sigma)
+    assert update_chart(baseline_chart(), center - 0.1 * sigma) == []
+
+    # A sustained 1.2-sigma shift never crosses 3 sigma, but CUSUM, EWMA and the run rules catch it
+    chart = baseline_chart()
+    rules = [rule for _ in range(12) for rule, direction in update_chart(chart, center + 1.2 * sigma)]
+    assert 'WE1' not in rules and {'WE3', 'WE4', 'CUSUM', 'EWMA'} <= set(rules)
+    assert all(direction == 'high' for _, direction in update_chart(chart, center + 1.2 * sigma))
+
+    chart = baseline_chart()
+    update_chart(chart, center - 2.5 * sigma)
+    assert ('WE2', 'low') in update_chart(chart, center - 2.5 * sigma)
+
+    # The state stays small and JSON-compatible however long the chart runs
+    for value in np.random.default_rng(1).normal(center, sigma, 200):
+        update_chart(chart, value)
+    assert len(chart['points']) == CHART_POINTS and chart['n'] == 222
+    assert json.loads(json.dumps(chart)) == chart
+
+def test_store_is_incremental_and_idempotent(tmp_path):
+    store = ControlChartStore(tmp_path / "spc.sqlite", baseline_runs=5)
+    rng = np.random.default_rng(0)
+    results = lambda cv: [{'chip_id': 'Chip_1', 'nozzle_id': f'Chip_1_Nozzle_{i}', 'cv_percent': cv[i],
+                           'accuracy_percent': 1.0 + 0.1 * cv[i]} for i in range(2)]
+    for run in range(5):
+        assert store.update(tmp_path / f"run{run}.csv", results(rng.normal(3, 0.2, 2)), 'Tempest-A',
+                            f"2025-07-{run + 1:02d}T09:00:00") == []
+    violations = store.update(tmp_path / "bad.csv", results([9.0, 3.0]), 'Tempest-A', "2025-07-10T09:00:00")
+    assert {(v['nozzle_id'], v['metric'], v['rule']) for v in violations if v['rule'] == 'WE1'} == \
+        {('Chip_1_Nozzle_0', 'cv_percent', 'WE1'), ('Chip_1_Nozzle_0', 'accuracy_percent', 'WE1')}
+
+    # Re-analyzing a run returns its violations without adding a point
+    reopened = ControlChartStore(tmp_path / "spc.sqlite")
+    assert reopened.update(tmp_path / "bad.csv", results([9.0, 3.0]), 'Tempest-A', "2025-07-10T09:00:00") == violations
+    chart = reopened.chart('Tempest-A', 'Chip_1', 'Chip_1_Nozzle_0')
+    assert chart['n'] == 6 and chart['points'][-1]['rules'][0] == 'WE1'
+    assert reopened.chart('Tempest-B', 'Chip_1', 'Chip_1_Nozzle_0') is None
+
+    status = reopened.status('Tempest-A')
+    assert len(status) == 4 and set(status['phase']) == {'monitoring'}
+    assert len(reopened.violations('Tempest-A', start='2025-07-10')) == len(violations)
+    assert reopened.violations(end='2025-07-09').empty
+
+    # Without an assay start time the run is the file's content: re-analyzing it adds no point, a new export does
+    undated = tmp_path / "undated.csv"
+    undated.write_text("plate 1\n", encoding='utf-8')
+    first = reopened.update(undated, results([9.5, 3.0]), 'Tempest-A')
+    assert first and reopened.update(undated, results([9.5, 3.0]), 'Tempest-A') == first
+    assert reopened.chart('Tempest-A', 'Chip_1', 'Chip_1_Nozzle_0')['n'] == 7
+    undated.write_text("plate 2\n", encoding='utf-8')
+    reopened.update(undated, results([3.0, 3.0]), 'Tempest-A')
+    assert reopened.chart('Tempest-A', 'Chip_1', 'Chip_1_Nozzle_0')['n'] == 8
+
+    # Charts render from the stored state alone
+    assert os.path.getsize(render_control_chart(chart, tmp_path / "chart.png", "Nozzle 0 %CV")) > 0
+    render_control_chart(reopened.chart('Tempest-A', 'Chip_1', 'Chip_1_Nozzle_1'), tmp_path / "chart.svg")
+
+@pytest.fixture
+def run_plate(make_analyzer):
+    def analyze(csv_file, spc):
+        """Analyze a synthetic Tempest export with the benchmark's standards and control charts spc"""
+        analyzer = make_analyzer(target=TARGET_CONCENTRATION, standard_concentrations=list(STANDARD_CONCENTRATIONS),
+                                 spc=spc)
+        assert analyzer.process_qc_analysis(str(csv_file), generate_plots=False)
+        return analyzer
+    return analyze
+
+def test_analyzer_reports_violations(tmp_path, run_plate):
+    files, _ = write_synthetic_exports(tmp_path, 'Tempest', 5)
+    spc = ControlChartStore(tmp_path / "spc.sqlite", baseline_runs=5)
+    for csv_file in files:
+        analyzer = run_plate(csv_file, spc)
+        assert analyzer.spc_violations == []
+    processed = (tmp_path / "Tempest_00004_processed.csv").read_text(encoding='utf-8')
+    assert "SPC Violations" in processed
+
+    # A plate dispensed with 5x the baseline imprecision trips the %CV charts
+    degraded = tmp_path / "Tempest_degraded.csv"
+    plate = synthetic_plate('Tempest', np.random.default_rng(7), cv_percent=15.0)
+    degraded.write_text(ExportTemplate().render(plate, 20000, datetime(2025, 8, 1, 9, 0)), encoding='utf-8')
+    analyzer = run_plate(degraded, spc)
+    flagged = {v['nozzle_id'] for v in analyzer.spc_violations if v['metric'] == 'cv_percent' and v['rule'] == 'WE1'}
+    assert len(flagged) >= 6 and all(v['direction'] == 'high' for v in analyzer.spc_violations
+                                     if v['metric'] == 'cv_percent')
+    processed = (tmp_path / "Tempest_degraded_processed.csv").read_text(encoding='utf-8')
+    assert sum(line.startswith(",Chip_1_Nozzle_") for line in processed.splitlines()) == len(analyzer.spc_violations)
+
+    # Analyzing the same export again is the same run
+    n = spc.chart('Tempest', 'Chip_1', 'Chip_1_Nozzle_1')['n']
+    assert run_plate(degraded, spc).spc_violations == analyzer.spc_violations
+    assert spc.chart('Tempest', 'Chip_1', 'Chip_1_Nozzle_1')['n'] == n == 6
+
+    # Without --spc the report has no SPC section
+    run_plate(files[0], None)
+    assert "SPC Violations" not in (tmp_path / "Tempest_00000_processed.csv").read_text(encoding='utf-8')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental re-analysis (stage cache reuse when only chips or target change)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_cache import StageCache
+import numpy as np
+
+def counting(analyzer, *names):
+    """Wrap analyzer methods so the test can see which stages actually ran"""
+    calls = {name: 0 for name in names}
+    for name in names:
+        method = getattr(analyzer, name)
+        def wrapper(*args, _method=method, _name=name, **kwargs):
+            calls[_name] += 1
+            return _method(*args, **kwargs)
+        setattr(analyzer, name, wrapper)
+    return calls
+
+def test_fingerprint():
+    assert StageCache.fingerprint({'a': 1, 'b': [2]}) == StageCache.fingerprint({'b': [2], 'a': 1})
+    assert StageCache.fingerprint(np.arange(2000.0)) != StageCache.fingerprint(np.arange(2000.0) + 1e-9)
+    cache = StageCache()
+    cache.put('qc', 'abc', {'qc_results': []})
+    assert cache.get('qc', 'abc') == {'qc_results': []} and cache.get('qc', 'abd') is None
+
+def test_target_change_only_recomputes_qc(tmp_path, make_analyzer, plate_file):
+    analyzer = make_analyzer()
+    calls = counting(analyzer, 'load_and_clean_data', 'build_standard_curve', 'calculate_concentrations',
+                     'calculate_qc_metrics', 'generate_output_file')
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    analyzer.target_concentration = 75
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert calls == {'load_and_clean_data': 1, 'build_standard_curve': 1, 'calculate_concentrations': 1,
+                     'calculate_qc_metrics': 2, 'generate_output_file': 2}
+    with open(tmp_path / "plate_processed.csv", encoding='utf-8') as f:
+        incremental = f.read()
+
+    fresh = make_analyzer(target=75)
+    assert fresh.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert analyzer.qc_results == fresh.qc_results
+    with open(tmp_path / "plate_processed.csv", encoding='utf-8') as f:
+        assert f.read() == incremental
+
+    # Unchanged settings: nothing is recomputed or rewritten
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert calls['calculate_qc_metrics'] == 2 and calls['generate_output_file'] == 2
+
+def test_chip_change_rerenders_affected_plots(tmp_path, make_analyzer, plate_file):
+    analyzer = make_analyzer()
+    analyzer.chip_configurations = [
+        {'chip_id': 'Chip_1', 'start_col': 3, 'end_col': 12, 'handler_type': 'Tempest'},
+        {'chip_id': 'Chip_2', 'start_col': 13, 'end_col': 23, 'handler_type': 'Tempest'},
+    ]
+    assert analyzer.process_qc_analysis(str(plate_file), plot_format='preview', plot_workers=1)
+    plots = {path.name: path.stat().st_mtime_ns for path in (tmp_path / "plate-plots").iterdir()}
+    for path in (tmp_path / "plate-plots").iterdir():
+        os.utime(path, ns=(1, 1))  # Mark every figure so re-rendered ones stand out
+
+    analyzer.chip_configurations[1]['end_col'] = 20
+    assert analyzer.process_qc_analysis(str(plate_file), plot_format='preview', plot_workers=1)
+    rendered = {path.name for path in (tmp_path / "plate-plots").iterdir() if path.stat().st_mtime_ns != 1}
+    assert set(plots) == {path.name for path in (tmp_path / "plate-plots").iterdir()}
+    assert 'standard_curve.png' not in rendered and 'chip_1_nozzle_performance.png' not in rendered
+    assert {'chip_2_nozzle_performance.png', 'all_chips_nozzle_performance.png'} <= rendered
+
+def test_modified_file_invalidates_everything(tmp_path, make_analyzer, plate_file):
+    analyzer = make_analyzer()
+    calls = counting(analyzer, 'load_and_clean_data', 'calculate_qc_metrics')
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    stat = plate_file.stat()
+    os.utime(plate_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert analyzer.process_qc_analysis(str(plate_file), generate_plots=False)
+    assert calls == {'load_and_clean_data': 2, 'calculate_qc_metrics': 2}
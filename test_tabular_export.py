@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the typed long-format exports (per-well and per-group tables)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import collect_batch_files, write_table
+import numpy as np
+import pandas as pd
+import pytest
+
+CONCENTRATIONS = [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875]
+
+@pytest.fixture
+def run(make_analyzer, plate_file):
+    def analyze(handler='Tempest', outlier_method=None, export_format='csv'):
+        analyzer = make_analyzer(handler, target=75.0, outlier_method=outlier_method, export_format=export_format)
+        return analyzer.process_qc_analysis(str(plate_file), generate_plots=False), analyzer
+    return analyze
+
+def test_well_table_matches_report(tmp_path, run):
+    success, analyzer = run()
+    assert success and analyzer.export_files == [str(tmp_path / "plate_wells.csv"), str(tmp_path / "plate_groups.csv")]
+    wells = pd.read_csv(tmp_path / "plate_wells.csv", float_precision='round_trip')
+    assert len(wells) == 384 and wells['plate'].eq('plate').all()
+    assert wells['well'].iloc[[0, 25]].tolist() == ['A1', 'B2'] and wells['col'].iloc[25] == 2
+    np.testing.assert_array_equal(wells['concentration'], analyzer.calculated_concentrations.to_numpy(dtype=float).ravel())
+    assert wells['role'].value_counts().to_dict() == {'sample': 336, 'standard': 24, 'unused': 24}
+    standards = wells[wells['role'] == 'standard']
+    assert sorted(standards['standard_concentration'].unique()) == sorted(CONCENTRATIONS)
+
+    # Counted wells per nozzle are the report's N; the group table carries the same numbers, unformatted
+    counted = wells[wells['counted']].groupby('nozzle').size()
+    assert [counted[r['nozzle_id']] for r in analyzer.qc_results] == [r['n_measurements'] for r in analyzer.qc_results]
+    groups = pd.read_csv(tmp_path / "plate_groups.csv")
+    assert groups['nozzle_id'].tolist() == [r['nozzle_id'] for r in analyzer.qc_results]
+    np.testing.assert_allclose(groups['cv_percent'], [r['cv_percent'] for r in analyzer.qc_results], rtol=1e-12)
+
+    # The tables are outputs, not plate exports
+    assert collect_batch_files(str(tmp_path)) == [str(tmp_path / "plate.csv")]
+
+def test_flags_and_per_well_groups(run):
+    success, analyzer = run(outlier_method='mad')
+    assert success
+    table = analyzer.well_table('plate')
+    assert sorted(table.loc[table['excluded'], 'well']) == sorted(w['well'] for w in analyzer.excluded_wells)
+    assert not (table['excluded'] & table['counted']).any()
+
+    success, analyzer = run(handler='Bravo - 384')
+    assert success
+    table = analyzer.well_table('plate')
+    assert 'standard' not in set(table['role'])  # Curve from a separate standards plate
+    samples = table[table['counted']]
+    assert samples['nozzle'].tolist() == [r['nozzle_id'] for r in analyzer.qc_results]
+    assert table['chip'].dtype == 'category' and table['col'].dtype == np.int16
+
+    # Standards rejected on the standards plate do not flag the sample plate's wells of the same name
+    success, analyzer = run(handler='Bravo - 384', outlier_method='mad')
+    assert success and {w['kind'] for w in analyzer.excluded_wells} == {'standard'}
+    table = analyzer.well_table('plate')
+    assert not table['excluded'].any() and table['counted'].sum() == len(analyzer.qc_results)
+
+def test_binary_formats(tmp_path, run):
+    table = pd.DataFrame({'well': ['A1', 'A2'], 'rfu': [1.0, np.nan]})
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        for export_format in ('parquet', 'feather'):
+            try:
+                write_table(table, tmp_path / f"t.{export_format}", export_format)
+            except ValueError as e:
+                assert "pyarrow" in str(e)
+            else:
+                raise AssertionError(f"Expected ValueError for {export_format} without pyarrow")
+        success, _ = run(export_format='parquet')
+        assert not success  # A requested export that cannot be written fails the run
+        return
+    success, analyzer = run(export_format='parquet')
+    assert success
+    wells = pd.read_parquet(tmp_path / "plate_wells.parquet")
+    assert len(wells) == 384 and wells['counted'].dtype == bool
+    write_table(table, tmp_path / "t.feather", 'feather')
+    pd.testing.assert_frame_equal(pd.read_feather(tmp_path / "t.feather"), table)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for --watch mode (debounced folder watcher with a warm worker pool)
+"""
+
+import sys
+import os
+import json
+import subprocess
+import textwrap
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from qc_check import ExportWatcher, default_chip_configurations
+import shutil
+import time
+
+SETTINGS = {
+    'standard_concentrations': [600, 300, 150, 75, 37.5, 18.75, 9.375, 4.6875],
+    'target_concentration': 60,
+    'liquid_handler': 'Tempest',
+    'chip_configurations': default_chip_configurations('Tempest'),
+    'use_curve_cache': False,
+    'generate_plots': False,
+}
+
+def wait_for_results(watcher, timeout=60):
+    finished = []
+    deadline = time.time() + timeout
+    while watcher.in_flight and time.time() < deadline:
+        finished.extend(watcher.collect_finished())
+        time.sleep(0.1)
+    return finished
+
+def test_partial_write_is_debounced(tmp_path, example_file):
+    """A file still being written is not analyzed until it has settled"""
+    with open(example_file, 'rb') as f:
+        content = f.read()
+    export = tmp_path / "plate1.csv"
+    export.write_bytes(content[:len(content) // 2])
+
+    watcher = ExportWatcher(tmp_path, SETTINGS, settle_seconds=5)
+    try:
+        now = time.time()
+        assert watcher.poll_once(now) == []  # First sighting starts the settle timer
+        assert watcher.poll_once(now + 1) == []  # Not settled yet
+
+        export.write_bytes(content)  # Writer finishes - timer restarts
+        assert watcher.poll_once(now + 2) == []
+        assert watcher.poll_once(now + 4) == []
+        assert watcher.poll_once(now + 8) == [str(export)]
+        assert watcher.poll_once(now + 9) == []  # Already in flight
+
+        finished = wait_for_results(watcher)
+        assert len(finished) == 1 and finished[0]['success'], finished
+        assert (tmp_path / "plate1_processed.csv").exists()
+        assert (tmp_path / "watch_summary.csv").exists()
+
+        # Unchanged files (and our own outputs) are never re-submitted
+        assert watcher.poll_once(now + 20) == []
+        assert watcher.poll_once(now + 30) == []
+    finally:
+        watcher.stop()
+
+def test_restart_skips_processed_exports(tmp_path, example_file):
+    """Exports with an up-to-date _processed.csv are not re-analyzed after a restart"""
+    export = tmp_path / "plate1.csv"
+    shutil.copy(example_file, export)
+    (tmp_path / "plate1_processed.csv").write_text("done\n")
+
+    watcher = ExportWatcher(tmp_path, SETTINGS, settle_seconds=0)
+    try:
+        assert watcher.poll_once() == []
+        assert watcher.poll_once() == []
+        assert watcher.executor is None  # No work, no worker pool
+    finally:
+        watcher.stop()
+
+def test_empty_and_corrupt_files(tmp_path):
+    """Empty files wait; corrupt files fail without stopping the watcher"""
+    (tmp_path / "empty.csv").write_bytes(b"")
+    (tmp_path / "corrupt.csv").write_text("not,a,plate\n")
+
+    watcher = ExportWatcher(tmp_path, SETTINGS, settle_seconds=0)
+    try:
+        now = time.time()
+        watcher.poll_once(now)
+        assert watcher.poll_once(now + 1) == [str(tmp_path / "corrupt.csv")]
+        finished = wait_for_results(watcher)
+        assert len(finished) == 1 and not finished[0]['success']
+        assert watcher.poll_once(now + 2) == []
+    finally:
+        watcher.stop()
+
+def test_spawned_warm_workers(tmp_path, example_file):
+    """The warm pool also works with spawn (Windows, macOS, the packaged exe) without re-running main()"""
+    shutil.copy(example_file, tmp_path / "plate1.csv")
+    script = tmp_path / "spawn_watch.py"
+    script.write_text(textwrap.dedent(f"""
+        import json, multiprocessing, sys, time
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+        import qc_check
+        qc_check.main = lambda: sys.exit("main() re-run in a worker")
+
+        if __name__ == "__main__":
+            multiprocessing.freeze_support()
+            multiprocessing.set_start_method('spawn', force=True)
+            watcher = qc_check.ExportWatcher({str(tmp_path)!r}, {SETTINGS!r}, workers=2, settle_seconds=0)
+            try:
+                now = time.time()
+                watcher.poll_once(now)
+                watcher.poll_once(now + 1)
+                finished = []
+                deadline = time.time() + 120
+                while watcher.in_flight and time.time() < deadline:
+                    finished.extend(watcher.collect_finished())
+                    time.sleep(0.1)
+            finally:
+                watcher.stop()
+            print(json.dumps([r['success'] for r in finished]))
+    """), encoding='utf-8')
+    completed = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == [True]